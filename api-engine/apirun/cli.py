@@ -1,15 +1,137 @@
+import multiprocessing
 import os
 import sys
 import shutil
 
 import pytest
-from allure_combine import combine_allure
 
 # 添加父目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from apirun.core.CasesPlugin import CasesPlugin
+from apirun.core.CasesPlugin import CasesPlugin, HTTP_OPTIONS
 from apirun.plugin_config import plugin_config
+from apirun.utils.ReportBuilder import build_report
+from apirun.utils.RequestLog import REQUEST_LOG_ENV
+from apirun.utils.StepProfiler import PROFILE_ENV
+
+
+def _option_value(args, name, default=None):
+    """从透传参数中读取 --name=value 形式的值"""
+    for arg in args:
+        if arg.startswith(f"{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def _run_async(args, allure_results_dir, extra_args):
+    """异步引擎：不经过 pytest，直接执行用例并写入 Allure 结果"""
+    from apirun.core.AsyncTestRunner import run_cases
+
+    shutil.rmtree(allure_results_dir, ignore_errors=True)
+    http_config = {}
+    for option, key in HTTP_OPTIONS.items():
+        if (value := _option_value(extra_args, "--" + option.replace("_", "-"))) is not None:
+            http_config[key] = value
+    return run_cases(
+        cases_dir=_option_value(extra_args, "--cases", "../examples"),
+        results_dir=allure_results_dir,
+        case_type=args.get("type") or "yaml",
+        key_dir=args.get("keyDir") or None,
+        concurrency=int(args.get("concurrency") or 20),
+        http_config=http_config,
+    )
+
+
+def _build_pytest_args(allure_results_dir, log_file, extra_args):
+    """构建 pytest 运行参数"""
+    pytest_args = ["-s", "-v", "--capture=tee-sys"]
+    pytest_args.append(os.path.join(os.path.dirname(__file__), "core/ApiTestRunner.py"))
+    pytest_args.extend(["--clean-alluredir", f"--alluredir={allure_results_dir}"])
+    # 添加日志文件配置
+    pytest_args.extend([
+        f"--log-file={log_file}",
+        "--log-file-level=INFO",
+        "--log-file-format=%(asctime)s %(levelname)s %(message)s %(lineno)d",
+        "--log-file-date-format=%Y-%m-%d %H:%M:%S"
+    ])
+    pytest_args.extend(extra_args)
+    return pytest_args
+
+
+def _run_worker(pytest_args):
+    """并行模式下的 worker 进程：独立加载 context.yaml 与用例，只执行自己的分片"""
+    sys.exit(pytest.main(pytest_args, plugins=[CasesPlugin()]))
+
+
+def _run_parallel(workers, allure_results_dir, logdata_dir, extra_args):
+    """多进程并行执行用例，并把各 worker 的 Allure 结果合并到同一目录"""
+    shutil.rmtree(allure_results_dir, ignore_errors=True)
+    os.makedirs(allure_results_dir, exist_ok=True)
+
+    # spawn 方式启动，保证每个 worker 拥有独立的 g_context
+    mp_context = multiprocessing.get_context("spawn")
+    processes = []
+    request_log = os.environ.get(REQUEST_LOG_ENV)
+    for index in range(workers):
+        worker_results_dir = os.path.join(allure_results_dir, f"worker-{index}")
+        if request_log:
+            # 各 worker 写入独立的请求日志文件（子进程启动时继承环境变量）
+            os.environ[REQUEST_LOG_ENV] = request_log.replace(".jsonl", f"-worker-{index}.jsonl")
+        worker_log_file = os.path.join(logdata_dir, f"log-worker-{index}.log")
+        worker_args = _build_pytest_args(worker_results_dir, worker_log_file, extra_args)
+        worker_args.extend([f"--shard-index={index}", f"--shard-count={workers}"])
+        process = mp_context.Process(target=_run_worker, args=(worker_args,), name=f"apirun-worker-{index}")
+        process.start()
+        processes.append(process)
+    if request_log:
+        os.environ[REQUEST_LOG_ENV] = request_log
+
+    exit_codes = []
+    for process in processes:
+        process.join()
+        exit_codes.append(process.exitcode)
+    print(f"并行执行完成，各 worker 退出码: {exit_codes}")
+
+    # 合并 Allure 结果（结果文件名为 uuid，不会冲突）
+    for index in range(workers):
+        worker_results_dir = os.path.join(allure_results_dir, f"worker-{index}")
+        if not os.path.isdir(worker_results_dir):
+            continue
+        for file_name in os.listdir(worker_results_dir):
+            shutil.move(os.path.join(worker_results_dir, file_name), os.path.join(allure_results_dir, file_name))
+        shutil.rmtree(worker_results_dir, ignore_errors=True)
+
+
+def _generate_allure_report(allure_results_dir, allure_report_dir, reports_dir):
+    """
+    使用 allure 命令行 + allure-combine 生成单文件报告（需要安装 Java 版 allure）
+
+    :return: complete.html 路径，失败返回 None
+    """
+    print("\n=== 测试执行完成，正在生成Allure报告... ===")
+    os.makedirs(allure_report_dir, exist_ok=True)
+    os.system(f'allure generate -c -o "{allure_report_dir}" "{allure_results_dir}"')
+    
+    if not os.listdir(allure_report_dir):
+        print("警告: Allure 报告生成失败")
+        return None
+    
+    try:
+        from allure_combine import combine_allure
+        combine_allure(allure_report_dir)
+    except Exception as e:
+        print(f"警告: allure-combine 失败: {e}")
+        return None
+    
+    complete_html = os.path.join(allure_report_dir, "complete.html")
+    if not os.path.exists(complete_html):
+        print("警告: complete.html 未生成")
+        return None
+    
+    # 将 complete.html 移动到 reports 目录
+    final_report = os.path.join(reports_dir, "complete.html")
+    shutil.copy2(complete_html, final_report)
+    return final_report
 
 
 def run():
@@ -28,6 +150,8 @@ def run():
     args = plugin_config.parse_args()
     
     print(f"用例格式: {args.get('type', 'yaml')}")
+    print(f"执行引擎: {args.get('engine') or 'pytest'}")
+    print(f"并行进程: {args.get('workers') or 1}")
     print("=" * 60)
     
     # 获取项目根目录
@@ -43,51 +167,48 @@ def run():
     logdata_dir = os.path.join(reports_dir, "logdata")
     os.makedirs(logdata_dir, exist_ok=True)
     log_file = os.path.join(logdata_dir, "log.log")
+    # 请求日志（JSONL）需显式开启，相对路径写到 reports 目录；context.yaml 的 _log.path 可覆盖
+    if request_log := args.get("request_log"):
+        if not os.path.isabs(request_log):
+            request_log = os.path.join(reports_dir, request_log)
+        os.environ[REQUEST_LOG_ENV] = request_log
+    # 步骤耗时分析（pytest、async、并行模式均通过环境变量开启），相对路径写到 reports 目录
+    if profile := args.get("profile"):
+        if profile.lower() not in ("1", "true", "yes", "0", "false", "no") and not os.path.isabs(profile):
+            profile = os.path.join(reports_dir, profile)
+        os.environ[PROFILE_ENV] = profile
     
     # 获取剩余的 pytest 参数
     pytest_cmd_config = [arg for arg in sys.argv[1:] if arg.startswith("-")]
-    # 2. 构建pytest参数
-    pytest_args = ["-s", "-v", "--capture=tee-sys"]
-    pytest_args.append(os.path.join(os.path.dirname(__file__), "core/ApiTestRunner.py"))
-    pytest_args.extend(["--clean-alluredir", f"--alluredir={allure_results_dir}"])
-    # 添加日志文件配置
-    pytest_args.extend([
-        f"--log-file={log_file}",
-        "--log-file-level=INFO",
-        "--log-file-format=%(asctime)s %(levelname)s %(message)s %(lineno)d",
-        "--log-file-date-format=%Y-%m-%d %H:%M:%S"
-    ])
-    pytest_args.extend(pytest_cmd_config)
+    workers = int(args.get("workers") or 1)
 
-    print("run pytest：", pytest_args)
+    if args.get("engine") == "async":
+        # 异步模式：asyncio + httpx 并发执行用例
+        print(f"异步执行: 最大并发 {args.get('concurrency') or 20}")
+        _run_async(args, allure_results_dir, pytest_cmd_config)
+    elif workers > 1:
+        # 并行模式：按分片分发用例到多个进程
+        print(f"并行执行: {workers} 个 worker")
+        _run_parallel(workers, allure_results_dir, logdata_dir, pytest_cmd_config)
+    else:
+        # 2. 构建pytest参数
+        pytest_args = _build_pytest_args(allure_results_dir, log_file, pytest_cmd_config)
+        print("run pytest：", pytest_args)
 
-    # 执行pytest测试
-    pytest.main(pytest_args, plugins=[CasesPlugin()])
+        # 执行pytest测试
+        pytest.main(pytest_args, plugins=[CasesPlugin()])
     
     # 生成报告（只保留 complete.html）
-    print("\n=== 测试执行完成，正在生成Allure报告... ===")
-    os.makedirs(allure_report_dir, exist_ok=True)
-    os.system(f'allure generate -c -o "{allure_report_dir}" "{allure_results_dir}"')
-    
-    if not os.listdir(allure_report_dir):
-        print("警告: Allure 报告生成失败")
-        return
-    
-    try:
-        combine_allure(allure_report_dir)
-    except Exception as e:
-        print(f"警告: allure-combine 失败: {e}")
+    if args.get("report") == "allure":
+        final_report = _generate_allure_report(allure_results_dir, allure_report_dir, reports_dir)
+    else:
+        # 进程内增量生成单文件报告，SQLite 索引保留在 reports 目录供下次运行复用
+        print("\n=== 测试执行完成，正在生成报告... ===")
+        final_report = str(build_report(allure_results_dir, os.path.join(reports_dir, "complete.html"),
+                                        os.path.join(reports_dir, "report-index.db"), plugin_config.name))
+    if not final_report:
         return
     
-    complete_html = os.path.join(allure_report_dir, "complete.html")
-    if not os.path.exists(complete_html):
-        print("警告: complete.html 未生成")
-        return
-    
-    # 将 complete.html 移动到 reports 目录
-    final_report = os.path.join(reports_dir, "complete.html")
-    shutil.copy2(complete_html, final_report)
-    
     # 清理临时目录（只保留 complete.html）
     try:
         shutil.rmtree(allure_results_dir, ignore_errors=True)
@@ -1,64 +1,76 @@
-import copy
-import sys
-
 import allure
 
+from .KeywordRegistry import KeywordRegistry
 from .globalContext import g_context
 from ..extend.keywords import Keywords
 from ..extend.script import run_script
+from ..parse.CaseParser import materialize_case
 from ..utils.DynamicTitle import dynamicTitle  # 动态标题
-from ..utils.VarRender import refresh
+from ..utils.SessionPool import SessionPool
+from ..utils.StepProfiler import keyword_category, profiler
+from ..utils.VarRender import compile_case
+
+
+def _as_script_list(scripts):
+    """前置/后置脚本支持单个字符串或字符串列表"""
+    return [scripts] if isinstance(scripts, str) else scripts
 
 
 class TestRunner:
     def test_case_execute(self, caseinfo):
+        with profiler.span(caseinfo.get("_case_name") or "case", "case"):
+            self._execute(caseinfo)
+
+    def _execute(self, caseinfo):
+        # 数据驱动用例在执行时才读取数据行、生成完整用例
+        with profiler.span("materialize_case", "render"):
+            caseinfo = materialize_case(caseinfo)
         # allure 用例标题title，可按需拓展模块等...
         dynamicTitle(caseinfo)
+        # 隔离 Cookie（默认）时，每个用例从空 Cookie 开始
+        SessionPool.begin_case()
 
         try:
             keywords = Keywords()
-            # 单用例范围内的 变量数据
+            # 关键字分发表（进程内只构建一次）
+            with profiler.span("bind_keywords", "dispatch"):
+                dispatch = KeywordRegistry.get(Keywords).bind(keywords)
+            # 预编译的用例模板（收集阶段已编译则直接复用）
+            with profiler.span("compile_case", "render"):
+                compiled = compile_case(caseinfo)
+            # 单用例范围内的 变量数据：分层上下文 [步骤层, 用例变量, 全局变量]，读取时不拷贝
             local_context = caseinfo.get("context", {})
-            context = copy.deepcopy(g_context().show_dict())
-            context.update(local_context)
+            with profiler.span("case_scope", "context"):
+                context = g_context().scope(local_context)
 
             # 执行前置用例
-            pre_script = refresh(caseinfo.get("pre_script", None), context) # 全局变量+用例变量渲染
+            pre_script = compiled["pre_script"](context) # 全局变量+用例变量渲染
             if pre_script:
-                for script in eval(pre_script):
-                    run_script.exec_script(script, g_context().show_dict(), caseinfo)
+                for script in _as_script_list(pre_script):
+                    with profiler.span("pre_script", "script"):
+                        run_script.exec_script(script, g_context().show_dict(), caseinfo)
 
             # 准备执行用例 - 刷新用例内变量
-            steps = caseinfo.get("steps", None)
-            for step in steps:
-                step_name = list(step.keys())[0]
-                step_value = list(step.values())[0]
-                # 刷新步骤内容的变量值
-                context = copy.deepcopy(g_context().show_dict())
-                context.update(local_context)
-                step_value = eval(refresh(step_value, context)) # 全局变量+用例变量渲染
+            for step_name, render_step in compiled["steps"]:
+                # 刷新步骤内容的变量值（全局变量的最新值实时可见）
+                with profiler.span("new_step", "context"):
+                    step_context = context.new_step()
+                with profiler.span(step_name, "render"):
+                    step_value = render_step(step_context) # 全局变量+用例变量渲染
                 print(f"开始执行步骤：{step_name} - {step_value}")
                 with allure.step(step_name):
                     key = step_value["关键字"]
-                    try:
-                        key_func = keywords.__getattribute__(key)
-                    except AttributeError as e:
-                        print("没有这个关键字，动态加载：", e)
-                        sys.path.append(g_context().get_dict("key_dir"))
-                        module = __import__(key)  # 动态引入模块(temp.py文件)
-                        class_ = getattr(module, key)
-                        key_func = class_().__getattribute__(key)
-                        print("动态加载的函数", key_func)
-
-                    key_func(**step_value)  # 调用关键字方法
+                    with profiler.span(key, "dispatch"):
+                        key_func = dispatch[key]
+                    with profiler.span(key, keyword_category(key), {"step": step_name}):
+                        key_func(**step_value)  # 调用关键字方法
                     
             # 后置脚本执行
-            context = copy.deepcopy(g_context().show_dict())
-            context.update(local_context)
-            post_script = refresh(caseinfo.get("post_script", None), context) # 全局变量+用例变量渲染
+            post_script = compiled["post_script"](context) # 全局变量+用例变量渲染
 
             if post_script:
-                for script in eval(post_script):
-                    run_script.exec_script(script, g_context().show_dict(), caseinfo)
+                for script in _as_script_list(post_script):
+                    with profiler.span("post_script", "script"):
+                        run_script.exec_script(script, g_context().show_dict(), caseinfo)
         finally:
             print("========执行完毕========")
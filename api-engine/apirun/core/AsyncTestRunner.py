@@ -0,0 +1,183 @@
+"""
+异步执行引擎（不依赖 pytest）
+基于 asyncio + httpx.AsyncClient 执行与 pytest 模式相同的用例，网络等待期间可以同时执行其它用例。
+
+- 同一分组（见 case_group_key，与 --workers 分片规则相同）的用例按原有顺序依次执行，组内共享提取的变量；不同分组并发执行。
+  数字前缀的用例文件默认在同一分组，与 pytest 模式一样按前缀顺序执行，后面的文件可以使用前面文件提取的变量；
+  设置了不同 shard_group 的文件视为互不依赖，才会并发执行
+- 每个分组拥有独立的上下文作用域（g_context.isolated），current_response 等变量互不干扰
+- 并发执行的用例数由 concurrency 限制
+- 结果通过 AllureRecorder 写入 Allure 结果目录，报告生成流程与 pytest 模式一致
+"""
+import asyncio
+import inspect
+import time
+from pathlib import Path
+from typing import Any
+
+import allure
+
+from .ApiTestRunner import _as_script_list
+from .KeywordRegistry import KeywordRegistry
+from .globalContext import g_context
+from ..extend.async_keywords import AsyncKeywords
+from ..extend.script import run_script
+from ..parse.CaseParser import case_group_key, case_parser, case_template, materialize_case
+from ..utils.AllureRecorder import AllureRecorder
+from ..utils.AsyncClientPool import AsyncClientPool
+from ..utils.DbPool import DbPool
+from ..utils.DynamicTitle import dynamicTitle
+from ..utils.SessionPool import SessionPool
+from ..utils.StepProfiler import keyword_category, profiler
+from ..utils.VarRender import compile_case
+
+# 默认并发用例数
+DEFAULT_CONCURRENCY = 20
+
+
+class AsyncTestRunner:
+    """异步用例执行器"""
+
+    def __init__(self, recorder: AllureRecorder, concurrency: int = DEFAULT_CONCURRENCY):
+        self.recorder = recorder
+        self.concurrency = max(1, concurrency)
+        self.summary = {"total": 0, "passed": 0, "failed": 0, "broken": 0}
+
+    async def execute_case(self, caseinfo: dict[str, Any]) -> None:
+        """执行单个用例，流程与 TestRunner.test_case_execute 相同"""
+        with profiler.span(caseinfo.get("_case_name") or "case", "case"):
+            await self._execute(caseinfo)
+
+    async def _execute(self, caseinfo: dict[str, Any]) -> None:
+        # 数据驱动用例在执行时才读取数据行、生成完整用例
+        with profiler.span("materialize_case", "render"):
+            caseinfo = materialize_case(caseinfo)
+        # allure 用例标题title，可按需拓展模块等...
+        dynamicTitle(caseinfo)
+
+        try:
+            keywords = AsyncKeywords()
+            with profiler.span("bind_keywords", "dispatch"):
+                dispatch = KeywordRegistry.get(AsyncKeywords).bind(keywords)
+            with profiler.span("compile_case", "render"):
+                compiled = compile_case(caseinfo)
+            # 分层上下文 [步骤层, 用例变量, 分组作用域, 全局变量]
+            with profiler.span("case_scope", "context"):
+                context = g_context().scope(caseinfo.get("context", {}))
+
+            # 执行前置用例
+            pre_script = compiled["pre_script"](context)
+            if pre_script:
+                for script in _as_script_list(pre_script):
+                    with profiler.span("pre_script", "script"):
+                        run_script.exec_script(script, g_context().show_dict(), caseinfo)
+
+            for step_name, render_step in compiled["steps"]:
+                with profiler.span("new_step", "context"):
+                    step_context = context.new_step()
+                with profiler.span(step_name, "render"):
+                    step_value = render_step(step_context)
+                print(f"开始执行步骤：{step_name} - {step_value}")
+                with allure.step(step_name):
+                    key = step_value["关键字"]
+                    with profiler.span(key, "dispatch"):
+                        key_func = dispatch[key]
+                    with profiler.span(key, keyword_category(key), {"step": step_name}):
+                        if inspect.iscoroutinefunction(key_func):
+                            await key_func(**step_value)
+                        else:
+                            # 同步关键字（数据库、文件等）放到线程中执行，不阻塞其它用例
+                            await asyncio.to_thread(key_func, **step_value)
+
+            # 后置脚本执行
+            post_script = compiled["post_script"](context)
+            if post_script:
+                for script in _as_script_list(post_script):
+                    with profiler.span("post_script", "script"):
+                        run_script.exec_script(script, g_context().show_dict(), caseinfo)
+        finally:
+            print(f"========执行完毕：{caseinfo.get('_case_name')}========")
+
+    async def _run_case(self, caseinfo: dict[str, Any], semaphore: asyncio.Semaphore) -> None:
+        """执行用例并记录结果"""
+        async with semaphore:
+            result = self.recorder.start_case(caseinfo)
+            error = None
+            try:
+                await self.execute_case(caseinfo)
+            except Exception as e:
+                error = e
+                print(f"用例执行失败：{caseinfo.get('_case_name')} - {e!r}")
+            self.recorder.stop_case(result, error)
+
+        self.summary["total"] += 1
+        self.summary[result.status] = self.summary.get(result.status, 0) + 1
+
+    async def _run_group(self, cases: list[dict[str, Any]], semaphore: asyncio.Semaphore) -> None:
+        """按顺序执行同一分组的用例（隔离 Cookie 时每个用例使用独立客户端，默认隔离）"""
+        with g_context.isolated():
+            if SessionPool.config()["isolate_cookies"]:
+                for caseinfo in cases:
+                    async with AsyncClientPool.client():
+                        await self._run_case(caseinfo, semaphore)
+            else:
+                async with AsyncClientPool.client():
+                    for caseinfo in cases:
+                        await self._run_case(caseinfo, semaphore)
+
+    async def run(self, case_infos: list[dict[str, Any]]) -> dict[str, int]:
+        """
+        并发执行全部用例
+
+        :param case_infos: case_parser 返回的用例列表
+        :return: 执行统计 {"total", "passed", "failed", "broken"}
+        """
+        groups: dict[str, list[dict[str, Any]]] = {}
+        for caseinfo in case_infos:
+            groups.setdefault(case_group_key(caseinfo), []).append(caseinfo)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            await asyncio.gather(*(self._run_group(cases, semaphore) for cases in groups.values()))
+        finally:
+            await AsyncClientPool.close()
+            DbPool.close()
+        return self.summary
+
+
+def run_cases(cases_dir: str, results_dir: str, case_type: str = "yaml", key_dir: str | None = None,
+              concurrency: int = DEFAULT_CONCURRENCY, http_config: dict[str, Any] | None = None) -> int:
+    """
+    异步引擎入口：加载用例并执行，结果写入 Allure 结果目录
+
+    :param cases_dir: 用例目录
+    :param results_dir: Allure 结果目录
+    :param case_type: 用例类型 (yaml/excel)
+    :param key_dir: 拓展关键字目录
+    :param concurrency: 最大并发用例数
+    :param http_config: 覆盖 context.yaml 中 _http 节点的配置
+    :return: 退出码（全部通过为 0，否则为 1）
+    """
+    if not key_dir:
+        key_dir = str(Path(__file__).parent.parent / "extend" / "script")
+    g_context().set_dict("key_dir", key_dir)
+
+    data = case_parser(case_type, Path(cases_dir).resolve())
+    if http_config:
+        g_context().set_dict("_http", {**(g_context().get_dict("_http") or {}), **http_config})
+    for caseinfo in data["case_infos"]:
+        compile_case(case_template(caseinfo))
+    KeywordRegistry.get(AsyncKeywords)
+
+    recorder = AllureRecorder(results_dir)
+    recorder.register()
+    profiler.enable_from_env()
+    start = time.perf_counter()
+    try:
+        summary = asyncio.run(AsyncTestRunner(recorder, concurrency).run(data["case_infos"]))
+    finally:
+        recorder.unregister()
+        profiler.finish()
+
+    print(f"异步执行完成，耗时 {time.perf_counter() - start:.2f}s，统计: {summary}")
+    return 0 if summary["total"] == summary["passed"] else 1
@@ -1,7 +1,55 @@
 import os
 
+from .KeywordRegistry import KeywordRegistry
 from .globalContext import g_context
-from ..parse.CaseParser import case_parser
+from ..extend.keywords import Keywords
+from ..parse.CaseParser import case_group_key, case_parser, case_template
+from ..utils.DbPool import DbPool
+from ..utils.SessionPool import SessionPool
+from ..utils.StepProfiler import PROFILE_ENV, profiler
+from ..utils.VarRender import compile_case
+
+# HTTP 会话池命令行参数 -> context.yaml 中 _http 节点的配置项
+HTTP_OPTIONS = {
+    "http_pool_size": "pool_size",
+    "http_keep_alive": "keep_alive",
+    "http_retries": "max_retries",
+    "http_backoff": "backoff_factor",
+    "http_isolate_cookies": "isolate_cookies",
+}
+
+
+def shard_cases(data: dict[str, list], shard_index: int, shard_count: int) -> dict[str, list]:
+    """
+    按分组把用例分配到各分片
+
+    同一分组的用例落在同一分片并保持原有顺序（即文件名数字前缀顺序）。
+    分组规则见 case_group_key：数字前缀的用例文件默认在同一分组，可通过用例中的 shard_group 字段拆分为独立的分组。
+    每个 worker 用相同规则计算，结果一致。
+
+    :param data: case_parser 的返回值 {"case_infos": [...], "case_names": [...]}
+    :param shard_index: 当前分片序号
+    :param shard_count: 分片总数
+    :return: 当前分片的 {"case_infos": [...], "case_names": [...]}
+    """
+    groups: dict[str, list[int]] = {}
+    for idx, caseinfo in enumerate(data["case_infos"]):
+        groups.setdefault(case_group_key(caseinfo), []).append(idx)
+
+    # 大分组优先，依次放入当前用例数最少的分片
+    loads = [0] * shard_count
+    selected: list[int] = []
+    for indexes in sorted(groups.values(), key=len, reverse=True):
+        target = loads.index(min(loads))
+        loads[target] += len(indexes)
+        if target == shard_index:
+            selected.extend(indexes)
+
+    selected.sort()
+    return {
+        "case_infos": [data["case_infos"][i] for i in selected],
+        "case_names": [data["case_names"][i] for i in selected],
+    }
 
 
 class CasesPlugin:
@@ -26,6 +74,33 @@ class CasesPlugin:
         parser.addoption(
             "--keyDir", action="store", default=default_key_dir, help="拓展关键字目录"
         )
+        # HTTP 会话池配置（未指定时使用 context.yaml 中 _http 节点或默认值）
+        parser.addoption(
+            "--http-pool-size", action="store", default=None, help="每个主机的 HTTP 连接池大小"
+        )
+        parser.addoption(
+            "--http-keep-alive", action="store", default=None, help="是否保持长连接: true/false"
+        )
+        parser.addoption(
+            "--http-retries", action="store", default=None, help="请求失败重试次数"
+        )
+        parser.addoption(
+            "--http-backoff", action="store", default=None, help="重试退避系数（秒）"
+        )
+        parser.addoption(
+            "--http-isolate-cookies", action="store", default=None, help="是否按用例隔离 Cookie: true/false"
+        )
+        # 并行执行分片（由 cli 的 --workers 模式传入）
+        parser.addoption(
+            "--shard-index", action="store", default="0", help="当前分片序号（从 0 开始）"
+        )
+        parser.addoption(
+            "--shard-count", action="store", default="1", help="分片总数"
+        )
+        # 步骤耗时分析：输出各阶段耗时分布，并导出 Chrome Trace 到指定文件
+        parser.addoption(
+            "--profile", action="store", default=None, help="开启步骤耗时分析并导出 trace 文件路径（true 表示只输出耗时分布）"
+        )
 
     def pytest_generate_tests(self, metafunc):
         """
@@ -48,10 +123,43 @@ class CasesPlugin:
         # 读取测试用例 - 传递 Path 对象
         data = case_parser(case_type, cases_path)
 
+        # 命令行参数覆盖 context.yaml 中的 HTTP 配置（优先级：命令行 > context.yaml）
+        http_config = dict(g_context().get_dict("_http") or {})
+        for option, key in HTTP_OPTIONS.items():
+            if (value := metafunc.config.getoption(option)) is not None:
+                http_config[key] = value
+        g_context().set_dict("_http", http_config)
+
+        # 收集阶段预编译用例模板，执行时不再重复解析（数据驱动用例共享同一模板，只编译一次）
+        for caseinfo in data['case_infos']:
+            compile_case(case_template(caseinfo))
+        # 启动时构建关键字分发表（拓展关键字目录只扫描一次）
+        KeywordRegistry.get(Keywords)
+
+        # 并行模式：只执行分配给当前分片的用例
+        shard_count = int(metafunc.config.getoption("shard_count"))
+        if shard_count > 1:
+            data = shard_cases(data, int(metafunc.config.getoption("shard_index")), shard_count)
+
+        # 步骤耗时分析（命令行参数优先，其次环境变量 APIRUN_PROFILE），并行模式下每个分片写入单独的 trace 文件
+        if profile := metafunc.config.getoption("profile"):
+            os.environ[PROFILE_ENV] = profile
+        if not profiler.enabled and profiler.enable_from_env() and profiler.output and shard_count > 1:
+            output = Path(profiler.output)
+            profiler.output = str(output.with_name(f"{output.stem}-worker-{metafunc.config.getoption('shard_index')}{output.suffix}"))
+
         # 把测试用例作为参数化，交给 runner 执行
         if "caseinfo" in metafunc.fixturenames:
             metafunc.parametrize("caseinfo", data['case_infos'], ids=data['case_names'])
 
+    def pytest_sessionfinish(self, session, exitstatus):
+        """
+        测试结束后关闭 HTTP 会话池和数据库连接池，释放连接
+        """
+        SessionPool.close()
+        DbPool.close()
+        profiler.finish()
+
     def pytest_collection_modifyitems(self, items):
         """
         用例收集完毕之后被调用，可以用来调整测试用例执行顺序；同时可以解决测试用例标题的显示问题
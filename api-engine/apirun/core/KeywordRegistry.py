@@ -0,0 +1,207 @@
+"""
+关键字注册表
+启动时一次性建立 关键字名 -> 可调用对象 的分发表，执行步骤时直接查表，不再逐步 __getattribute__ + 动态 __import__
+
+关键字来源（同名时按顺序优先）：
+1. 内置关键字：Keywords 类（或其子类，如 AsyncKeywords）的公开方法
+2. 拓展关键字目录（--keyDir）：模块 xxx.py 中类 xxx 的方法 xxx
+3. 已安装的插件包：entry point 分组 apirun.keywords，指向关键字类（注册其全部公开方法）或函数（按 entry point 名称注册）
+
+    # 插件包的 setup.py
+    entry_points={"apirun.keywords": ["my_plugin = my_plugin.keywords:MyKeywords"]}
+"""
+import difflib
+import importlib
+import inspect
+import os
+import sys
+import threading
+from importlib.metadata import entry_points
+from typing import Any, Callable
+
+from .exceptions import KeywordNotFoundError
+from .globalContext import g_context
+
+# 插件关键字的 entry point 分组
+ENTRY_POINT_GROUP = "apirun.keywords"
+
+
+def _public_methods(cls: type) -> dict[str, Callable]:
+    """类的公开方法（未绑定）"""
+    return {name: func for name, func in inspect.getmembers(cls, inspect.isfunction) if not name.startswith("_")}
+
+
+class KeywordTable(dict):
+    """绑定到某个 Keywords 实例的分发表：关键字名 -> 已绑定的可调用对象，未命中时抛出 KeywordNotFoundError"""
+
+    def __init__(self, registry: "KeywordRegistry", table: dict[str, Callable]):
+        super().__init__(table)
+        self.registry = registry
+
+    def __missing__(self, name: str) -> Callable:
+        raise KeywordNotFoundError(self.registry._missing_message(name))
+
+
+class KeywordRegistry:
+    """关键字分发表 - 按 (内置关键字类, 拓展关键字目录) 缓存，进程内只构建一次"""
+
+    _registries: dict[tuple[type, str | None], "KeywordRegistry"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, keywords_cls: type, key_dir: str | None = None):
+        self.keywords_cls = keywords_cls
+        self.key_dir = key_dir
+        # 内置关键字：未绑定函数，执行时绑定到当前用例的 Keywords 实例
+        self._builtin: dict[str, Callable] = _public_methods(keywords_cls)
+        # 拓展/插件关键字：已绑定的可调用对象
+        self._plugins: dict[str, Callable] = {}
+        # 加载失败的模块/插件 -> 错误信息（查找失败时提示）
+        self.errors: dict[str, str] = {}
+        self._load_entry_points()
+        self._load_key_dir()
+
+    @classmethod
+    def get(cls, keywords_cls: type, key_dir: str | None = None) -> "KeywordRegistry":
+        """
+        获取关键字注册表（首次调用时构建）
+
+        :param keywords_cls: 内置关键字类
+        :param key_dir: 拓展关键字目录，默认取 g_context 中的 key_dir
+        :return: 注册表
+        """
+        if key_dir is None:
+            key_dir = g_context().get_dict("key_dir")
+        key = (keywords_cls, key_dir)
+        registry = cls._registries.get(key)
+        if registry is None:
+            with cls._lock:
+                registry = cls._registries.get(key)
+                if registry is None:
+                    registry = cls._registries[key] = cls(keywords_cls, key_dir)
+        return registry
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空已构建的注册表（拓展关键字文件变更后重新加载）"""
+        with cls._lock:
+            cls._registries.clear()
+
+    def _load_key_dir(self) -> None:
+        """加载拓展关键字目录：模块 xxx.py 中的类 xxx 提供关键字 xxx"""
+        if not self.key_dir or not os.path.isdir(self.key_dir):
+            return
+        if self.key_dir not in sys.path:
+            sys.path.append(self.key_dir)
+        for file_name in sorted(os.listdir(self.key_dir)):
+            name, ext = os.path.splitext(file_name)
+            if ext != ".py" or name.startswith("_") or name in self._builtin:
+                continue
+            try:
+                module = importlib.import_module(name)
+                class_ = getattr(module, name, None)
+                if inspect.isclass(class_) and hasattr(class_, name):
+                    self._plugins[name] = getattr(class_(), name)
+            except Exception as e:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+
+    def _load_entry_points(self) -> None:
+        """加载已安装插件包通过 entry point 声明的关键字"""
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                target = entry_point.load()
+                if inspect.isclass(target):
+                    instance = target()
+                    for name in _public_methods(target):
+                        self._plugins.setdefault(name, getattr(instance, name))
+                else:
+                    self._plugins.setdefault(entry_point.name, target)
+            except Exception as e:
+                self.errors[entry_point.name] = f"{type(e).__name__}: {e}"
+
+    @property
+    def names(self) -> list[str]:
+        """全部可用的关键字名称"""
+        return sorted({*self._builtin, *self._plugins})
+
+    def bind(self, keywords: Any) -> KeywordTable:
+        """
+        生成绑定到当前用例关键字实例的分发表（每个用例一次，步骤执行时只做一次字典查找）
+
+        :param keywords: 当前用例的内置关键字实例
+        :return: 分发表
+        """
+        table = dict(self._plugins)
+        table.update({name: func.__get__(keywords) for name, func in self._builtin.items()})
+        return KeywordTable(self, table)
+
+    def resolve(self, keywords: Any, name: str) -> Callable:
+        """
+        查找关键字
+
+        :param keywords: 当前用例的内置关键字实例
+        :param name: 关键字名称
+        :return: 可调用对象
+        :raises KeywordNotFoundError: 关键字不存在
+        """
+        func = self._builtin.get(name)
+        if func is not None:
+            return func.__get__(keywords)
+        func = self._plugins.get(name)
+        if func is not None:
+            return func
+        raise KeywordNotFoundError(self._missing_message(name))
+
+    def _missing_message(self, name: str) -> str:
+        """关键字不存在时的错误信息（含相近关键字建议和加载失败原因）"""
+        message = f"关键字不存在: {name}"
+        if suggestions := difflib.get_close_matches(str(name), self.names, n=3):
+            message += f"，是否为: {', '.join(suggestions)}"
+        if name in self.errors:
+            message += f"\n拓展关键字加载失败: {self.errors[name]}"
+        elif self.key_dir:
+            message += f"\n拓展关键字目录: {self.key_dir}"
+        return message
+
+
+def test_keyword_dispatch_benchmark(steps: int = 100000) -> None:
+    """
+    基准测试 - 对比每个步骤 __getattribute__ 查找与分发表查找的耗时
+
+    未命中时原实现每次都会追加 sys.path 并尝试 __import__，分发表只在构建时加载一次
+    """
+    import time
+
+    from ..extend.keywords import Keywords
+
+    keywords = Keywords()
+    names = ["send_request", "ex_jsonData", "assert_text_comparators", "run_script"]
+
+    start = time.perf_counter()
+    for i in range(steps):
+        keywords.__getattribute__(names[i % len(names)])
+    getattr_cost = (time.perf_counter() - start) / steps * 1e9
+
+    start = time.perf_counter()
+    registry = KeywordRegistry.get(Keywords)
+    build_cost = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    table = registry.bind(keywords)
+    bind_cost = (time.perf_counter() - start) * 1e6
+    for i in range(steps):
+        table[names[i % len(names)]]
+    table_cost = ((time.perf_counter() - start) * 1e9 - bind_cost * 1e3) / steps
+
+    start = time.perf_counter()
+    for i in range(steps // 100):
+        try:
+            table["send_requset"]
+        except KeywordNotFoundError:
+            pass
+    miss_cost = (time.perf_counter() - start) / (steps // 100) * 1e6
+
+    print(f"构建分发表: {build_cost:.2f} ms（进程内一次）")
+    print(f"绑定分发表: {bind_cost:.1f} us（每个用例一次）")
+    print(f"__getattribute__ 命中: {getattr_cost:.0f} ns/步")
+    print(f"分发表命中: {table_cost:.0f} ns/步")
+    print(f"分发表未命中（含建议）: {miss_cost:.1f} us/步")
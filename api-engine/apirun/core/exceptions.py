@@ -24,16 +24,28 @@ class KeywordError(EngineError):
     pass
 
 
+class KeywordNotFoundError(KeywordError):
+    """关键字不存在"""
+    pass
+
+
 class ContextError(EngineError):
     """上下文管理异常"""
     pass
 
 
+class ScriptLimitError(KeywordError):
+    """脚本超出资源限制（CPU 时间 / 内存）"""
+    pass
+
+
 __all__ = [
     "EngineError",
     "ParserError",
     "CaseNotFoundError",
     "KeywordError",
+    "KeywordNotFoundError",
     "ContextError",
+    "ScriptLimitError",
 ]
 
@@ -2,13 +2,56 @@
 全局上下文管理器
 用于在测试用例执行过程中共享数据
 """
-from typing import Any
+import copy
+from collections import ChainMap
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+
+class LayeredContext(ChainMap):
+    """
+    分层上下文 - 替代每个步骤对全局上下文的 deepcopy
+
+    层级从上到下依次为：步骤作用域 -> 用例作用域 -> 全局作用域，读取时逐层查找，无需拷贝。
+    写入只落在最上层，下层（用例变量、全局变量）不会被修改；
+    需要原地修改下层的可变对象时，使用 writable() 先拷贝到当前层（写时复制）。
+    """
+
+    def writable(self, key: str) -> Any:
+        """
+        获取可原地修改的值：若值位于下层，先深拷贝到当前层再返回
+
+        :param key: 键名
+        :return: 当前层中的值
+        """
+        top = self.maps[0]
+        if key not in top:
+            top[key] = copy.deepcopy(self[key])
+        return top[key]
+
+    def new_step(self) -> "LayeredContext":
+        """
+        创建新的步骤作用域（共享用例层和全局层）
+
+        :return: 新的分层上下文
+        """
+        return self.new_child()
+
+
+# 当前执行任务的隔离作用域（异步引擎中每个用例分组一个），未设置时直接读写全局上下文
+_isolated_scope: ContextVar[LayeredContext | None] = ContextVar("apirun_isolated_scope", default=None)
 
 
 class g_context:
     """全局上下文类 - 使用单例模式"""
     _dic: dict[str, Any] = {}  # 内置属性，外部不可修改
 
+    def _store(self) -> dict[str, Any] | LayeredContext:
+        """当前读写的存储：隔离作用域内为作用域本身，否则为全局字典"""
+        scope = _isolated_scope.get()
+        return self._dic if scope is None else scope
+
     def set_dict(self, key: str, value: Any) -> None:
         """
         设置上下文中的值
@@ -16,7 +59,7 @@ class g_context:
         :param key: 键名
         :param value: 值
         """
-        self._dic[key] = value
+        self._store()[key] = value
 
     def get_dict(self, key: str) -> Any | None:
         """
@@ -25,7 +68,7 @@ class g_context:
         :param key: 键名
         :return: 对应的值，如果不存在则返回 None
         """
-        return self._dic.get(key, None)
+        return self._store().get(key, None)
 
     def set_by_dict(self, dic: dict[str, Any]) -> None:
         """
@@ -33,15 +76,79 @@ class g_context:
         
         :param dic: 要更新的字典
         """
-        self._dic.update(dic)
+        self._store().update(dic)
 
     def show_dict(self) -> dict[str, Any]:
         """
         获取所有上下文数据
         
-        :return: 上下文数据字典
+        :return: 上下文数据字典（隔离作用域内为分层上下文）
         """
-        return self._dic
+        return self._store()
+
+    def scope(self, local_context: dict[str, Any] | None = None) -> LayeredContext:
+        """
+        基于全局上下文创建用例作用域视图（不拷贝数据，全局变量的后续修改实时可见）
+
+        :param local_context: 用例级变量，优先级高于全局变量
+        :return: 分层上下文 [用例写入层, 用例变量, 全局变量]
+        """
+        scope = _isolated_scope.get()
+        base = [self._dic] if scope is None else scope.maps
+        return LayeredContext({}, local_context or {}, *base)
+
+    @classmethod
+    @contextmanager
+    def isolated(cls) -> Iterator[LayeredContext]:
+        """
+        在当前任务中开启隔离作用域：写入只落在作用域内，读取时回落到全局上下文
+
+        用于并发执行的用例分组之间互不干扰（current_response、提取的变量等），
+        contextvars 保证同一线程内并发的 asyncio 任务各自拥有独立作用域。
+
+        :return: 隔离作用域
+        """
+        scope = LayeredContext({}, cls._dic)
+        token = _isolated_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _isolated_scope.reset(token)
+
+
+def test_layered_context_benchmark(sizes: tuple[int, ...] = (10, 100, 1000, 5000), steps: int = 200) -> None:
+    """
+    基准测试 - 对比每个步骤 deepcopy 全局上下文与分层上下文的耗时
+
+    分层上下文的单步耗时不随上下文变量数量增长
+    """
+    import time
+
+    from ..utils.VarRender import compile_value
+
+    step = compile_value({"关键字": "send_request", "url": "{{host}}/api/{{var_1}}", "headers": {"token": "{{token}}"}})
+    local_context = {"host": "http://127.0.0.1"}
+    original = g_context._dic
+
+    print(f"{'变量数':>8} {'deepcopy(us/步)':>18} {'分层上下文(us/步)':>20}")
+    try:
+        for size in sizes:
+            g_context._dic = {f"var_{i}": {"id": i, "items": list(range(10))} for i in range(size)}
+            g_context._dic["token"] = "token-value"
 
+            start = time.perf_counter()
+            for _ in range(steps):
+                context = copy.deepcopy(g_context().show_dict())
+                context.update(local_context)
+                step(context)
+            copy_cost = (time.perf_counter() - start) / steps * 1e6
 
+            start = time.perf_counter()
+            case_scope = g_context().scope(local_context)
+            for _ in range(steps):
+                step(case_scope.new_step())
+            layered_cost = (time.perf_counter() - start) / steps * 1e6
 
+            print(f"{size:>8} {copy_cost:>18.1f} {layered_cost:>20.1f}")
+    finally:
+        g_context._dic = original
@@ -0,0 +1,57 @@
+import asyncio
+
+import allure
+
+from .keywords import Keywords
+from ..utils.AsyncClientPool import AsyncClientPool
+from ..utils.RequestLog import RequestLog, httpx_trace, request_timing
+from ..utils.StepProfiler import profiler
+
+
+class AsyncKeywords(Keywords):
+    """
+    异步执行引擎使用的关键字类
+
+    send_request 基于 httpx.AsyncClient 发送请求，等待响应期间不阻塞其它用例；
+    其余关键字沿用 Keywords（由执行引擎放到线程中执行），current_response 等上下文变量含义不变。
+    """
+
+    async def send_request(self, **kwargs):
+        """
+        统一的 HTTP 请求关键字（异步版本），参数与 Keywords.send_request 相同
+
+        与 requests 的参数差异在这里转换：
+        - verify: 由共享连接池统一配置，忽略
+        - allow_redirects -> follow_redirects（默认跟随重定向，与 requests 一致）
+        - data 为字符串/字节时作为原始请求体发送
+        """
+        with allure.step("参数数据"):
+            kwargs, download = self._normalize_request_kwargs(kwargs)
+
+            # 处理文件上传（可能需要先下载远程文件）
+            if files := kwargs.get("files", []):
+                kwargs["files"] = await asyncio.to_thread(self.process_upload_files, files)
+
+            # 初始化请求数据（用于错误时显示）
+            request_data = self._initial_request_data(kwargs)
+
+            kwargs.pop("verify", None)
+            kwargs.setdefault("follow_redirects", kwargs.pop("allow_redirects", True))
+            if isinstance(kwargs.get("data"), (str, bytes)):
+                kwargs["content"] = kwargs.pop("data")
+
+            error = None
+            try:
+                with request_timing() as timing:
+                    # 通过 httpcore 的 trace 事件记录建连、TLS、首字节和下载耗时
+                    kwargs.setdefault("extensions", {})["trace"] = httpx_trace(timing)
+                    self.request = AsyncClientPool.current()
+                    with profiler.span(kwargs.get("method") or "request", "network"):
+                        response = await self.request.request(**kwargs)
+                    request_data = self._record_response(response, response.request.content, download)
+            except Exception as e:
+                request_data["response"] = str(e)
+                error = e
+                raise e
+            finally:
+                RequestLog.record(request_data, timing, error)
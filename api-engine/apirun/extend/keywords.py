@@ -1,16 +1,19 @@
 import json
 import mimetypes
 import os
-import re
 import time
 from urllib.parse import unquote
 from urllib.parse import urlencode
 
 import allure
-import jsonpath
-import requests
 
 from ..core.globalContext import g_context
+from ..utils.DbPool import DbPool
+from ..utils.Extractor import compile_jsonpath, compile_regex, response_json
+from ..utils.FileStream import file_config, hash_bytes, hash_files, hash_response, iter_response, write_chunks
+from ..utils.RequestLog import RequestLog, request_timing
+from ..utils.SessionPool import SessionPool
+from ..utils.StepProfiler import profiler
 
 class Keywords:
     """
@@ -22,7 +25,6 @@ class Keywords:
     
     request = None
 
-    @allure.step("参数数据")
     def send_request(self, **kwargs):
         """
         统一的 HTTP 请求关键字
@@ -35,11 +37,50 @@ class Keywords:
         - data/DATA: 表单数据 (form-urlencoded)
         - json: JSON 数据
         - files/FILES: 上传文件
-        - download: 是否下载响应内容到文件 (True/False)
+        - download: 是否下载响应内容到文件 (True/False)，下载时流式写入文件并同时计算哈希
         - timeout: 超时时间
+
+        连接按目标主机复用（见 SessionPool，可通过 context.yaml 的 _http 节点配置）
+        请求/响应记录到请求日志（见 RequestLog，可通过 context.yaml 的 _log 节点配置）
+        """
+        with allure.step("参数数据"):
+            kwargs, download = self._normalize_request_kwargs(kwargs)
+
+            # 处理文件上传
+            if files := kwargs.get("files", []):
+                kwargs["files"] = self.process_upload_files(files)
+
+            # 初始化请求数据（用于错误时显示）
+            request_data = self._initial_request_data(kwargs)
+
+            error = None
+            try:
+                with request_timing() as timing:
+                    # 禁用 SSL 验证以避免网络环境问题
+                    kwargs.setdefault("verify", False)
+                    if download:
+                        # 下载时不预先读取响应体，由 save_response_content 分块写入文件
+                        kwargs.setdefault("stream", True)
+                    self.request = SessionPool.get_session(kwargs.get("url", ""))
+                    with profiler.span(kwargs.get("method") or "request", "network"):
+                        response = self.request.request(**kwargs)
+                    # requests 的 elapsed 为收到响应头的耗时
+                    timing.headers_at = timing.start + response.elapsed.total_seconds()
+                    request_data = self._record_response(response, response.request.body, download)
+            except Exception as e:
+                request_data["response"] = str(e)
+                error = e
+                raise e
+            finally:
+                # 结构化请求日志（截断、采样、后台写入），默认不打印完整报文
+                RequestLog.record(request_data, timing, error)
+
+    def _normalize_request_kwargs(self, kwargs):
+        """
+        整理请求参数：剔除关键字字段、兼容大写参数名
+
+        :return: (请求参数, 是否下载响应)
         """
-        self.request = requests.Session()
-        
         # 剔除不需要的字段
         kwargs.pop("关键字", None)
         download = kwargs.pop("download", False)  # 是否下载响应
@@ -65,17 +106,14 @@ class Keywords:
         if files_param and "files" not in kwargs:
             kwargs["files"] = files_param
 
-        # 处理文件上传
-        files = kwargs.get("files", [])
-        if files:
-            files = self.process_upload_files(files)
-            kwargs["files"] = files
+        return kwargs, download
 
-        # 初始化请求数据（用于错误时显示）
+    def _initial_request_data(self, kwargs):
+        """请求发出前的请求数据（请求失败时用于显示）"""
         params_val = kwargs.get("params") or {}
         params_str = urlencode(params_val) if params_val else ""
         url_with_params = f'{kwargs.get("url", "")}?{params_str}' if params_str else kwargs.get("url", "")
-        request_data = {
+        return {
             "url": unquote(url_with_params),
             "method": kwargs.get("method", "GET"),
             "headers": kwargs.get("headers", ""),
@@ -83,49 +121,68 @@ class Keywords:
             "response": ""
         }
 
-        try:
-            # 禁用 SSL 验证以避免网络环境问题
-            kwargs.setdefault("verify", False)
-            response = self.request.request(**kwargs)
-            g_context().set_dict("current_response", response)
-            # 设置 status_code 变量供断言使用
-            g_context().set_dict("status_code", str(response.status_code))
-
-            # 解析 URL 参数
-            from urllib.parse import urlparse, parse_qs
-            parsed_url = urlparse(response.url)
-            url_params = parse_qs(parsed_url.query)
-            params_dict = {k: v[0] if len(v) == 1 else v for k, v in url_params.items()}
-            
-            # 组装请求数据
-            request_data = {
-                "url": unquote(response.url),
-                "method": response.request.method,
-                "headers": dict(response.request.headers),
-                "params": params_dict,
-                "body": str(response.request.body) if response.request.body else "",
-                "response": response.text,
-                "status_code": response.status_code,
-                "response_headers": dict(response.headers)
+    def _record_response(self, response, request_body, download=False):
+        """
+        记录响应到上下文（current_response / status_code / current_response_data）
+
+        :param response: 响应对象（requests 或 httpx）
+        :param request_body: 实际发送的请求体
+        :param download: 是否下载响应内容
+        :return: 组装后的请求数据
+        """
+        g_context().set_dict("current_response", response)
+        # 设置 status_code 变量供断言使用
+        g_context().set_dict("status_code", str(response.status_code))
+
+        # 解析 URL 参数
+        from urllib.parse import urlparse, parse_qs
+        response_url = str(response.url)
+        parsed_url = urlparse(response_url)
+        url_params = parse_qs(parsed_url.query)
+        params_dict = {k: v[0] if len(v) == 1 else v for k, v in url_params.items()}
+
+        # 如果需要下载响应内容（先于读取响应文本，二进制内容按流写入文件）
+        download_info = {}
+        if download:
+            file_path, digest = self._save_response_content(response)
+            download_info = {
+                "download_path": file_path,
+                "download_hash": digest,
+                "download_algorithm": file_config()["algorithm"],
             }
-            
-            # 如果需要下载响应内容
-            if download:
-                file_path = self.save_response_content(response)
-                request_data["download_path"] = file_path
-                
-            g_context().set_dict("current_response_data", request_data)
-            
-        except Exception as e:
-            request_data["response"] = str(e)
-            raise e
-        finally:
-            print("-----------current_response_data------------")
-            print(request_data)
-            print("----------end current_response_data-------------")
 
+        try:
+            response_text = response.text
+        except RuntimeError:
+            # 响应体已流式写入文件，不再保留在内存中
+            response_text = f"<响应内容已下载到 {download_info['download_path']}>"
+        
+        # 组装请求数据
+        request_data = {
+            "url": unquote(response_url),
+            "method": response.request.method,
+            "headers": dict(response.request.headers),
+            "params": params_dict,
+            "body": str(request_body) if request_body else "",
+            "response": response_text,
+            "status_code": response.status_code,
+            "response_headers": dict(response.headers),
+            **download_info,
+        }
+
+        g_context().set_dict("current_response_data", request_data)
+        return request_data
 
     def save_response_content(self, response, download_dir="/downloads"):
+        """保存响应内容到文件，返回文件路径"""
+        return self._save_response_content(response, download_dir)[0]
+
+    def _save_response_content(self, response, download_dir="/downloads"):
+        """
+        保存响应内容到文件，写入的同时计算哈希（算法见 _file 配置）
+
+        :return: (文件路径, 哈希值)
+        """
         # 创建下载目录（如果不存在）
         if not os.path.exists(download_dir):
             os.makedirs(download_dir)
@@ -136,10 +193,9 @@ class Keywords:
         if "application/json" in content_type:
             # 处理JSON数据
             file_path = os.path.join(download_dir, f"response_{timestamp}.json")
-            with open(file_path, "w", encoding="utf-8") as f:
-                json_data = response.json()
-                f.write(json.dumps(json_data, ensure_ascii=False, indent=2))
-            return file_path
+            json_data = response_json(response)
+            content = json.dumps(json_data, ensure_ascii=False, indent=2).encode("utf-8")
+            return file_path, write_chunks([content], file_path)
 
         elif "application/octet-stream" in content_type:
             # 处理二进制文件
@@ -152,18 +208,12 @@ class Keywords:
                 filename = f"file_{timestamp}.bin"
 
             file_path = os.path.join(download_dir, filename)
-            with open(file_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=1024):
-                    if chunk:
-                        f.write(chunk)
-            return file_path
+            return file_path, write_chunks(iter_response(response), file_path)
         else:
             # 不管是什么生成一个text文件
             print("未知文件类型")
             file_path = os.path.join(download_dir, f"response_{timestamp}.txt")
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(response.text)
-            return file_path
+            return file_path, write_chunks([response.text.encode("utf-8")], file_path)
 
 
     def process_upload_files(self, file_list):
@@ -190,7 +240,7 @@ class Keywords:
                 # 判断是否是 URL
                 if file_path.startswith(('http://', 'https://')):
                     try:
-                        response = requests.get(file_path, stream=True)
+                        response = SessionPool.get_session(file_path).get(file_path, stream=True)
                         response.raise_for_status()
 
                         # 提取文件名（从URL）
@@ -202,10 +252,7 @@ class Keywords:
                         local_path = os.path.join(download_dir, filename)
 
                         # 写入本地文件
-                        with open(local_path, 'wb') as f:
-                            for chunk in response.iter_content(chunk_size=1024):
-                                if chunk:
-                                    f.write(chunk)
+                        write_chunks(iter_response(response), local_path)
 
                         file_path = local_path  # 替换为本地路径
                     except Exception as e:
@@ -243,14 +290,12 @@ class Keywords:
         """
         # 获取JsonPath的值
         EXPRESSION = kwargs.get("EXVALUE", None)
-        # 获取对应的下标，非必填，默认为0字符串
-        INDEX = str(kwargs.get("INDEX", "0"))
-        #  判断INDEX 是不是数字 ，如果是则变成整形，如果不是则为0
-        INDEX = int(INDEX) if INDEX.isdigit() else 0
+        # 获取对应的下标，非必填，默认为0
+        INDEX = self._json_index(kwargs.get("INDEX", "0"))
 
-        # 获取响应数据
-        response = g_context().get_dict("current_response").json()
-        ex_data = jsonpath.jsonpath(response, EXPRESSION)[INDEX]  # 通过JsonPath进行提取
+        # 获取响应数据（同一响应只解析一次 JSON）
+        response = response_json(g_context().get_dict("current_response"))
+        ex_data = compile_jsonpath(EXPRESSION).extract(response)[INDEX]  # 通过JsonPath进行提取
         g_context().set_dict(kwargs["VARNAME"], ex_data)  # 根据变量名设置成全局变量
         print("-----------------------")
         print(g_context().show_dict())
@@ -342,83 +387,37 @@ class Keywords:
         # 获取响应数据
         response = g_context().get_dict("current_response").text
         # 使用findall方法找到所有匹配的结果，返回一个列表
-        ex_data = re.findall(EXPRESSION, response)[INDEX]  # 通过正则表达进行提取
+        ex_data = compile_regex(EXPRESSION).findall(response)[INDEX]  # 通过正则表达进行提取
         g_context().set_dict(kwargs["VARNAME"], ex_data)  # 根据变量名设置成全局变量
         print("-----------------------")
         print(g_context().show_dict())
         print("-----------------------")
 
-    # ==================== Python 脚本执行 ====================
-
-    @allure.step("执行Python脚本: {script_path}")
-    def run_script(self, **kwargs):
+    @allure.step("参数数据")
+    def ex_multiData(self, **kwargs):
         """
-        执行 Python 脚本文件
-        
-        参数:
-            script_path: 脚本文件路径（绝对路径或相对于用例目录的路径）
-            function_name: 要调用的函数名（可选，如果不指定则执行整个脚本）
-            variable_name: 保存返回值到变量（可选）
-            其他参数: 将作为函数参数传递
+        一次提取多个变量（JSON 只解析一次，表达式均使用编译缓存）
+        提取列表：[{VARNAME: 变量名, EXVALUE: 表达式, INDEX: 下标(非必填，默认0), TYPE: json/re(非必填，默认json)}, ...]
         """
-        from .script.run_script import exec_script_file
-        
-        script_path = kwargs.pop("script_path", None)
-        function_name = kwargs.pop("function_name", None)
-        variable_name = kwargs.pop("variable_name", None)
-        kwargs.pop("关键字", None)
-        
-        if not script_path:
-            raise ValueError("必须指定 script_path 参数")
-        
-        # 获取上下文
-        context = g_context().show_dict()
-        
-        # 执行脚本
-        result = exec_script_file(
-            script_path=script_path,
-            context=context,
-            caseinfo=None,
-            function_name=function_name,
-            **kwargs
-        )
-        
-        # 保存返回值
-        if variable_name and result is not None:
-            g_context().set_dict(variable_name, result)
-            print(f"脚本返回值已保存到变量 {variable_name}: {result}")
-        
-        return result
+        current_response = g_context().get_dict("current_response")
+        variables = {}
+        for item in kwargs["提取列表"]:
+            if item.get("TYPE", "json") == "re":
+                ex_data = compile_regex(item["EXVALUE"]).findall(current_response.text)[item.get("INDEX") or 0]
+            else:
+                index = self._json_index(item.get("INDEX", "0"))
+                ex_data = compile_jsonpath(item["EXVALUE"]).extract(response_json(current_response))[index]
+            variables[item["VARNAME"]] = ex_data
+        g_context().set_by_dict(variables)  # 所有变量一次写入全局变量
+        print("-----------------------")
+        print(variables)
+        print("-----------------------")
 
-    @allure.step("执行Python代码")
-    def run_code(self, **kwargs):
-        """
-        执行 Python 代码片段
-        
-        参数:
-            code: Python 代码字符串
-            variable_name: 保存返回值到变量（可选，代码中使用 __result__ = xxx 设置返回值）
-        """
-        from .script.run_script import exec_script
-        
-        code = kwargs.get("code", "")
-        variable_name = kwargs.get("variable_name")
-        
-        if not code:
-            raise ValueError("必须指定 code 参数")
-        
-        # 获取上下文
-        context = g_context().show_dict()
-        
-        # 执行代码
-        result = exec_script(code, context)
-        
-        # 保存返回值
-        if variable_name and result is not None:
-            g_context().set_dict(variable_name, result)
-            print(f"代码返回值已保存到变量 {variable_name}: {result}")
-        
-        return result
+    @staticmethod
+    def _json_index(index):
+        """JSON 提取下标：判断 INDEX 是不是数字，如果是则变成整形，如果不是则为0"""
+        index = str(index)
+        return int(index) if index.isdigit() else 0
 
     @allure.step("参数数据")
     def ex_mysqlData(self, **kwargs):
@@ -432,22 +431,37 @@ class Keywords:
 
         存储到全局变量：{“变量名_下标”:数据}
         """
-        import pymysql
-        from pymysql import cursors
-        config = {"cursorclass": cursors.DictCursor}
-        # 读取全局变量 - 根据选择的数据 读取指定的数据库配置 连接对应的数据库
-        db_config = g_context().get_dict("_database")[kwargs["数据库"]]
-        config.update(db_config)
-
-        con = pymysql.connect(**config)
-        cur = con.cursor()
-        cur.execute(kwargs["SQL"])
-        rs = cur.fetchall()
-        cur.close()
-        con.close()
+        # 连接按数据库配置名复用（见 DbPool）
+        rs = DbPool.query(kwargs["数据库"], kwargs["SQL"])
         print("数据库查询结果:", rs)
 
-        var_names = kwargs.get("引用变量",  [])
+        g_context().set_by_dict(self._bind_query_result(rs, kwargs.get("引用变量", [])))
+
+    @allure.step("参数数据")
+    def ex_mysqlBatch(self, **kwargs):
+        """
+        数据库: 数据库的名称
+        查询列表：多条查询，每项为 {SQL: 查询语句, 引用变量: [变量名...]}，也可以直接写 SQL 字符串
+
+        所有 SQL 在同一连接上一次发送（多语句模式），结果按 ex_mysqlData 的规则生成变量后一次性写入全局变量
+        """
+        queries = [{"SQL": query} if isinstance(query, str) else query for query in kwargs["查询列表"]]
+        results = DbPool.query_batch(kwargs["数据库"], [query["SQL"] for query in queries])
+
+        variables = {}
+        for query, rs in zip(queries, results):
+            print(f"数据库查询结果: {query['SQL']} -> {rs}")
+            variables.update(self._bind_query_result(rs, query.get("引用变量", [])))
+        g_context().set_by_dict(variables)
+
+    def _bind_query_result(self, rs, var_names):
+        """
+        把查询结果转换为变量：{"变量名_下标": 数据}
+
+        如果 var_names 为空，则默认使用数据库字段名生成变量。
+        如果 var_names 有数据，则检查其长度是否与每条记录中的字段数量一致，若一致则生成对应格式的数据；否则抛出错误提示。
+        """
+        var_names = var_names or []
         result = {}
 
         if not var_names:
@@ -465,7 +479,7 @@ class Keywords:
             for idx, item in enumerate(rs, start=1):
                 for col_idx, key in enumerate(item):
                     result[f"{var_names[col_idx]}_{idx}"] = item[key]
-        g_context().set_by_dict(result)
+        return result
 
     @allure.step("参数数据")
     def assert_text_comparators(self, **kwargs):
@@ -510,29 +524,28 @@ class Keywords:
         :param data: bytes 数据
         :return: MD5 字符串
         """
-        import hashlib
-
-        hash_md5 = hashlib.md5()
-        hash_md5.update(data)
-        return hash_md5.hexdigest()
+        return hash_bytes(data, "md5")
 
     @allure.step("参数数据")
     def assert_files_by_md5_comparators(self, **kwargs):
         """
         value (Any): 要比较的值。
         expected (Any): 预期的值。
+        algorithm (str, optional): 哈希算法 md5/sha256/xxhash，默认 md5。
         """
         # 获取: 预期的值
         value_md5 = kwargs.get("value", None)
+        algorithm = kwargs.get("algorithm", None) or "md5"
         # 获取：实际数据
         response = g_context().get_dict("current_response")
 
         if response.status_code == 200:
-            # 获取响应的二进制内容
-            file_content = response.content
-
-            # 直接计算 MD5
-            remote_md5 = self.get_md5_from_bytes(file_content)
+            # 下载时已边写边计算过哈希的直接复用，否则分块计算响应体哈希
+            response_data = g_context().get_dict("current_response_data") or {}
+            if response_data.get("download_hash") and response_data.get("download_algorithm") == algorithm:
+                remote_md5 = response_data["download_hash"]
+            else:
+                remote_md5 = hash_response(response, algorithm)
 
             # 如果你还想和本地文件比对
             if value_md5 == remote_md5:
@@ -551,78 +564,36 @@ class Keywords:
         print(g_context().show_dict())
         print("-----------------------")
 
-    # ==================== Python 脚本执行 ====================
-
-    @allure.step("执行Python脚本: {script_path}")
-    def run_script(self, **kwargs):
-        """
-        执行 Python 脚本文件
-        
-        参数:
-            script_path: 脚本文件路径（绝对路径或相对于用例目录的路径）
-            function_name: 要调用的函数名（可选，如果不指定则执行整个脚本）
-            variable_name: 保存返回值到变量（可选）
-            其他参数: 将作为函数参数传递
+    @allure.step("参数数据")
+    def assert_files_by_hash_comparators(self, **kwargs):
         """
-        from .script.run_script import exec_script_file
-        
-        script_path = kwargs.pop("script_path", None)
-        function_name = kwargs.pop("function_name", None)
-        variable_name = kwargs.pop("variable_name", None)
-        kwargs.pop("关键字", None)
-        
-        if not script_path:
-            raise ValueError("必须指定 script_path 参数")
-        
-        # 获取上下文
-        context = g_context().show_dict()
-        
-        # 执行脚本
-        result = exec_script_file(
-            script_path=script_path,
-            context=context,
-            caseinfo=None,
-            function_name=function_name,
-            **kwargs
-        )
-        
-        # 保存返回值
-        if variable_name and result is not None:
-            g_context().set_dict(variable_name, result)
-            print(f"脚本返回值已保存到变量 {variable_name}: {result}")
-        
-        return result
+        批量比对文件哈希，所有文件并行计算（线程数见 _file 配置的 workers）
 
-    @allure.step("执行Python代码")
-    def run_code(self, **kwargs):
-        """
-        执行 Python 代码片段
-        
         参数:
-            code: Python 代码字符串
-            variable_name: 保存返回值到变量（可选，代码中使用 __result__ = xxx 设置返回值）
+            文件列表: [{actual: 实际文件路径, expected: 预期文件路径或哈希值}, ...]
+            algorithm: 哈希算法 md5/sha256/xxhash（可选，默认使用 _file 配置）
         """
-        from .script.run_script import exec_script
-        
-        code = kwargs.get("code", "")
-        variable_name = kwargs.get("variable_name")
-        
-        if not code:
-            raise ValueError("必须指定 code 参数")
-        
-        # 获取上下文
-        context = g_context().show_dict()
-        
-        # 执行代码
-        result = exec_script(code, context)
-        
-        # 保存返回值
-        if variable_name and result is not None:
-            g_context().set_dict(variable_name, result)
-            print(f"代码返回值已保存到变量 {variable_name}: {result}")
-        
-        return result
-
-
-
-
+        pairs = kwargs.get("文件列表") or []
+        algorithm = kwargs.get("algorithm", None) or file_config()["algorithm"]
+        if not pairs:
+            raise ValueError("文件列表不能为空")
+
+        # 收集需要计算哈希的文件（expected 为已存在的文件路径时按文件比对，否则视为哈希值）
+        paths = []
+        for pair in pairs:
+            paths.append(pair["actual"])
+            if os.path.isfile(str(pair["expected"])):
+                paths.append(pair["expected"])
+        paths = list(dict.fromkeys(paths))
+        digests = dict(zip(paths, hash_files(paths, algorithm)))
+
+        failures = []
+        for pair in pairs:
+            actual = digests[pair["actual"]]
+            expected = digests.get(pair["expected"], str(pair["expected"]).lower())
+            if actual != expected:
+                failures.append(f"    {pair['actual']}: {actual} != {pair['expected']}: {expected}")
+
+        if failures:
+            raise AssertionError(f"❌ {len(failures)}/{len(pairs)} 个文件内容不一致（{algorithm}）\n" + "\n".join(failures))
+        print(f"✅ {len(pairs)} 个文件内容一致（{algorithm}）")
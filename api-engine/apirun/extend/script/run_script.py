@@ -2,18 +2,40 @@
 脚本执行器
 支持执行前置和后置脚本，以及在步骤中执行 Python 脚本文件
 """
+import builtins
 import os
 import importlib.util
-from typing import Any, Callable
+import types
+from typing import Any, Callable, Mapping
 
+from ...utils.ScriptSandbox import compile_file, compile_source, run_limited
 
-def exec_script(script_code: str | None, context: dict[str, Any], 
+
+class _ContextBuiltins(dict):
+    """
+    脚本的内置命名空间：名称查找时先查上下文，再查 Python 内置函数
+
+    上下文变量无需逐个复制到 exec 的全局命名空间，支持普通 dict 和分层上下文 LayeredContext。
+    脚本中定义的函数、推导式同样可以读取上下文变量。
+    """
+
+    def __init__(self, context: Mapping[str, Any]):
+        super().__init__(vars(builtins))
+        self._context = context
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._context:
+            return self._context[key]
+        return super().__getitem__(key)
+
+
+def exec_script(script_code: str | None, context: Mapping[str, Any],
                 caseinfo: dict[str, Any] | None = None) -> Any:
     """
     执行 Python 脚本代码
     
     :param script_code: 脚本代码字符串
-    :param context: 上下文字典
+    :param context: 上下文（dict 或分层上下文），脚本中可直接按变量名读取
     :param caseinfo: 用例信息字典（可选）
     :return: 脚本执行结果（如果有）
     """
@@ -24,20 +46,18 @@ def exec_script(script_code: str | None, context: dict[str, Any],
         # 导入 g_context 类，使其在脚本中可用
         from ...core.globalContext import g_context
 
-        # 构建脚本执行的全局命名空间
+        # 构建脚本执行的全局命名空间（上下文变量通过内置命名空间按需查找，不做拷贝）
         exec_globals = {
             'g_context': g_context,  # 注入 g_context 类
             'context': context,  # 注入 context 字典
             'caseinfo': caseinfo if caseinfo is not None else {},  # 注入 caseinfo 变量
-            '__builtins__': __builtins__,  # 保留内置函数
+            '__builtins__': _ContextBuiltins(context),  # 上下文变量 + 内置函数
             '__result__': None,  # 用于存储返回值
         }
 
-        # 将 context 字典的内容也添加到全局命名空间
-        exec_globals.update(context)
-
-        # 执行脚本
-        exec(script_code, exec_globals)
+        # 执行脚本（编译结果按内容缓存，CPU 时间/内存受 _script 配置限制）
+        code = compile_source(script_code)
+        run_limited(lambda: exec(code, exec_globals), name=script_code[:50])
         print(f"脚本执行成功: {script_code[:50]}...")
         return exec_globals.get('__result__')
     except Exception as e:
@@ -74,28 +94,36 @@ def exec_script_file(script_path: str, context: dict[str, Any],
         if not os.path.exists(script_path):
             raise FileNotFoundError(f"脚本文件不存在: {script_path}")
         
-        # 动态加载模块
+        # 创建模块（编译结果按文件缓存，文件未修改时不再重新读取和编译）
         module_name = os.path.splitext(os.path.basename(script_path))[0]
-        spec = importlib.util.spec_from_file_location(module_name, script_path)
-        module = importlib.util.module_from_spec(spec)
+        module = types.ModuleType(module_name)
+        module.__file__ = script_path
         
         # 注入上下文到模块
         module.g_context = g_context
         module.context = context
         module.caseinfo = caseinfo if caseinfo is not None else {}
         
-        # 执行模块
-        spec.loader.exec_module(module)
-        
-        # 如果指定了函数名，调用该函数
-        if function_name:
-            if not hasattr(module, function_name):
-                raise AttributeError(f"脚本中未找到函数: {function_name}")
+        code = compile_file(script_path)
+
+        def run_module():
+            # 执行模块
+            exec(code, module.__dict__)
             
-            func: Callable = getattr(module, function_name)
-            # 合并上下文和额外参数
-            call_kwargs = {**context, **kwargs}
-            result = func(**call_kwargs)
+            # 如果指定了函数名，调用该函数
+            if function_name:
+                if not hasattr(module, function_name):
+                    raise AttributeError(f"脚本中未找到函数: {function_name}")
+                
+                func: Callable = getattr(module, function_name)
+                # 合并上下文和额外参数
+                call_kwargs = {**context, **kwargs}
+                return func(**call_kwargs)
+            return None
+
+        # CPU 时间/内存受 _script 配置限制
+        result = run_limited(run_module, name=script_path)
+        if function_name:
             print(f"函数执行成功: {function_name}")
             return result
         
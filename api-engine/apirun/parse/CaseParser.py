@@ -5,6 +5,7 @@
 from pathlib import Path
 from typing import Any
 
+from .DdtSource import DdtRow
 from .ExcelCaseParser import excel_case_parser
 from .YamlCaseParser import yaml_case_parser
 from ..core.exceptions import ParserError
@@ -32,6 +33,58 @@ def case_parser(case_type: str, case_dir: Path) -> dict[str, list[Any]]:
             raise ParserError(f"不支持的用例类型: {case_type}")
 
 
+def case_group_key(caseinfo: dict[str, Any]) -> str:
+    """
+    用例分组键：同一分组的用例需按顺序在同一执行单元中运行（共享提取的变量）
+
+    - 优先使用用例中的 shard_group 字段
+    - 同一目录中文件名以数字开头的用例文件默认为同一分组，保持数字前缀顺序（如 2_order 依赖 1_login 提取的 token）；
+      互不依赖的文件设置不同的 shard_group 后才会分到不同的执行单元并行执行
+    - 其它用例按来源文件分组（数据驱动展开的用例在一起），最后为用例名
+
+    :param caseinfo: 用例信息字典
+    :return: 分组键
+    """
+    if group := caseinfo.get("shard_group"):
+        return str(group)
+    if case_file := caseinfo.get("_case_file"):
+        path = Path(case_file)
+        # 数字前缀文件按前缀顺序依次执行（后面的文件可能用到前面文件提取的变量），同一目录的放在一起
+        return f"{path.parent}/*" if path.name.split("_")[0].isdigit() else str(path)
+    return str(caseinfo.get("_case_name"))
+
+
+def materialize_case(caseinfo: dict[str, Any]) -> dict[str, Any]:
+    """
+    生成可执行的完整用例：数据驱动用例在收集阶段只是模板 + 数据行的引用，执行前在这里合并
+
+    用例模板（步骤、脚本、预编译结果）由同一文件的所有数据行共享，只有 context 是每行独立的
+
+    :param caseinfo: 用例信息（普通用例原样返回）
+    :return: 完整用例信息
+    """
+    if (template := caseinfo.get("_ddt_template")) is None:
+        return caseinfo
+
+    row = caseinfo["_ddt_row"]
+    if isinstance(row, DdtRow):
+        row = row.load()
+    case = {**template, **{k: v for k, v in caseinfo.items() if not k.startswith("_ddt_")}}
+    # 合并上下文 - 使用 | 操作符
+    case["context"] = template.get("context", {}) | row
+    return case
+
+
+def case_template(caseinfo: dict[str, Any]) -> dict[str, Any]:
+    """
+    获取用例模板（用于预编译：同一文件的数据驱动用例只编译一次）
+
+    :param caseinfo: 用例信息
+    :return: 数据驱动用例返回共享的模板，普通用例返回自身
+    """
+    return caseinfo.get("_ddt_template", caseinfo)
+
+
 def test_yaml_case_parser() -> None:
     """单元测试 - 检查 yaml_case_parser 方法的正确性"""
     data = case_parser("yaml", Path("../../examples"))
@@ -0,0 +1,125 @@
+"""
+数据驱动（ddts）数据源
+ddts 除了在 YAML 中内联列表，也可以引用外部 CSV/JSONL 文件：
+
+    ddts: data/users.csv                  # 按后缀识别格式（.csv / .jsonl / .ndjson）
+    ddts:
+      file: data/users.jsonl
+      format: jsonl                       # 可选，默认按后缀识别
+      encoding: utf-8                     # 可选
+      delimiter: ","                      # 可选，仅 CSV
+
+外部文件在收集阶段只流式扫描一遍，记录每行的字节偏移和 desc（用于用例名称），
+执行用例时再按偏移读取该行数据，不在内存中保留全部行。
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+from ..core.exceptions import ParserError
+
+# 文件后缀 -> 数据格式
+DDT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+class DdtFile:
+    """外部数据驱动文件"""
+
+    __slots__ = ("path", "format", "encoding", "delimiter", "header")
+
+    def __init__(self, path: Path, format: str, encoding: str = "utf-8", delimiter: str = ","):
+        self.path = str(path)
+        self.format = format
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.header: list[str] | None = None  # CSV 表头，扫描时读取
+
+    def _csv_records(self, f, offset: int) -> Iterator[tuple[int, list[str]]]:
+        """从偏移处逐条读取 CSV 记录，返回 (记录起始偏移, 字段列表)，支持引号内换行"""
+        position = offset
+
+        def lines() -> Iterator[str]:
+            nonlocal position
+            for raw in f:
+                position += len(raw)
+                yield raw.decode(self.encoding)
+
+        reader = csv.reader(lines(), delimiter=self.delimiter)
+        start = offset
+        for record in reader:
+            yield start, record
+            start = position
+
+    def scan(self) -> Iterator[tuple[int, str | None]]:
+        """
+        流式扫描所有数据行
+
+        :return: 迭代 (行偏移, 行的 desc 值)
+        """
+        with open(self.path, "rb") as f:
+            if self.format == "csv":
+                records = self._csv_records(f, 0)
+                _, header = next(records, (0, []))
+                # 兼容 Excel 导出的带 BOM 的 UTF-8 文件
+                self.header = [name.lstrip("\ufeff") for name in header]
+                desc_index = self.header.index("desc") if "desc" in self.header else None
+                for offset, record in records:
+                    if not any(record):
+                        continue
+                    yield offset, record[desc_index] if desc_index is not None and desc_index < len(record) else None
+            else:
+                offset = 0
+                for raw in f:
+                    if raw.strip():
+                        yield offset, json.loads(raw).get("desc")
+                    offset += len(raw)
+
+    def read_row(self, offset: int) -> dict[str, Any]:
+        """
+        读取指定偏移处的一行数据
+
+        :param offset: scan 返回的行偏移
+        :return: 行数据字典（CSV 的值均为字符串，JSONL 保留 JSON 类型）
+        """
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            if self.format == "csv":
+                _, record = next(self._csv_records(f, offset))
+                return dict(zip(self.header, record))
+            return json.loads(f.readline())
+
+
+class DdtRow:
+    """外部文件中一行数据的引用（文件 + 偏移），执行时才读取"""
+
+    __slots__ = ("source", "offset")
+
+    def __init__(self, source: DdtFile, offset: int):
+        self.source = source
+        self.offset = offset
+
+    def load(self) -> dict[str, Any]:
+        return self.source.read_row(self.offset)
+
+
+def load_ddt_file(spec: str | dict[str, Any], base_dir: Path) -> DdtFile:
+    """
+    解析 ddts 的外部文件配置
+
+    :param spec: 文件路径，或 {"file": 路径, "format": ..., "encoding": ..., "delimiter": ...}
+    :param base_dir: 相对路径的基准目录（用例文件所在目录）
+    :return: 数据文件对象
+    :raises ParserError: 文件不存在或格式不支持
+    """
+    options = {"file": spec} if isinstance(spec, str) else dict(spec)
+    path = Path(options["file"])
+    if not path.is_absolute():
+        path = base_dir / path
+    if not path.exists():
+        raise ParserError(f"数据驱动文件不存在: {path}")
+
+    data_format = options.get("format") or DDT_FORMATS.get(path.suffix.lower())
+    if data_format not in ("csv", "jsonl"):
+        raise ParserError(f"不支持的数据驱动文件格式: {path}")
+    return DdtFile(path.resolve(), data_format, options.get("encoding", "utf-8"), options.get("delimiter", ","))
@@ -1,32 +1,49 @@
 import ast
 import json
 import os
+from pathlib import Path
 
-import pandas as pd
 import yaml
+from openpyxl import load_workbook
 
 from ..core.globalContext import g_context
+from ..utils.CaseCache import CaseCache
 
 
 # 获取以context开头 .xlsx结尾的内容，并放入到公共参数中去!
 # 公共参数处理逻辑
-# openpyxl是pandas用于读取.xlsx文件的引擎之一
-# pip install pandas openpyxl
+# 使用 openpyxl 只读模式流式读取（不构建 DataFrame，大文件也只占用少量内存）
+# pip install openpyxl
+
+def read_sheet_rows(file_path):
+    """
+    流式读取第一个工作表，第一行作为表头
+
+    :return: 每行一个字典 {表头: 单元格值}，空单元格为 None，全空行跳过
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return []
+        header = [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        return [dict(zip(header, row)) for row in rows if any(value is not None for value in row)]
+    finally:
+        workbook.close()
+
 
 def load_context_from_excel(folder_path):
     try:
         excel_file_path = os.path.join(folder_path, 'context.xlsx')
 
-        # 读取Excel文件
-        df = pd.read_excel(excel_file_path)
-
         # 初始化一个空字典来存储结果
         data = {
             "_database": {}
         }
 
-        # 遍历DataFrame的每一行
-        for index, row in df.iterrows():
+        # 遍历每一行
+        for row in read_sheet_rows(excel_file_path):
             if row['类型'] == '变量':
                 # 如果Type是“变量”，则将Description作为键，Value作为值添加到result字典中
                 data[row['变量描述']] = row['变量值']
@@ -43,6 +60,66 @@ def load_context_from_excel(folder_path):
         return False
 
 
+def parse_excel_file(file_path, keywords_info):
+    """
+    解析单个 Excel 用例文件（一个文件可包含多个用例，以“测试用例标题”列划分）
+
+    :return: 用例信息列表
+    """
+    file_name = os.path.basename(file_path)
+    excel_caseInfos = []
+    # 初始化一个空字典来存储当前正在构建的测试用例
+    current_test_case = None
+
+    # 循环结束代表一个Excel用例结束
+    for row in read_sheet_rows(file_path):
+        # 检查当前行是否包含有效的测试用例标题
+        if row.get('测试用例标题') is not None:
+            # 如果存在正在构建的测试用例，则将其添加到结果列表中
+            if current_test_case is not None:
+                excel_caseInfos.append(current_test_case)
+                # 初始化一个新的测试用例字典
+            current_test_case = {
+                "desc": row['测试用例标题'],
+                "用例等级": "" if row.get('用例等级') is None else str(row['用例等级']),
+                "steps": [],
+                "_case_file": file_name  # 来源文件，用于并行执行时的分片分组
+            }
+            # 总是添加步骤（假设步骤编号是连续的，并且不跳过）
+
+        step = {
+            row['步骤描述']: {
+                "关键字": str(row['关键字']),
+            }
+
+        }
+        # 遍历得到所有的参数，并且结合关键字描述变成字典加到对应的步骤中
+        parameter = []
+        for key, value in row.items():
+            if "参数_" in key:
+                try:
+                    # 尝试将字符串转换为Python对象
+                    value = ast.literal_eval(value)
+                except:
+                    print("当前即是一个普通的字符串格式")
+                parameter.append(value)
+
+        # 变成字典格式
+        dict_parameter = {k: v for k, v in zip(keywords_info[row['关键字']], parameter)}
+
+        # 把对应的数据加到对应的步骤中
+        step[row['步骤描述']].update(dict_parameter)
+
+        # 将步骤添加到当前测试用例中
+        current_test_case['steps'].append(step)
+
+    # 不要忘记添加最后一个测试用例（如果有的话）
+    if current_test_case is not None:
+        excel_caseInfos.append(current_test_case)
+
+    return excel_caseInfos
+
+
 def load_excel_files(config_path):
     excel_caseInfos = []
     # 扫描 文件夹下的excel
@@ -51,72 +128,27 @@ def load_excel_files(config_path):
     file_names = [(int(f.split("_")[0]), f) for f in os.listdir(suite_folder) if
                   f.endswith(".xlsx") and f.split("_")[0].isdigit()]
     file_names.sort()
-    file_names = [f[-1] for f in file_names]
+    file_paths = [Path(suite_folder) / f[-1] for f in file_names]
 
     # 因为需要excel的参数一一对应起来关键字，所以需要结合：keywords.yaml中的参数描述变成字典格式。
-    keywords_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'extend', 'keywords.yaml')
-    keywords_info = {}
-    with open(keywords_file_path, "r", encoding='utf-8') as rfile:
-        keywords_info = yaml.full_load(rfile)
+    keywords_file_path = Path(__file__).resolve().parent.parent / 'extend' / 'keywords.yaml'
+    keywords_info = None
 
-    # 获取 suite 文件夹下的所有 Excel 文件，并按文件名排序
-    for file_name in file_names:
-        file_path = os.path.join(suite_folder, file_name)
-        #  以字典的格式读出
-        data = pd.read_excel(file_path, sheet_name=0)
-        data = data.where(data.notnull(), None)  # 将非空数据保留，空数据用None替换
-        data = data.to_dict(orient='records')
-
-        # 初始化一个空列表来存储转换后的数据
-        result = []
-        # 初始化一个空字典来存储当前正在构建的测试用例
-        current_test_case = None
-
-        # 循环结束代表一个Excel用例结束
-        for row in data:
-            # 检查当前行是否包含有效的测试用例标题
-            if pd.notna(row['测试用例标题']):
-                # 如果存在正在构建的测试用例，则将其添加到结果列表中
-                if current_test_case is not None:
-                    excel_caseInfos.append(current_test_case)
-                    # 初始化一个新的测试用例字典
-                current_test_case = {
-                    "desc": row['测试用例标题'],
-                    "用例等级": "" if pd.isna(row['用例等级']) else str(row['用例等级']),
-                    "steps": []
-                }
-                # 总是添加步骤（假设步骤编号是连续的，并且不跳过）
-
-            step = {
-                row['步骤描述']: {
-                    "关键字": str(row['关键字']),
-                }
-
-            }
-            # 遍历得到所有的参数，并且结合关键字描述变成字典加到对应的步骤中
-            parameter = []
-            for key, value in row.items():
-                if "参数_" in key:
-                    try:
-                        # 尝试将字符串转换为Python对象
-                        value = ast.literal_eval(value)
-                    except:
-                        print("当前即是一个普通的字符串格式")
-                    parameter.append(value)
-
-            # 变成字典格式
-            dict_parameter = {k: v for k, v in zip(keywords_info[row['关键字']], parameter)}
-
-            # 把对应的数据加到对应的步骤中
-            step[row['步骤描述']].update(dict_parameter)
-
-            # 将步骤添加到当前测试用例中
-            current_test_case['steps'].append(step)
-
-            # 不要忘记添加最后一个测试用例（如果有的话）
-        if current_test_case is not None:
-            excel_caseInfos.append(current_test_case)
+    # 解析结果按文件缓存（keywords.yaml 变化时缓存整体失效）
+    cache = CaseCache(Path(suite_folder), "excel", depends_on=(keywords_file_path,))
 
+    # 获取 suite 文件夹下的所有 Excel 文件，并按文件名排序
+    for file_path in file_paths:
+        cases = cache.get(file_path)
+        if cases is None:
+            if keywords_info is None:
+                with open(keywords_file_path, "r", encoding='utf-8') as rfile:
+                    keywords_info = yaml.full_load(rfile)
+            cases = parse_excel_file(file_path, keywords_info)
+            cache.put(file_path, cases)
+        excel_caseInfos.extend(cases)
+
+    cache.save(file_paths)
     return excel_caseInfos
 
 
@@ -2,19 +2,23 @@
 YAML 用例解析器
 负责加载和解析 YAML 格式的测试用例
 """
-import copy
 import uuid
 from pathlib import Path
 from typing import Any, TypeAlias
 
 import yaml
 
+from .DdtSource import DdtRow, load_ddt_file
 from ..core.globalContext import g_context
+from ..utils.CaseCache import CaseCache
 
 # 类型别名
 CaseDict: TypeAlias = dict[str, Any]
 CaseList: TypeAlias = list[CaseDict]
 
+# 优先使用 libyaml 的 C 实现（解析速度快一个数量级），未安装 libyaml 时回退纯 Python 实现
+_YamlLoader = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
 
 def load_context_from_yaml(folder_path: Path) -> bool:
     """
@@ -31,7 +35,7 @@ def load_context_from_yaml(folder_path: Path) -> bool:
             return False
             
         with yaml_file_path.open('r', encoding='utf-8') as file:
-            data = yaml.load(file, Loader=yaml.FullLoader)
+            data = yaml.load(file, Loader=_YamlLoader)
             print("加载context.yaml内容:", data)
             if data: 
                 g_context().set_by_dict(data)
@@ -41,6 +45,35 @@ def load_context_from_yaml(folder_path: Path) -> bool:
         return False
 
 
+def _list_case_files(config_path: Path) -> list[Path]:
+    """
+    获取目录下的 YAML 用例文件（文件名以数字开头），按数字前缀排序
+
+    :param config_path: 用例目录路径（Path对象）
+    :return: 用例文件列表
+    """
+    return sorted(
+        [f for f in config_path.iterdir() 
+         if f.suffix == ".yaml" and f.stem.split("_")[0].isdigit()],
+        key=lambda f: int(f.stem.split("_")[0])
+    )
+
+
+def load_yaml_file(file_path: Path) -> CaseDict | None:
+    """
+    加载单个 YAML 用例文件
+
+    :param file_path: 用例文件路径
+    :return: 用例信息，文件为空时返回 None
+    """
+    with file_path.open("r", encoding='utf-8') as f:
+        caseinfo = yaml.load(f, Loader=_YamlLoader)
+    if caseinfo:
+        # 记录来源文件，用于并行执行时的分片分组
+        caseinfo["_case_file"] = file_path.name
+    return caseinfo
+
+
 def load_yaml_files(config_path: Path) -> CaseList:
     """
     加载指定目录下的所有 YAML 测试用例文件
@@ -53,27 +86,72 @@ def load_yaml_files(config_path: Path) -> CaseList:
     # 保存用例目录路径到全局上下文，供文件上传等功能使用
     g_context().set_dict("_cases_dir", str(config_path.resolve()))
     
-    # 一步完成：筛选、排序 YAML 文件
-    sorted_files = sorted(
-        [f for f in config_path.iterdir() 
-         if f.suffix == ".yaml" and f.stem.split("_")[0].isdigit()],
-        key=lambda f: int(f.stem.split("_")[0])
-    )
-    
-    # 加载并过滤文件（确保文件句柄正确关闭）
-    case_list = []
-    for file_path in sorted_files:
-        with file_path.open("r", encoding='utf-8') as f:
-            caseinfo = yaml.full_load(f)
-            if caseinfo:
-                case_list.append(caseinfo)
-    
-    return case_list
+    return [caseinfo for file_path in _list_case_files(config_path) if (caseinfo := load_yaml_file(file_path))]
+
+
+def _lazy_case(template: CaseDict, case_name: str, row: dict[str, Any] | DdtRow) -> CaseDict:
+    """
+    数据驱动用例的轻量引用：只保存用例模板和数据行的引用，执行时由 materialize_case 生成完整用例
+
+    模板由同一文件的所有数据行共享，不再逐行 deepcopy
+    """
+    lazy_case = {"_case_name": case_name, "_ddt_template": template, "_ddt_row": row}
+    # 分组/分片需要的字段直接放在引用上
+    for key in ("_case_file", "shard_group"):
+        if key in template:
+            lazy_case[key] = template[key]
+    return lazy_case
+
+
+def expand_case(caseinfo: CaseDict, base_dir: Path | None = None) -> list[tuple[str, CaseDict]]:
+    """
+    展开单个用例文件：有 ddts 节点时按每组数据生成一个用例引用
+
+    ddts 可以是内联列表，也可以引用外部 CSV/JSONL 文件（见 DdtSource）
+
+    :param caseinfo: 用例文件内容
+    :param base_dir: 外部数据文件相对路径的基准目录（用例文件所在目录）
+    :return: [(用例名称, 用例信息), ...]
+    """
+    # 使用海象操作符 - 读取 DDTS 节点并生成多组测试用例
+    if ddts := caseinfo.get("ddts"):
+        caseinfo.pop("ddts")
+        case_desc = caseinfo.get("desc", uuid.uuid4().__str__())
+        cases = []
+        if isinstance(ddts, list):
+            # 内联数据 - 引用 YAML 中已加载的数据行
+            for ddt in ddts:
+                case_name = f'{case_desc}-{ddt.get("desc", uuid.uuid4().__str__())}'
+                cases.append((case_name, _lazy_case(caseinfo, case_name, ddt)))
+        else:
+            # 外部数据文件 - 只记录每行的偏移
+            ddt_file = load_ddt_file(ddts, base_dir or Path.cwd())
+            for offset, row_desc in ddt_file.scan():
+                case_name = f'{case_desc}-{row_desc or uuid.uuid4().__str__()}'
+                cases.append((case_name, _lazy_case(caseinfo, case_name, DdtRow(ddt_file, offset))))
+        return cases
+
+    # 单个用例 - 使用match解构获取desc
+    match caseinfo:
+        case {"desc": desc}:
+            case_name = desc
+        case _:
+            case_name = uuid.uuid4().__str__()
+
+    caseinfo["_case_name"] = case_name
+    return [(case_name, caseinfo)]
+
+
+def _ddt_depends(cases: list[tuple[str, CaseDict]]) -> tuple[Path, ...]:
+    """展开结果引用的外部数据驱动文件（用于缓存失效判断）"""
+    return tuple({Path(row.source.path) for _, case in cases if isinstance(row := case.get("_ddt_row"), DdtRow)})
 
 
 def yaml_case_parser(config_path: Path) -> dict[str, list[Any]]:
     """
     解析 YAML 格式的测试用例
+
+    解析并展开后的用例按文件缓存（见 CaseCache），未修改的文件不再重新解析
     
     :param config_path: 用例目录路径（Path对象）
     :return: 包含用例信息和用例名称的字典 {"case_infos": [...], "case_names": [...]}
@@ -81,33 +159,23 @@ def yaml_case_parser(config_path: Path) -> dict[str, list[Any]]:
     case_infos: CaseList = []
     case_names: list[str] = []
 
-    # 获取符合条件的 YAML 文件列表
-    yaml_caseInfos = load_yaml_files(config_path)
+    load_context_from_yaml(config_path)
+    # 保存用例目录路径到全局上下文，供文件上传等功能使用
+    g_context().set_dict("_cases_dir", str(config_path.resolve()))
 
-    for caseinfo in yaml_caseInfos:
-        # 使用海象操作符 - 读取 DDTS 节点并生成多组测试用例
-        if (ddts := caseinfo.get("ddts")) and len(ddts) > 0:
-            caseinfo.pop("ddts")
-            # 数据驱动测试 - 生成多个用例
-            for ddt in ddts:
-                new_case = copy.deepcopy(caseinfo)
-                # 合并上下文 - 使用 | 操作符
-                new_case["context"] = new_case.get("context", {}) | ddt
-                # 生成用例名称
-                case_name = f'{caseinfo.get("desc", uuid.uuid4().__str__())}-{ddt.get("desc", uuid.uuid4().__str__())}'
-                new_case["_case_name"] = case_name
-                case_infos.append(new_case)
-                case_names.append(case_name)
-        else:
-            # 单个用例 - 使用match解构获取desc
-            match caseinfo:
-                case {"desc": desc}:
-                    case_name = desc
-                case _:
-                    case_name = uuid.uuid4().__str__()
-            
-            caseinfo["_case_name"] = case_name
+    cache = CaseCache(config_path, "yaml")
+    case_files = _list_case_files(config_path)
+    for file_path in case_files:
+        cases = cache.get(file_path)
+        if cases is None:
+            caseinfo = load_yaml_file(file_path)
+            cases = expand_case(caseinfo, file_path.parent) if caseinfo else []
+            cache.put(file_path, cases, depends_on=_ddt_depends(cases))
+
+        for case_name, caseinfo in cases:
             case_infos.append(caseinfo)
             case_names.append(case_name)
 
+    cache.save(case_files)
+    print(f"用例解析完成: {len(case_infos)} 条，缓存命中 {cache.hits}/{len(case_files)} 个文件")
     return {"case_infos": case_infos, "case_names": case_names}
@@ -0,0 +1,155 @@
+"""
+Allure 结果记录器（不依赖 pytest）
+供异步执行引擎使用：接收 allure.step / allure.attach / allure.dynamic 的调用，生成与 allure-pytest 相同格式的结果文件。
+每个用例的记录状态保存在 contextvars 中，多个用例并发执行时互不干扰。
+"""
+import os
+import platform
+import threading
+from contextvars import ContextVar
+from typing import Any
+
+import allure_commons
+from allure_commons.logger import AllureFileLogger
+from allure_commons.model2 import (Attachment, Label, Link, Parameter, Status, StatusDetails, TestResult,
+                                   TestStepResult)
+from allure_commons.types import AttachmentType, LabelType
+from allure_commons.utils import format_exception, format_traceback, md5, now, represent, uuid4
+
+# 当前用例的记录栈：[TestResult, 步骤, 子步骤, ...]
+_current_items: ContextVar[list | None] = ContextVar("apirun_allure_items", default=None)
+
+
+def _status_of(exc_type: type | None) -> str:
+    """根据异常类型得到 Allure 状态：断言失败为 failed，其它异常为 broken"""
+    if exc_type is None:
+        return Status.PASSED
+    return Status.FAILED if issubclass(exc_type, AssertionError) else Status.BROKEN
+
+
+def _status_details(exc_type: type | None, exc_val: BaseException | None, exc_tb: Any) -> StatusDetails | None:
+    if exc_type is None:
+        return None
+    return StatusDetails(message=format_exception(exc_type, exc_val), trace=format_traceback(exc_tb))
+
+
+class AllureRecorder:
+    """Allure 结果记录器 - 注册到 allure_commons 插件管理器后生效"""
+
+    def __init__(self, results_dir: str):
+        self.logger = AllureFileLogger(results_dir)
+
+    def register(self) -> None:
+        allure_commons.plugin_manager.register(self)
+
+    def unregister(self) -> None:
+        allure_commons.plugin_manager.unregister(self)
+
+    def start_case(self, caseinfo: dict[str, Any]) -> TestResult:
+        """
+        开始记录一个用例（需在该用例所在的任务中调用）
+
+        :param caseinfo: 用例信息字典
+        :return: 用例结果对象
+        """
+        case_name = caseinfo.get("_case_name") or caseinfo.get("desc") or "unnamed"
+        full_name = f'{caseinfo.get("_case_file", "")}#{case_name}'
+        result = TestResult(uuid=uuid4(), name=case_name, fullName=full_name, historyId=md5(full_name),
+                            start=now())
+        result.labels.extend([
+            Label(name=LabelType.FRAMEWORK, value="apirun"),
+            Label(name=LabelType.HOST, value=platform.node()),
+            Label(name=LabelType.THREAD, value=f"{os.getpid()}-{threading.current_thread().name}"),
+        ])
+        if case_file := caseinfo.get("_case_file"):
+            result.labels.append(Label(name=LabelType.SUITE, value=case_file))
+        _current_items.set([result])
+        return result
+
+    def stop_case(self, result: TestResult, exc: BaseException | None = None) -> None:
+        """
+        结束记录并写出结果文件
+
+        :param result: start_case 返回的用例结果对象
+        :param exc: 用例执行中抛出的异常（成功为 None）
+        """
+        exc_type = type(exc) if exc is not None else None
+        result.status = _status_of(exc_type)
+        result.statusDetails = _status_details(exc_type, exc, exc.__traceback__ if exc else None)
+        result.stop = now()
+        _current_items.set(None)
+        self.logger.report_result(result)
+
+    def _items(self) -> list | None:
+        return _current_items.get()
+
+    def _attach(self, name: str | None, attachment_type: Any, extension: str | None) -> str | None:
+        """在当前步骤（或用例）上登记附件，返回附件文件名"""
+        items = self._items()
+        if not items:
+            return None
+        mime_type = attachment_type
+        if isinstance(attachment_type, AttachmentType):
+            extension = attachment_type.extension
+            mime_type = attachment_type.mime_type
+        file_name = f"{uuid4()}-attachment.{extension or 'attach'}"
+        items[-1].attachments.append(Attachment(name=name, source=file_name, type=mime_type))
+        return file_name
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        if items := self._items():
+            step = TestStepResult(name=title, start=now(),
+                                  parameters=[Parameter(name=k, value=v) for k, v in params.items()])
+            items[-1].steps.append(step)
+            items.append(step)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        items = self._items()
+        if items and len(items) > 1:
+            step = items.pop()
+            step.status = _status_of(exc_type)
+            step.statusDetails = _status_details(exc_type, exc_val, exc_tb)
+            step.stop = now()
+
+    @allure_commons.hookimpl
+    def attach_data(self, body, name, attachment_type, extension):
+        if file_name := self._attach(name, attachment_type, extension):
+            self.logger.report_attached_data(body=body, file_name=file_name)
+
+    @allure_commons.hookimpl
+    def attach_file(self, source, name, attachment_type, extension):
+        if file_name := self._attach(name, attachment_type, extension):
+            self.logger.report_attached_file(source=source, file_name=file_name)
+
+    @allure_commons.hookimpl
+    def add_title(self, test_title):
+        if items := self._items():
+            items[0].name = test_title
+
+    @allure_commons.hookimpl
+    def add_description(self, test_description):
+        if items := self._items():
+            items[0].description = test_description
+
+    @allure_commons.hookimpl
+    def add_description_html(self, test_description_html):
+        if items := self._items():
+            items[0].descriptionHtml = test_description_html
+
+    @allure_commons.hookimpl
+    def add_label(self, label_type, labels):
+        if items := self._items():
+            items[0].labels.extend(Label(name=label_type, value=value) for value in labels)
+
+    @allure_commons.hookimpl
+    def add_link(self, url, link_type, name):
+        if items := self._items():
+            items[0].links.append(Link(type=link_type, url=url, name=name))
+
+    @allure_commons.hookimpl
+    def add_parameter(self, name, value, excluded, mode):
+        if items := self._items():
+            items[0].parameters.append(Parameter(name=name, value=represent(value), excluded=excluded or None,
+                                                 mode=mode.value if mode else None))
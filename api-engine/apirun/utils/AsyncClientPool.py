@@ -0,0 +1,77 @@
+"""
+异步 HTTP 客户端池（httpx）
+所有 AsyncClient 共享同一个连接池（transport），每个用例分组/用例只创建轻量的客户端以隔离 Cookie
+"""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+import httpx
+
+from .SessionPool import SessionPool
+
+
+class _SharedTransport(httpx.AsyncHTTPTransport):
+    """共享的连接池：客户端关闭时不关闭连接池，由 AsyncClientPool.close 统一释放"""
+
+    async def aclose(self) -> None:
+        pass
+
+    async def close_pool(self) -> None:
+        await super().aclose()
+
+
+class AsyncClientPool:
+    """异步 HTTP 客户端池 - 配置与 SessionPool 相同（context.yaml 的 _http 节点）"""
+
+    _transport: _SharedTransport | None = None
+    _current: ContextVar[httpx.AsyncClient | None] = ContextVar("apirun_async_client", default=None)
+
+    @classmethod
+    def _get_transport(cls) -> _SharedTransport:
+        """获取共享连接池，不存在则按配置创建"""
+        if cls._transport is None:
+            config = SessionPool.config()
+            limits = httpx.Limits(
+                max_connections=None,  # 总连接数由执行引擎的并发数控制
+                max_keepalive_connections=config["pool_size"] if config["keep_alive"] else 0,
+            )
+            # httpx 的重试只针对连接失败，不支持按状态码重试
+            cls._transport = _SharedTransport(verify=False, limits=limits, retries=config["max_retries"])
+        return cls._transport
+
+    @classmethod
+    @asynccontextmanager
+    async def client(cls) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        创建绑定到当前任务的客户端（关键字中通过 current() 获取）
+
+        :return: httpx.AsyncClient
+        """
+        headers = {} if SessionPool.config()["keep_alive"] else {"Connection": "close"}
+        # 与 requests 保持一致：默认不超时，可在步骤中通过 timeout 指定
+        async with httpx.AsyncClient(transport=cls._get_transport(), headers=headers, timeout=None) as client:
+            token = cls._current.set(client)
+            try:
+                yield client
+            finally:
+                cls._current.reset(token)
+
+    @classmethod
+    def current(cls) -> httpx.AsyncClient:
+        """
+        获取当前任务的客户端
+
+        :return: httpx.AsyncClient
+        """
+        client = cls._current.get()
+        if client is None:
+            raise RuntimeError("当前任务没有可用的异步 HTTP 客户端，请在 AsyncClientPool.client() 中执行")
+        return client
+
+    @classmethod
+    async def close(cls) -> None:
+        """关闭共享连接池，释放连接"""
+        if cls._transport is not None:
+            await cls._transport.close_pool()
+            cls._transport = None
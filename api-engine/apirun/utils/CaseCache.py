@@ -0,0 +1,126 @@
+"""
+用例解析缓存
+把解析并展开（数据驱动）后的用例按来源文件缓存到用例目录下，文件未修改时直接复用，跳过 YAML/Excel 解析
+"""
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+# 缓存格式版本：解析逻辑或缓存结构变化时递增，旧缓存自动失效
+CACHE_VERSION = 2
+
+# 缓存目录（位于用例目录下）
+CACHE_DIR_NAME = ".apirun_cache"
+
+# 设置该环境变量为 1/true 时禁用缓存
+DISABLE_ENV = "APIRUN_NO_CASE_CACHE"
+
+
+def _file_signature(file_path: Path) -> tuple[int, int]:
+    """文件签名：(修改时间 ns, 文件大小)"""
+    stat = file_path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CaseCache:
+    """
+    单个用例目录的解析缓存（一个目录一个缓存文件，加载一次即可校验所有用例文件）
+
+    缓存项以 (文件名, 修改时间, 文件大小) 为键，文件被修改、替换或删除后对应缓存项失效。
+    缓存读写失败（目录只读、文件损坏等）时静默回退为正常解析。
+    """
+
+    def __init__(self, cases_dir: Path, kind: str, depends_on: tuple[Path, ...] = ()):
+        """
+        :param cases_dir: 用例目录
+        :param kind: 用例类型（yaml/excel），不同类型使用不同的缓存文件
+        :param depends_on: 影响解析结果的其它文件（如 keywords.yaml），任一变化时整个缓存失效
+        """
+        self.enabled = os.environ.get(DISABLE_ENV, "").lower() not in ("1", "true", "yes")
+        self.cache_file = cases_dir / CACHE_DIR_NAME / f"{kind}_cases.pickle"
+        self.depends = tuple((str(path), _file_signature(path)) for path in depends_on if path.exists())
+        self.entries: dict[str, tuple[tuple[int, int], Any, tuple]] = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.cache_file.open("rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"用例缓存读取失败，重新解析: {e}")
+            return
+        if data.get("version") == CACHE_VERSION and data.get("depends") == self.depends:
+            self.entries = data.get("entries", {})
+
+    def get(self, file_path: Path) -> Any | None:
+        """
+        获取文件的缓存解析结果
+
+        :param file_path: 用例文件路径
+        :return: 缓存的解析结果，未命中返回 None
+        """
+        if not self.enabled:
+            return None
+        entry = self.entries.get(file_path.name)
+        if entry is not None and entry[0] == _file_signature(file_path) and self._depends_valid(entry[2]):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    @staticmethod
+    def _depends_valid(depends: tuple) -> bool:
+        """缓存项依赖的外部文件（如数据驱动的 CSV/JSONL）均未变化"""
+        try:
+            return all(_file_signature(Path(path)) == signature for path, signature in depends)
+        except OSError:
+            return False
+
+    def put(self, file_path: Path, value: Any, depends_on: tuple[Path, ...] = ()) -> None:
+        """
+        记录文件的解析结果（调用 save 后写入磁盘）
+
+        :param file_path: 用例文件路径
+        :param value: 解析结果（需可被 pickle 序列化）
+        :param depends_on: 该用例文件引用的其它文件，任一变化时缓存项失效
+        """
+        if self.enabled:
+            depends = tuple((str(path), _file_signature(path)) for path in depends_on)
+            self.entries[file_path.name] = (_file_signature(file_path), value, depends)
+            self.dirty = True
+
+    def save(self, file_paths: list[Path]) -> None:
+        """
+        写入缓存文件，同时清理已不存在的用例文件的缓存项
+
+        :param file_paths: 本次解析的全部用例文件
+        """
+        if not self.enabled:
+            return
+        names = {path.name for path in file_paths}
+        if stale := self.entries.keys() - names:
+            for name in stale:
+                del self.entries[name]
+            self.dirty = True
+        if not self.dirty:
+            return
+
+        data = {"version": CACHE_VERSION, "depends": self.depends, "entries": self.entries}
+        tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_file.parent.mkdir(exist_ok=True)
+            with tmp_file.open("wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # 原子替换，并行 worker 同时写入时不会产生损坏的缓存
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"用例缓存写入失败（不影响执行）: {e}")
+            tmp_file.unlink(missing_ok=True)
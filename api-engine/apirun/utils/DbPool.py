@@ -0,0 +1,148 @@
+"""
+数据库连接池
+按 context.yaml / context.xlsx 中 _database 的配置名复用 pymysql 连接，避免每次查询都重新建立连接
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import pymysql
+from pymysql import cursors
+from pymysql.constants import CLIENT
+
+from ..core.globalContext import g_context
+
+
+class DbPool:
+    """数据库连接池 - 进程内共享，按数据库配置名划分"""
+
+    MAX_IDLE = 5             # 每个数据库保留的空闲连接数
+    PING_INTERVAL = 30       # 空闲超过该秒数的连接，取出时先做健康检查
+
+    # (配置名, 是否多语句) -> 空闲连接队列 [(连接, 归还时间)]
+    _pools: dict[tuple[str, bool], queue.LifoQueue] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_pool(cls, key: tuple[str, bool]) -> queue.LifoQueue:
+        pool = cls._pools.get(key)
+        if pool is None:
+            with cls._lock:
+                pool = cls._pools.setdefault(key, queue.LifoQueue())
+        return pool
+
+    @classmethod
+    def _connect(cls, name: str, multi_statements: bool) -> pymysql.connections.Connection:
+        """按 _database 中的配置创建连接"""
+        databases = g_context().get_dict("_database") or {}
+        if name not in databases:
+            raise KeyError(f"未配置数据库: {name}，请在 context 的 _database 中添加")
+        config = {"cursorclass": cursors.DictCursor, **databases[name]}
+        if multi_statements:
+            config["client_flag"] = config.get("client_flag", 0) | CLIENT.MULTI_STATEMENTS
+        return pymysql.connect(**config)
+
+    @classmethod
+    def _healthy(cls, con: pymysql.connections.Connection, idle_since: float) -> bool:
+        """健康检查：长时间空闲的连接先 ping（断开时自动重连），失败则丢弃"""
+        if time.monotonic() - idle_since < cls.PING_INTERVAL:
+            return con.open
+        try:
+            con.ping(reconnect=True)
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    @contextmanager
+    def connection(cls, name: str, multi_statements: bool = False) -> Iterator[pymysql.connections.Connection]:
+        """
+        从连接池获取连接，使用完毕后归还
+
+        归还前回滚未提交的事务：与原先每次新建连接的行为一致，下次查询能看到最新数据
+
+        :param name: _database 中的配置名
+        :param multi_statements: 是否允许一次执行多条 SQL（批量查询使用）
+        :return: pymysql 连接
+        """
+        key = (name, multi_statements)
+        pool = cls._get_pool(key)
+        con = None
+        while con is None:
+            try:
+                candidate, idle_since = pool.get_nowait()
+            except queue.Empty:
+                con = cls._connect(name, multi_statements)
+                break
+            if cls._healthy(candidate, idle_since):
+                con = candidate
+            else:
+                cls._close_quietly(candidate)
+
+        try:
+            yield con
+            con.rollback()
+        except Exception:
+            # 出错的连接状态不确定，直接关闭
+            cls._close_quietly(con)
+            raise
+
+        if pool.qsize() < cls.MAX_IDLE:
+            pool.put((con, time.monotonic()))
+        else:
+            cls._close_quietly(con)
+
+    @staticmethod
+    def _close_quietly(con: pymysql.connections.Connection) -> None:
+        try:
+            con.close()
+        except Exception:
+            pass
+
+    @classmethod
+    def query(cls, name: str, sql: str) -> list[dict[str, Any]]:
+        """
+        执行单条查询
+
+        :param name: _database 中的配置名
+        :param sql: SQL 语句
+        :return: 查询结果（每行一个字典）
+        """
+        with cls.connection(name) as con, con.cursor() as cur:
+            cur.execute(sql)
+            return list(cur.fetchall())
+
+    @classmethod
+    def query_batch(cls, name: str, sqls: list[str]) -> list[list[dict[str, Any]]]:
+        """
+        一次往返执行多条查询（多语句模式）
+
+        :param name: _database 中的配置名
+        :param sqls: SQL 语句列表
+        :return: 每条语句的查询结果
+        """
+        statement = ";\n".join(sql.strip().rstrip(";") for sql in sqls)
+        results = []
+        with cls.connection(name, multi_statements=True) as con, con.cursor() as cur:
+            cur.execute(statement)
+            results.append(list(cur.fetchall()))
+            while cur.nextset():
+                results.append(list(cur.fetchall()))
+        if len(results) != len(sqls):
+            raise ValueError(f"批量查询返回 {len(results)} 个结果集，与 SQL 数量 {len(sqls)} 不一致")
+        return results
+
+    @classmethod
+    def close(cls) -> None:
+        """关闭所有空闲连接"""
+        with cls._lock:
+            for pool in cls._pools.values():
+                while True:
+                    try:
+                        con, _ = pool.get_nowait()
+                    except queue.Empty:
+                        break
+                    cls._close_quietly(con)
+            cls._pools.clear()
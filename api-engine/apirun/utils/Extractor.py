@@ -0,0 +1,100 @@
+"""
+响应数据提取器
+JSONPath / 正则表达式按表达式编译并缓存，响应的 JSON 解析结果缓存在响应对象上，同一响应多次提取只解析一次
+"""
+import re
+from functools import lru_cache
+from typing import Any
+
+import jsonpath
+
+# 编译缓存容量（按表达式缓存，LRU 淘汰）
+EXTRACTOR_CACHE_SIZE = 1024
+
+# 简单路径：$.a.b[0].c 形式（只含键名和数字下标），直接按键/下标取值，无需经过 jsonpath 的表达式解析
+_SIMPLE_PATH = re.compile(r"^\$(?:\.[^.\[\]()?*@!'\"\s]+|\[\d+\])*$")
+_SIMPLE_TOKEN = re.compile(r"\.([^.\[\]]+)|\[(\d+)\]")
+
+
+class JsonPathExtractor:
+    """编译后的 JSONPath 表达式，返回值与 jsonpath.jsonpath 一致（匹配列表，无匹配返回 False）"""
+
+    __slots__ = ("expression", "tokens")
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        # 简单路径预先拆分为键/下标序列，复杂表达式（通配、过滤、递归等）交给 jsonpath
+        self.tokens = None
+        if _SIMPLE_PATH.match(expression):
+            self.tokens = tuple(key or index for key, index in _SIMPLE_TOKEN.findall(expression))
+
+    def extract(self, data: Any) -> list[Any] | bool:
+        if self.tokens is None:
+            return jsonpath.jsonpath(data, self.expression)
+        if not data:
+            return False
+        node = data
+        for token in self.tokens:
+            # 与 jsonpath 相同的取值规则：字典按键取值，列表按数字下标取值
+            if isinstance(node, dict) and token in node:
+                node = node[token]
+            elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                node = node[int(token)]
+            else:
+                return False
+        return [node]
+
+
+@lru_cache(maxsize=EXTRACTOR_CACHE_SIZE)
+def compile_jsonpath(expression: str) -> JsonPathExtractor:
+    """
+    编译 JSONPath 表达式并按表达式缓存
+
+    :param expression: JSONPath 表达式
+    :return: 提取器对象
+    """
+    return JsonPathExtractor(expression)
+
+
+@lru_cache(maxsize=EXTRACTOR_CACHE_SIZE)
+def compile_regex(expression: str) -> re.Pattern:
+    """
+    编译正则表达式并按表达式缓存
+
+    :param expression: 正则表达式
+    :return: 编译后的正则对象
+    """
+    return re.compile(expression)
+
+
+def response_json(response: Any) -> Any:
+    """
+    获取响应的 JSON 数据，解析结果缓存在响应对象上（每个响应只解析一次）
+
+    :param response: 响应对象（requests 或 httpx）
+    :return: 解析后的 JSON 数据
+    """
+    try:
+        return response._parsed_json
+    except AttributeError:
+        response._parsed_json = response.json()
+        return response._parsed_json
+
+
+def extractor_cache_info() -> dict[str, dict[str, int]]:
+    """获取提取器缓存统计信息"""
+    return {
+        name: {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+        for name, info in (("jsonpath", compile_jsonpath.cache_info()), ("regex", compile_regex.cache_info()))
+    }
+
+
+def test_jsonpath_extractor() -> None:
+    """单元测试 - 编译后的提取结果与 jsonpath.jsonpath 一致"""
+    data = {"data": {"id": 7, "items": [{"name": "a"}, {"name": "b"}], "0": "zero"}, "token": "t", "empty": []}
+    for expression in ("$.token", "$.data.items[1].name", "$.data.items.0.name", "$.data.0", "$.missing",
+                       "$.data.items[5]", "$..name", "$.data.items[*].name", "$.empty", "$.data.id.x"):
+        expected = jsonpath.jsonpath(data, expression)
+        actual = compile_jsonpath(expression).extract(data)
+        print(expression, actual, "OK" if actual == expected else f"MISMATCH {expected}")
+    print(extractor_cache_info())
@@ -0,0 +1,140 @@
+"""
+流式文件读写与哈希
+- 分块大小可配置（默认 1 MiB），下载时边写文件边计算哈希，无需再次读取文件
+- 支持 md5 / sha256 / xxhash（xxhash 为可选依赖：pip install xxhash）
+- 多个文件的哈希并行计算（hashlib 和文件读取都会释放 GIL，线程即可并行）
+
+配置通过 context.yaml 的 _file 节点覆盖：
+
+    _file:
+      chunk_size: 1048576   # 读写分块大小（字节）
+      algorithm: md5        # 默认哈希算法（md5/sha256/xxhash）
+      workers: 4            # 并行计算哈希的线程数
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable
+
+from ..core.globalContext import g_context
+
+# 默认配置
+DEFAULT_FILE_CONFIG: dict[str, Any] = {
+    "chunk_size": 1024 * 1024,
+    "algorithm": "md5",
+    "workers": min(4, os.cpu_count() or 1),
+}
+
+# 算法别名 -> xxhash 中的实现
+_XXHASH_ALGORITHMS = {
+    "xxhash": "xxh3_64",
+    "xxh3_64": "xxh3_64",
+    "xxh3_128": "xxh3_128",
+    "xxh64": "xxh64",
+}
+
+
+def file_config() -> dict[str, Any]:
+    """获取文件读写配置（默认值 + context 中的 _file 配置）"""
+    config = {**DEFAULT_FILE_CONFIG, **(g_context().get_dict("_file") or {})}
+    config["chunk_size"] = int(config["chunk_size"])
+    config["workers"] = max(1, int(config["workers"]))
+    config["algorithm"] = str(config["algorithm"]).lower()
+    return config
+
+
+def new_hasher(algorithm: str | None = None):
+    """
+    创建哈希对象
+
+    :param algorithm: md5 / sha256 / xxhash（为空时使用 _file 配置中的默认算法）
+    :return: 具有 update / hexdigest 方法的哈希对象
+    """
+    algorithm = (algorithm or file_config()["algorithm"]).lower()
+    if algorithm in _XXHASH_ALGORITHMS:
+        try:
+            import xxhash
+        except ImportError:
+            raise ImportError(f"哈希算法 {algorithm} 需要安装 xxhash: pip install xxhash")
+        return getattr(xxhash, _XXHASH_ALGORITHMS[algorithm])()
+    try:
+        return hashlib.new(algorithm)
+    except ValueError:
+        raise ValueError(f"不支持的哈希算法: {algorithm}")
+
+
+def hash_bytes(data: bytes, algorithm: str | None = None) -> str:
+    """计算字节数据的哈希值"""
+    hasher = new_hasher(algorithm)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def hash_file(file_path: str, algorithm: str | None = None, chunk_size: int | None = None) -> str:
+    """
+    分块读取文件并计算哈希值（复用同一块缓冲区，不为每个分块分配新的 bytes）
+
+    :param file_path: 文件路径
+    :param algorithm: 哈希算法
+    :param chunk_size: 分块大小（字节），为空时使用 _file 配置
+    :return: 十六进制哈希字符串
+    """
+    hasher = new_hasher(algorithm)
+    buffer = bytearray(chunk_size or file_config()["chunk_size"])
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while size := f.readinto(buffer):
+            hasher.update(view[:size])
+    return hasher.hexdigest()
+
+
+def hash_files(file_paths: Iterable[str], algorithm: str | None = None,
+               chunk_size: int | None = None, workers: int | None = None) -> list[str]:
+    """
+    并行计算多个文件的哈希值
+
+    :return: 与 file_paths 顺序一致的哈希值列表
+    """
+    config = file_config()
+    algorithm = algorithm or config["algorithm"]
+    chunk_size = chunk_size or config["chunk_size"]
+    file_paths = list(file_paths)
+    workers = min(workers or config["workers"], len(file_paths)) or 1
+    if workers == 1:
+        return [hash_file(path, algorithm, chunk_size) for path in file_paths]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="apirun-hash") as executor:
+        return list(executor.map(lambda path: hash_file(path, algorithm, chunk_size), file_paths))
+
+
+def iter_response(response, chunk_size: int | None = None) -> Iterable[bytes]:
+    """按分块迭代响应体（requests 使用 iter_content，httpx 使用 iter_bytes）"""
+    chunk_size = chunk_size or file_config()["chunk_size"]
+    iter_chunks = getattr(response, "iter_content", None) or response.iter_bytes
+    return iter_chunks(chunk_size=chunk_size)
+
+
+def write_chunks(chunks: Iterable[bytes], file_path: str, algorithm: str | None = None) -> str:
+    """
+    将数据块写入文件，同时计算哈希值
+
+    :param chunks: 数据块迭代器
+    :param file_path: 目标文件路径
+    :param algorithm: 哈希算法
+    :return: 十六进制哈希字符串
+    """
+    hasher = new_hasher(algorithm)
+    with open(file_path, "wb") as f:
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def hash_response(response, algorithm: str | None = None, chunk_size: int | None = None) -> str:
+    """分块计算响应体的哈希值"""
+    hasher = new_hasher(algorithm)
+    for chunk in iter_response(response, chunk_size):
+        if chunk:
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,321 @@
+"""
+增量报告生成
+进程内读取 allure-results 中新增的结果文件，写入 SQLite 索引，只重新渲染有变化的用例集，输出单文件 HTML 报告
+
+- 不依赖 Java 版 allure 命令行，离线环境可用
+- 已读取的结果文件按 (文件名, 修改时间, 大小) 跳过，不随历史结果增多而变慢
+- 结果压缩：同一用例（historyId）只保留最新一次结果，步骤树以 zlib 压缩存储；
+  文本附件不超过 max_attachment 字节时直接显示；截图等其它附件以 base64 data URI 内嵌（图片直接显示，其余可下载），
+  超过 max_embed 字节的附件只记录名称和大小；报告不依赖 allure-results，生成后可删除结果目录；
+  超过 keep_runs 次运行未再执行的用例从索引中删除
+"""
+import base64
+import html
+import json
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Iterable
+
+# 直接显示的文本附件类型及大小上限（字节）
+TEXT_ATTACHMENT_TYPES = ("text/", "application/json", "application/xml", "text/csv")
+DEFAULT_MAX_ATTACHMENT = 64 * 1024
+# 以 data URI 内嵌的附件（截图、超出上限的文本等）大小上限（字节）
+DEFAULT_MAX_EMBED = 20 * 1024 * 1024
+# 用例最近一次执行早于最近 N 次运行时从索引中删除
+DEFAULT_KEEP_RUNS = 20
+
+STATUS_ORDER = ("failed", "broken", "passed", "skipped", "unknown")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested (file TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, started REAL);
+CREATE TABLE IF NOT EXISTS results (
+    history_id TEXT PRIMARY KEY, uuid TEXT, suite TEXT, name TEXT, full_name TEXT, status TEXT,
+    start INTEGER, stop INTEGER, message TEXT, trace TEXT, steps BLOB, attempts INTEGER, run_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS results_suite ON results (suite);
+CREATE TABLE IF NOT EXISTS attachments (
+    source TEXT PRIMARY KEY, history_id TEXT, name TEXT, type TEXT, size INTEGER, content BLOB
+);
+CREATE INDEX IF NOT EXISTS attachments_history ON attachments (history_id);
+CREATE TABLE IF NOT EXISTS suites (suite TEXT PRIMARY KEY, dirty INTEGER, html TEXT);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+_STYLE = """
+body{font-family:-apple-system,"Segoe UI","Microsoft YaHei",sans-serif;margin:24px;color:#222}
+h1{font-size:22px}.summary span{display:inline-block;margin-right:16px;font-weight:600}
+details{margin:4px 0 4px 12px}summary{cursor:pointer}.suite>summary{font-size:16px;font-weight:600}
+.passed{color:#2e7d32}.failed{color:#c62828}.broken{color:#ef6c00}.skipped,.unknown{color:#757575}
+.stale{opacity:.55}.duration{color:#888;font-size:12px;margin-left:8px}
+img{max-width:100%;border:1px solid #ddd;margin:4px 0}
+pre{background:#f6f8fa;padding:8px;overflow:auto;max-height:400px;white-space:pre-wrap}
+ul{margin:2px 0;padding-left:20px}
+"""
+
+
+def _suite_of(result: dict[str, Any]) -> str:
+    """用例集名称：优先取 suite 标签，其次 parentSuite / feature，都没有时取 fullName 的模块部分"""
+    labels = {label.get("name"): label.get("value") for label in result.get("labels", [])}
+    for name in ("suite", "parentSuite", "feature"):
+        if labels.get(name):
+            return labels[name]
+    return (result.get("fullName") or "").rpartition(".")[0] or "默认"
+
+
+def _walk_attachments(node: dict[str, Any]) -> Iterable[dict[str, Any]]:
+    """遍历用例及其所有步骤中的附件"""
+    yield from node.get("attachments", [])
+    for step in node.get("steps", []):
+        yield from _walk_attachments(step)
+
+
+def _duration(node: dict[str, Any]) -> str:
+    if node.get("start") and node.get("stop"):
+        return f'<span class="duration">{(node["stop"] - node["start"]) / 1000:.2f}s</span>'
+    return ""
+
+
+class ReportBuilder:
+    """增量报告生成器 - SQLite 索引文件可跨多次运行复用"""
+
+    def __init__(self, index_path: str | os.PathLike, max_attachment: int = DEFAULT_MAX_ATTACHMENT,
+                 keep_runs: int = DEFAULT_KEEP_RUNS, max_embed: int = DEFAULT_MAX_EMBED):
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attachment = max_attachment
+        self.max_embed = max_embed
+        self.keep_runs = keep_runs
+        self.db = sqlite3.connect(self.index_path)
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "ReportBuilder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def ingest(self, results_dir: str | os.PathLike) -> int:
+        """
+        读取结果目录中新增或变化的结果文件
+
+        :param results_dir: allure-results 目录
+        :return: 本次读取的结果文件数
+        """
+        results_dir = Path(results_dir)
+        if not results_dir.is_dir():
+            return 0
+        ingested = {file: (mtime, size) for file, mtime, size in self.db.execute("SELECT * FROM ingested")}
+        pending = []
+        with os.scandir(results_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith("-result.json"):
+                    continue
+                stat = entry.stat()
+                if ingested.pop(entry.name, None) != (stat.st_mtime_ns, stat.st_size):
+                    pending.append((entry, stat))
+        # 结果目录中已删除的文件不会再出现（文件名为 uuid），不再保留其记录
+        if ingested:
+            with self.db:
+                self.db.executemany("DELETE FROM ingested WHERE file = ?", [(file,) for file in ingested])
+        if not pending:
+            return 0
+
+        with self.db:
+            run_id = self.db.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),)).lastrowid
+            for entry, stat in pending:
+                try:
+                    with open(entry.path, "rb") as f:
+                        result = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"警告: 跳过无法解析的结果文件 {entry.name}: {e}")
+                    continue
+                self._ingest_result(result, results_dir, run_id)
+                self.db.execute("INSERT OR REPLACE INTO ingested VALUES (?, ?, ?)",
+                                (entry.name, stat.st_mtime_ns, stat.st_size))
+            self._compact(run_id)
+        return len(pending)
+
+    def _compact(self, run_id: int) -> None:
+        """删除最近 keep_runs 次运行中都没有执行过的用例及其附件"""
+        if not self.keep_runs:
+            return
+        expired = self.db.execute("SELECT history_id, suite FROM results WHERE run_id <= ?",
+                                  (run_id - self.keep_runs,)).fetchall()
+        if not expired:
+            return
+        self.db.executemany("DELETE FROM attachments WHERE history_id = ?", [(row[0],) for row in expired])
+        self.db.executemany("DELETE FROM results WHERE history_id = ?", [(row[0],) for row in expired])
+        self.db.executemany("UPDATE suites SET dirty = 1 WHERE suite = ?", {(row[1],) for row in expired})
+
+    def _ingest_result(self, result: dict[str, Any], results_dir: Path, run_id: int) -> None:
+        """写入一个用例结果：同一用例只保留最新的一次，旧结果的附件一并删除"""
+        history_id = result.get("historyId") or result.get("uuid")
+        start = result.get("start") or 0
+        previous = self.db.execute("SELECT start, attempts, suite, run_id FROM results WHERE history_id = ?",
+                                   (history_id,)).fetchone()
+        # 同一次运行中的多个结果为失败重试，记录执行次数
+        retried = previous is not None and previous[3] == run_id
+        if previous and previous[0] > start:
+            # 比已记录的结果更早（如失败重试的前几次），只计入执行次数
+            if retried:
+                self.db.execute("UPDATE results SET attempts = attempts + 1 WHERE history_id = ?", (history_id,))
+                self.db.execute("UPDATE suites SET dirty = 1 WHERE suite = ?", (previous[2],))
+            return
+
+        suite = _suite_of(result)
+        details = result.get("statusDetails") or {}
+        steps = zlib.compress(json.dumps(
+            {"steps": result.get("steps", []), "attachments": result.get("attachments", []),
+             "parameters": result.get("parameters", [])}, ensure_ascii=False).encode("utf-8"))
+        self.db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (history_id, result.get("uuid"), suite, result.get("name"), result.get("fullName"),
+             result.get("status") or "unknown", start, result.get("stop") or 0,
+             details.get("message"), details.get("trace"), steps, previous[1] + 1 if retried else 1, run_id),
+        )
+        self.db.execute("DELETE FROM attachments WHERE history_id = ?", (history_id,))
+        for attachment in _walk_attachments(result):
+            self._ingest_attachment(attachment, history_id, results_dir)
+        # 用例集（含用例移动前所在的用例集）标记为需要重新渲染
+        self.db.executemany("INSERT INTO suites VALUES (?, 1, NULL) ON CONFLICT (suite) DO UPDATE SET dirty = 1",
+                            [(suite,)] + ([(previous[2],)] if previous and previous[2] != suite else []))
+
+    def _ingest_attachment(self, attachment: dict[str, Any], history_id: str, results_dir: Path) -> None:
+        """记录附件：不超过 max_embed 的附件压缩后存入索引（结果目录删除后报告仍可显示），其余只记录名称和大小"""
+        source = attachment.get("source")
+        if not source:
+            return
+        path = results_dir / source
+        size = path.stat().st_size if path.exists() else 0
+        content = None
+        mime = attachment.get("type") or ""
+        if size and size <= self.max_embed:
+            content = zlib.compress(path.read_bytes())
+        self.db.execute("INSERT OR REPLACE INTO attachments VALUES (?, ?, ?, ?, ?, ?)",
+                        (source, history_id, attachment.get("name"), mime, size, content))
+
+    def build(self, output: str | os.PathLike, title: str = "测试报告") -> Path:
+        """
+        生成单文件 HTML 报告，只重新渲染有变化的用例集
+
+        :param output: 输出文件路径
+        :param title: 报告标题
+        :return: 报告文件路径
+        """
+        latest_run = self.db.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+        with self.db:
+            # 有新的运行时，上次生成报告时属于最近一次运行的用例需要重新渲染（标记为未在本次执行）
+            built_run = (self.db.execute("SELECT value FROM meta WHERE key = 'built_run'").fetchone() or (None,))[0]
+            if built_run is not None and built_run != latest_run:
+                self.db.execute("UPDATE suites SET dirty = 1 WHERE suite IN "
+                                "(SELECT DISTINCT suite FROM results WHERE run_id = ?)", (built_run,))
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('built_run', ?)", (latest_run,))
+            for (suite,) in self.db.execute("SELECT suite FROM suites WHERE dirty = 1").fetchall():
+                self.db.execute("UPDATE suites SET dirty = 0, html = ? WHERE suite = ?",
+                                (self._render_suite(suite, latest_run), suite))
+
+        counts = dict(self.db.execute("SELECT status, COUNT(*) FROM results WHERE run_id = ? GROUP BY status",
+                                      (latest_run,)).fetchall())
+        total = sum(counts.values())
+        summary = " ".join(f'<span class="{status}">{status}: {counts[status]}</span>'
+                           for status in STATUS_ORDER if counts.get(status))
+
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+                    f"<style>{_STYLE}</style></head><body><h1>{html.escape(title)}</h1>"
+                    f'<div class="summary">最近一次运行 {total} 个用例 {summary}'
+                    f'<span>生成时间: {time.strftime("%Y-%m-%d %H:%M:%S")}</span></div>')
+            for (fragment,) in self.db.execute("SELECT html FROM suites WHERE html IS NOT NULL ORDER BY suite"):
+                f.write(fragment)
+            f.write("</body></html>")
+        return output
+
+    def _render_suite(self, suite: str, latest_run: int | None) -> str | None:
+        """渲染一个用例集（结果已全部移走时返回 None）"""
+        rows = self.db.execute(
+            "SELECT history_id, name, status, start, stop, message, trace, steps, attempts, run_id "
+            "FROM results WHERE suite = ? ORDER BY start", (suite,)).fetchall()
+        if not rows:
+            return None
+        attachments = {source: (name, mime, size, content) for source, name, mime, size, content in self.db.execute(
+            "SELECT a.source, a.name, a.type, a.size, a.content FROM attachments a "
+            "JOIN results r ON a.history_id = r.history_id WHERE r.suite = ?", (suite,))}
+
+        failed = sum(1 for row in rows if row[2] in ("failed", "broken"))
+        parts = [f'<details class="suite"{" open" if failed else ""}><summary>{html.escape(suite)} '
+                 f'<span class="duration">{len(rows)} 个用例，{failed} 个失败</span></summary>']
+        for history_id, name, status, start, stop, message, trace, steps, attempts, run_id in rows:
+            body = json.loads(zlib.decompress(steps))
+            stale = " stale" if run_id != latest_run else ""
+            retry = f'<span class="duration">执行 {attempts} 次</span>' if attempts > 1 else ""
+            parts.append(f'<details class="case{stale}"><summary class="{status}">[{status}] {html.escape(name or "")}'
+                         f'{_duration({"start": start, "stop": stop})}{retry}</summary>')
+            if body["parameters"]:
+                parts.append("<ul>" + "".join(f"<li>{html.escape(str(p.get('name')))} = "
+                                              f"{html.escape(str(p.get('value')))}</li>"
+                                              for p in body["parameters"]) + "</ul>")
+            if message or trace:
+                parts.append(f"<pre>{html.escape(message or '')}\n{html.escape(trace or '')}</pre>")
+            parts.append(self._render_steps(body, attachments))
+            parts.append("</details>")
+        parts.append("</details>")
+        return "".join(parts)
+
+    def _render_steps(self, node: dict[str, Any], attachments: dict[str, tuple]) -> str:
+        """渲染步骤树和附件"""
+        parts = ["<ul>"]
+        for step in node.get("steps", []):
+            status = step.get("status") or "unknown"
+            parts.append(f'<li><span class="{status}">{html.escape(step.get("name") or "")}</span>{_duration(step)}')
+            if step.get("steps") or step.get("attachments"):
+                parts.append(self._render_steps(step, attachments))
+            parts.append("</li>")
+        for attachment in node.get("attachments", []):
+            name, mime, size, content = attachments.get(attachment.get("source"),
+                                                         (attachment.get("name"), "", 0, None))
+            label = html.escape(name or "")
+            if content is None:
+                parts.append(f"<li>📎 {label} <span class=\"duration\">{mime} {size} 字节（未内嵌）</span></li>")
+                continue
+            data = zlib.decompress(content)
+            if size <= self.max_attachment and mime.startswith(TEXT_ATTACHMENT_TYPES):
+                parts.append(f"<li><details><summary>📎 {label}</summary>"
+                             f"<pre>{html.escape(data.decode('utf-8', 'replace'))}</pre></details></li>")
+                continue
+            uri = f"data:{html.escape(mime or 'application/octet-stream')};base64,{base64.b64encode(data).decode('ascii')}"
+            if mime.startswith("image/"):
+                parts.append(f'<li><details open><summary>📎 {label}</summary><img src="{uri}" alt="{label}"></details></li>')
+            else:
+                parts.append(f'<li>📎 <a href="{uri}" download="{label}">{label}</a>'
+                             f'<span class="duration">{mime} {size} 字节</span></li>')
+        parts.append("</ul>")
+        return "".join(parts)
+
+
+def build_report(results_dir: str | os.PathLike, output: str | os.PathLike,
+                 index_path: str | os.PathLike | None = None, title: str = "测试报告") -> Path:
+    """
+    增量读取结果目录并生成单文件 HTML 报告
+
+    :param results_dir: allure-results 目录
+    :param output: 输出的 HTML 文件
+    :param index_path: SQLite 索引文件，默认与输出文件同目录的 report-index.db
+    :param title: 报告标题
+    :return: 报告文件路径
+    """
+    index_path = index_path or Path(output).parent / "report-index.db"
+    start = time.perf_counter()
+    with ReportBuilder(index_path) as builder:
+        ingested = builder.ingest(results_dir)
+        report = builder.build(output, title)
+    print(f"报告已更新: 新增 {ingested} 个结果文件，耗时 {time.perf_counter() - start:.2f}s")
+    return report
@@ -0,0 +1,259 @@
+"""
+请求日志
+send_request 的请求/响应记录为结构化 JSONL（每个请求一行），由后台线程异步写入文件，不再把完整报文打印到标准输出
+
+- 请求体/响应体按 max_body 截断；写文件和附加到 Allure 都需显式开启，默认只在请求异常时打印
+- 按 sample_rate 采样记录成功的请求，失败的请求（异常或状态码 >= 400）始终记录
+- 每个请求的耗时拆分为 DNS、建立连接、TLS 握手、首字节（TTFB）、下载响应体
+- 打印到标准输出需显式开启（print: true），请求异常时始终打印
+
+配置通过 context.yaml 的 _log 节点覆盖：
+
+    _log:
+      path: reports/requests.jsonl   # JSONL 文件路径（默认为空，不写文件；命令行可用 --request-log 指定）
+      max_body: 2048                 # 请求体/响应体保留的最大字符数（0 表示不截断）
+      sample_rate: 1.0               # 成功请求的采样比例（0 ~ 1）
+      print: false                   # 是否打印到标准输出
+      attach: false                  # 是否把截断后的记录附加到 Allure 步骤（每个请求一个附件）
+"""
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+import allure
+
+from ..core.globalContext import g_context
+from .StepProfiler import profiler
+
+# 命令行 --request-log 通过环境变量指定日志文件
+REQUEST_LOG_ENV = "APIRUN_REQUEST_LOG"
+
+# 默认配置
+DEFAULT_LOG_CONFIG: dict[str, Any] = {
+    "path": None,
+    "max_body": 2048,
+    "sample_rate": 1.0,
+    "print": False,
+    "attach": False,
+}
+
+
+def _to_bool(value: Any) -> bool:
+    """兼容字符串布尔值"""
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def truncate(value: Any, max_body: int) -> Any:
+    """截断过长的字符串/字节内容，字典和列表按元素递归截断"""
+    if not max_body:
+        return value
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    if isinstance(value, str):
+        if len(value) > max_body:
+            return f"{value[:max_body]}...<已截断，共 {len(value)} 字符>"
+        return value
+    if isinstance(value, dict):
+        return {key: truncate(item, max_body) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate(item, max_body) for item in value]
+    return value
+
+
+class RequestTiming:
+    """单个请求的耗时拆分（秒），未测得的阶段为 None"""
+
+    PHASES = ("dns", "connect", "tls", "ttfb", "download")
+
+    __slots__ = ("start", "headers_at", "total", *PHASES)
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.headers_at: float | None = None  # 收到响应头的时刻
+        self.total: float | None = None
+        for phase in self.PHASES:
+            setattr(self, phase, None)
+
+    def add(self, phase: str, seconds: float) -> None:
+        """累加某个阶段的耗时（重试时同一阶段可能发生多次）"""
+        setattr(self, phase, (getattr(self, phase) or 0) + seconds)
+
+    def finish(self) -> None:
+        """请求结束：根据响应头时刻补齐首字节和下载耗时"""
+        end = time.perf_counter()
+        self.total = end - self.start
+        if self.headers_at is not None:
+            if self.ttfb is None:
+                setup = (self.dns or 0) + (self.connect or 0) + (self.tls or 0)
+                self.ttfb = max(self.headers_at - self.start - setup, 0)
+            if self.download is None:
+                self.download = end - self.headers_at
+
+    def as_dict(self) -> dict[str, float | None]:
+        """各阶段耗时（毫秒）"""
+        return {
+            name: None if value is None else round(value * 1000, 2)
+            for name in (*self.PHASES, "total")
+            for value in [getattr(self, name)]
+        }
+
+
+# 当前请求的耗时记录（线程和 asyncio 任务各自独立）
+_current_timing: ContextVar[RequestTiming | None] = ContextVar("apirun_request_timing", default=None)
+
+
+def current_timing() -> RequestTiming | None:
+    """当前请求的耗时记录（不在 request_timing 范围内时为 None）"""
+    return _current_timing.get()
+
+
+@contextmanager
+def request_timing() -> Iterator[RequestTiming]:
+    """
+    记录一个请求的耗时，范围内建立的连接会把 DNS/连接/TLS 耗时记到该请求上
+
+    :return: 耗时记录
+    """
+    timing = RequestTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _current_timing.reset(token)
+        timing.finish()
+
+
+def httpx_trace(timing: RequestTiming):
+    """
+    httpx 的 trace 扩展回调：按 httpcore 事件记录各阶段耗时
+
+    httpcore 的 connect_tcp 包含 DNS 解析，异步引擎下 DNS 耗时计入 connect
+    """
+    started: dict[str, float] = {}
+
+    async def trace(event_name: str, info: dict[str, Any]) -> None:
+        now = time.perf_counter()
+        name, _, stage = event_name.rpartition(".")
+        phase = name.rpartition(".")[2]
+        if stage == "started":
+            started[phase] = now
+        elif stage == "complete" and phase in started:
+            if phase == "connect_tcp":
+                timing.add("connect", now - started[phase])
+            elif phase == "start_tls":
+                timing.add("tls", now - started[phase])
+            elif phase == "receive_response_headers":
+                # 首字节：从开始发送请求头到收到响应头
+                timing.headers_at = now
+                timing.ttfb = now - started.get("send_request_headers", started[phase])
+            elif phase == "receive_response_body":
+                timing.add("download", now - started[phase])
+
+    return trace
+
+
+class RequestLog:
+    """请求日志 - 进程内共享一个后台写入线程"""
+
+    _queue: "queue.SimpleQueue[tuple[str, str] | None]" = queue.SimpleQueue()
+    _thread: threading.Thread | None = None
+    _lock = threading.Lock()
+    _opened: set[str] = set()  # 本进程已写过的文件（首次写入时清空旧内容）
+
+    @classmethod
+    def config(cls) -> dict[str, Any]:
+        """获取日志配置（默认值 + 环境变量 + context 中的 _log 配置）"""
+        config = {**DEFAULT_LOG_CONFIG, "path": os.environ.get(REQUEST_LOG_ENV) or None,
+                  **(g_context().get_dict("_log") or {})}
+        config["max_body"] = int(config["max_body"] or 0)
+        config["sample_rate"] = float(config["sample_rate"])
+        config["print"] = _to_bool(config["print"])
+        config["attach"] = _to_bool(config["attach"])
+        return config
+
+    @classmethod
+    def record(cls, request_data: dict[str, Any], timing: RequestTiming | None = None,
+               error: BaseException | None = None) -> dict[str, Any] | None:
+        """
+        记录一个请求
+
+        :param request_data: 请求数据（send_request 组装的 current_response_data）
+        :param timing: 耗时记录
+        :param error: 请求异常
+        :return: 写入的日志记录，未被采样时为 None
+        """
+        config = cls.config()
+        failed = error is not None or int(request_data.get("status_code") or 0) >= 400
+        if not failed and config["sample_rate"] < 1 and random.random() >= config["sample_rate"]:
+            return None
+
+        entry = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "method": request_data.get("method"),
+            "url": request_data.get("url"),
+            "status_code": request_data.get("status_code"),
+            "timing_ms": timing.as_dict() if timing else None,
+            **{key: truncate(value, config["max_body"]) for key, value in request_data.items()
+               if key not in ("method", "url", "status_code")},
+        }
+        if error is not None:
+            entry["error"] = f"{type(error).__name__}: {error}"
+
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        if config["print"] or error is not None:
+            print(f"[request] {line}")
+        if config["attach"]:
+            with profiler.span("请求日志", "allure"):
+                allure.attach(json.dumps(entry, ensure_ascii=False, indent=2, default=str),
+                              name="请求日志", attachment_type=allure.attachment_type.JSON)
+        if config["path"]:
+            cls._write(config["path"], line)
+        return entry
+
+    @classmethod
+    def _write(cls, path: str, line: str) -> None:
+        """把一行日志交给后台线程写入"""
+        if cls._thread is None:
+            with cls._lock:
+                if cls._thread is None:
+                    cls._thread = threading.Thread(target=cls._writer, name="apirun-request-log", daemon=True)
+                    cls._thread.start()
+                    atexit.register(cls.close)
+        cls._queue.put((path, line))
+
+    @classmethod
+    def _writer(cls) -> None:
+        """后台写入线程：按路径保持文件句柄，队列为空时刷新到磁盘"""
+        files: dict[str, Any] = {}
+        try:
+            while (item := cls._queue.get()) is not None:
+                path, line = item
+                f = files.get(path)
+                if f is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                    f = files[path] = open(path, "a" if path in cls._opened else "w", encoding="utf-8")
+                    cls._opened.add(path)
+                f.write(line + "\n")
+                if cls._queue.empty():
+                    f.flush()
+        finally:
+            for f in files.values():
+                f.close()
+
+    @classmethod
+    def close(cls) -> None:
+        """写完队列中剩余的日志并停止后台线程"""
+        with cls._lock:
+            if cls._thread is not None:
+                cls._queue.put(None)
+                cls._thread.join()
+                cls._thread = None
@@ -0,0 +1,222 @@
+"""
+脚本执行沙箱
+- 编译缓存：代码片段按内容、脚本文件按 (路径, 修改时间, 大小) 缓存编译后的 code 对象，不再每次 exec 源码 / 重建 importlib spec
+- 资源限制：单个脚本的 CPU 时间或内存增量超限时，在执行脚本的线程中抛出 ScriptLimitError，只让当前步骤失败
+
+限制通过 context.yaml 的 _script 节点配置（0 表示不限制，默认都不限制）：
+
+    _script:
+      cpu_time: 30      # 单个脚本最多占用的 CPU 秒数（平台不支持线程 CPU 时间时按耗时计算）
+      memory_mb: 512    # 单个脚本执行期间新增的内存上限
+
+超限时由监控线程向脚本线程注入异常（PyThreadState_SetAsyncExc），未配置限制时脚本直接执行，不启动监控线程。
+
+memory_mb 通过 tracemalloc 统计整个进程的内存增量，只是近似值：开启期间进程内所有内存分配都会变慢，
+且无法区分是哪个脚本分配的内存，因此多个脚本同时执行（--engine=async、多线程）时不检查内存，只检查 CPU 时间
+"""
+import ctypes
+import os
+import threading
+import time
+import tracemalloc
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Callable
+
+from ..core.exceptions import ScriptLimitError
+from ..core.globalContext import g_context
+
+# 编译缓存容量
+SCRIPT_CACHE_SIZE = 512
+
+# 默认资源限制
+DEFAULT_SCRIPT_LIMITS: dict[str, float] = {
+    "cpu_time": 0,
+    "memory_mb": 0,
+}
+
+# 资源检查间隔（秒）
+_CHECK_INTERVAL = 0.05
+
+
+class _ScriptInterrupt(BaseException):
+    """由监控线程注入到脚本线程的中断信号（继承 BaseException，脚本中的 except Exception 无法吞掉）"""
+
+
+@lru_cache(maxsize=SCRIPT_CACHE_SIZE)
+def compile_source(source: str, filename: str = "<script>") -> CodeType:
+    """
+    编译代码片段并按内容缓存
+
+    :param source: 代码字符串
+    :param filename: 报错时显示的文件名
+    :return: code 对象
+    """
+    return compile(source, filename, "exec")
+
+
+# 脚本文件路径 -> ((修改时间 ns, 文件大小), code 对象)
+_file_codes: dict[str, tuple[tuple[int, int], CodeType]] = {}
+_file_lock = threading.Lock()
+
+
+def compile_file(script_path: str) -> CodeType:
+    """
+    编译脚本文件，文件未修改时复用缓存的 code 对象
+
+    :param script_path: 脚本文件路径
+    :return: code 对象
+    """
+    stat = os.stat(script_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_codes.get(script_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(script_path, "rb") as f:
+        code = compile(f.read(), script_path, "exec")
+    with _file_lock:
+        if len(_file_codes) >= SCRIPT_CACHE_SIZE:
+            _file_codes.clear()
+        _file_codes[script_path] = (signature, code)
+    return code
+
+
+def _cpu_clock(thread_id: int) -> Callable[[], float]:
+    """获取线程 CPU 时间的读取函数，平台不支持时退化为耗时"""
+    try:
+        clock_id = time.pthread_getcpuclockid(thread_id)
+        return lambda: time.clock_gettime(clock_id)
+    except (AttributeError, OSError):
+        return time.monotonic
+
+
+class _Watch:
+    """一次受限执行的监控信息"""
+
+    __slots__ = ("thread_id", "cpu_clock", "cpu_start", "cpu_limit", "mem_start", "mem_limit", "reason", "stopped")
+
+    def __init__(self, cpu_limit: float, mem_limit: int):
+        self.thread_id = threading.get_ident()
+        self.cpu_clock = _cpu_clock(self.thread_id)
+        self.cpu_start = self.cpu_clock()
+        self.cpu_limit = cpu_limit
+        self.mem_start = 0
+        self.mem_limit = mem_limit
+        self.reason: str | None = None  # 超限原因，未超限为 None
+        self.stopped = False            # 脚本已结束，监控线程不再注入中断
+
+
+class _Watchdog:
+    """资源监控线程：有脚本执行时运行，定期检查各脚本的 CPU 时间和内存增量"""
+
+    def __init__(self):
+        self._watches: dict[int, _Watch] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._tracing_users = 0
+        self._owns_tracing = False
+
+    def watch(self, cpu_limit: float, mem_limit: int) -> _Watch:
+        watch = _Watch(cpu_limit, mem_limit)
+        with self._lock:
+            if mem_limit:
+                # 只在有脚本执行期间开启 tracemalloc（若外部已开启则不接管）
+                if self._tracing_users == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._owns_tracing = True
+                self._tracing_users += 1
+                watch.mem_start = tracemalloc.get_traced_memory()[0]
+            self._watches[id(watch)] = watch
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="apirun-script-watchdog", daemon=True)
+                self._thread.start()
+        return watch
+
+    def unwatch(self, watch: _Watch) -> None:
+        """
+        退出监控（可重复调用）：先让监控线程停止注入并清除尚未抛出的中断，再移除监控
+
+        中断可能在退出过程中抛出，此时重试；持有锁并清除中断后监控线程不会再注入，之后的清理不会被打断
+        """
+        while True:
+            try:
+                watch.stopped = True
+                with self._lock:
+                    if watch.reason is not None:
+                        _set_async_exc(watch.thread_id, None)
+                    if self._watches.pop(id(watch), None) is not None and watch.mem_limit:
+                        self._tracing_users -= 1
+                        if self._tracing_users == 0 and self._owns_tracing:
+                            tracemalloc.stop()
+                            self._owns_tracing = False
+                return
+            except _ScriptInterrupt:
+                continue
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(_CHECK_INTERVAL)
+            with self._lock:
+                if not self._watches:
+                    self._thread = None
+                    return
+                # 进程级统计无法区分脚本，多个受内存限制的脚本同时执行时跳过内存检查
+                check_memory = self._tracing_users == 1 and tracemalloc.is_tracing()
+                memory = tracemalloc.get_traced_memory()[0] if check_memory else 0
+                for watch in self._watches.values():
+                    if watch.reason is None:
+                        if watch.cpu_limit and watch.cpu_clock() - watch.cpu_start > watch.cpu_limit:
+                            watch.reason = f"CPU 时间超过 {watch.cpu_limit}s"
+                        elif check_memory and watch.mem_limit and memory - watch.mem_start > watch.mem_limit:
+                            watch.reason = f"内存增量超过 {watch.mem_limit // (1024 * 1024)}MB"
+                    if watch.reason is not None and not watch.stopped:
+                        # 持续注入，直到脚本结束（防止脚本用裸 except 吞掉中断）
+                        _set_async_exc(watch.thread_id, _ScriptInterrupt)
+
+
+def _set_async_exc(thread_id: int, exc_type: type | None) -> None:
+    """在指定线程中异步抛出异常（exc_type 为 None 时清除尚未抛出的异常）"""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), ctypes.py_object(exc_type) if exc_type else ctypes.c_void_p(0))
+
+
+_watchdog = _Watchdog()
+
+
+def script_limits() -> dict[str, float]:
+    """当前的脚本资源限制（默认值 + context 中的 _script 配置）"""
+    return {**DEFAULT_SCRIPT_LIMITS, **(g_context().get_dict("_script") or {})}
+
+
+def run_limited(func: Callable[[], Any], name: str = "<script>") -> Any:
+    """
+    在资源限制下执行函数（脚本的 exec 及函数调用）
+
+    :param func: 无参可调用对象
+    :param name: 脚本名称（用于错误信息）
+    :return: func 的返回值
+    :raises ScriptLimitError: CPU 时间或内存超限
+    """
+    limits = script_limits()
+    cpu_limit = float(limits.get("cpu_time") or 0)
+    mem_limit = int(float(limits.get("memory_mb") or 0) * 1024 * 1024)
+    if not cpu_limit and not mem_limit:
+        return func()
+
+    watch = _watchdog.watch(cpu_limit, mem_limit)
+    try:
+        try:
+            return func()
+        finally:
+            _watchdog.unwatch(watch)
+    except _ScriptInterrupt:
+        # 中断也可能在 finally 中调用 unwatch 之前抛出，此时在这里退出监控
+        _watchdog.unwatch(watch)
+    raise ScriptLimitError(f"脚本 {name} 超出资源限制: {watch.reason}")
+
+
+def script_cache_info() -> dict[str, int]:
+    """获取脚本编译缓存统计信息"""
+    info = compile_source.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "files": len(_file_codes)}
@@ -0,0 +1,205 @@
+"""
+HTTP 会话池
+按 (scheme, host, port) 复用 requests.Session，避免每个步骤重新建立 TCP 连接和 TLS 握手
+
+默认每个用例开始时清空会话的 Cookie，用例之间的 Cookie 互不影响；isolate_cookies: false 时 Cookie 跨用例保留
+"""
+import socket
+import sys
+import threading
+import time
+from socket import timeout as SocketTimeout
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+from urllib3.util.timeout import _DEFAULT_TIMEOUT
+
+from .RequestLog import current_timing
+from ..core.globalContext import g_context
+
+# 默认配置，可通过 context.yaml 的 _http 节点或命令行参数覆盖
+DEFAULT_HTTP_CONFIG: dict[str, Any] = {
+    "pool_size": 10,          # 每个主机的连接池大小
+    "keep_alive": True,       # 是否保持长连接
+    "max_retries": 0,         # 连接失败/指定状态码的重试次数
+    "backoff_factor": 0,      # 重试退避系数（秒）
+    "retry_status": [],       # 需要重试的状态码，如 [502, 503, 504]
+    "isolate_cookies": True,  # 是否按用例隔离 Cookie（每个用例开始时清空，false 时跨用例保留）
+}
+
+
+def _to_bool(value: Any) -> bool:
+    """兼容命令行传入的字符串布尔值"""
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _connect(addresses: list, timeout: Any, source_address: Any, socket_options: Any) -> socket.socket:
+    """依次连接已解析的地址（与 urllib3.util.connection.create_connection 相同，只是不再重复解析）"""
+    err = None
+    for af, socktype, proto, _, sa in addresses:
+        sock = None
+        try:
+            sock = socket.socket(af, socktype, proto)
+            for option in socket_options or ():
+                sock.setsockopt(*option)
+            if timeout is not _DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sa)
+            return sock
+        except OSError as e:
+            err = e
+            if sock is not None:
+                sock.close()
+    if err is not None:
+        raise err
+    raise OSError("getaddrinfo returns an empty list")
+
+
+class _TimedConnectionMixin:
+    """新建连接时把 DNS 解析和建立 TCP 连接的耗时记到当前请求上（见 RequestLog.request_timing）"""
+
+    def _new_conn(self):
+        timing = current_timing()
+        if timing is None:
+            return super()._new_conn()
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        timing.add("dns", resolved - start)
+        # 直接连接解析得到的地址，只解析一次
+        try:
+            sock = _connect(addresses, self.timeout, self.source_address, self.socket_options)
+        except SocketTimeout as e:
+            raise ConnectTimeoutError(
+                self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+            ) from e
+        except OSError as e:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {e}") from e
+        timing.add("connect", time.perf_counter() - resolved)
+        sys.audit("http.client.connect", self, self.host, self.port)
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        timing = current_timing()
+        if timing is None:
+            return super().connect()
+        start = time.perf_counter()
+        before = (timing.dns or 0) + (timing.connect or 0)
+        super().connect()
+        # TLS 握手耗时 = 总耗时 - 本次 DNS 与 TCP 连接耗时
+        setup = (timing.dns or 0) + (timing.connect or 0) - before
+        timing.add("tls", max(time.perf_counter() - start - setup, 0))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """使用可记录建连耗时的连接池"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+class SessionPool:
+    """HTTP 会话池 - 进程内共享，按目标主机划分会话"""
+
+    _sessions: dict[tuple[str, str, int | None], requests.Session] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def config(cls) -> dict[str, Any]:
+        """
+        获取会话池配置（默认值 + context.yaml/命令行中的 _http 配置）
+
+        :return: 配置字典
+        """
+        config = {**DEFAULT_HTTP_CONFIG, **(g_context().get_dict("_http") or {})}
+        config["pool_size"] = int(config["pool_size"])
+        config["max_retries"] = int(config["max_retries"])
+        config["backoff_factor"] = float(config["backoff_factor"])
+        config["keep_alive"] = _to_bool(config["keep_alive"])
+        config["isolate_cookies"] = _to_bool(config["isolate_cookies"])
+        return config
+
+    @classmethod
+    def _create_session(cls, config: dict[str, Any]) -> requests.Session:
+        """按配置创建带连接池和重试策略的会话"""
+        session = requests.Session()
+        retries = Retry(
+            total=config["max_retries"],
+            backoff_factor=config["backoff_factor"],
+            status_forcelist=config["retry_status"] or None,
+            allowed_methods=None,  # 所有请求方法均可重试
+            raise_on_status=False,
+        )
+        adapter = _TimedHTTPAdapter(
+            pool_connections=1,  # 每个会话只服务一个主机
+            pool_maxsize=config["pool_size"],
+            max_retries=retries,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not config["keep_alive"]:
+            session.headers["Connection"] = "close"
+        return session
+
+    @classmethod
+    def get_session(cls, url: str) -> requests.Session:
+        """
+        获取目标地址对应的会话，不存在则创建
+
+        :param url: 请求地址
+        :return: 复用的 requests.Session
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme.lower(), (parts.hostname or "").lower(), parts.port)
+        session = cls._sessions.get(key)
+        if session is None:
+            with cls._lock:
+                session = cls._sessions.get(key)
+                if session is None:
+                    session = cls._create_session(cls.config())
+                    cls._sessions[key] = session
+        return session
+
+    @classmethod
+    def begin_case(cls) -> None:
+        """用例开始时调用：隔离 Cookie（默认）时清空所有会话的 Cookie"""
+        if cls._sessions and cls.config()["isolate_cookies"]:
+            for session in cls._sessions.values():
+                session.cookies.clear()
+
+    @classmethod
+    def close(cls) -> None:
+        """关闭所有会话，释放连接"""
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
@@ -2,64 +2,224 @@
 # 使用 jinjia2 模板引擎 (类似 flask的模板)
 # https://docs.jinkan.org/docs/jinja2/templates.html
 import os
-from typing import Any
+from collections import ChainMap
+from functools import lru_cache
+from typing import Any, Callable
 
-from jinja2 import Environment
+from jinja2 import Environment, Template, pass_context
+
+# 编译模板缓存容量（按模板源码缓存，LRU 淘汰）
+TEMPLATE_CACHE_SIZE = 2048
+
+# Jinja2 语法标记：不包含这些标记的字符串无需进入模板引擎
+_TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+# 快速路径计数（未进入 Jinja2 的次数）
+_fast_path_count = 0
 
 
 def _resolve_file_path(file_path: str, cases_dir: str = None) -> str:
     """
     解析文件路径，支持相对路径转绝对路径
-    
+
     :param file_path: 文件路径（可以是相对路径或绝对路径）
     :param cases_dir: 用例目录路径
     :return: 解析后的绝对路径
     """
     if not file_path:
         return file_path
-    
+
     # 如果已经是绝对路径或 URL，直接返回
     if os.path.isabs(file_path) or file_path.startswith(('http://', 'https://')):
         return file_path
-    
+
     # 尝试相对于用例目录解析
     if cases_dir:
         candidate = os.path.join(cases_dir, file_path)
         if os.path.exists(candidate):
             return candidate
-    
+
     return file_path
 
 
-def _create_jinja_env(context: dict[str, Any]) -> Environment:
+@pass_context
+def _file_filter(ctx, path: str) -> str:
+    """文件路径解析过滤器 - 从渲染上下文中读取用例目录"""
+    return _resolve_file_path(path, ctx.get('_cases_dir', ''))
+
+
+def _create_jinja_env(**options: Any) -> Environment:
     """
     创建带有自定义过滤器的 Jinja2 环境
     """
-    env = Environment()
-    
-    # 获取用例目录
-    cases_dir = context.get('_cases_dir', '')
-    
-    # 添加文件路径解析过滤器
-    env.filters['file'] = lambda path: _resolve_file_path(path, cases_dir)
-    env.filters['filepath'] = lambda path: _resolve_file_path(path, cases_dir)
-    
+    env = Environment(**options)
+
+    # 添加文件路径解析过滤器（用例目录在渲染时从上下文读取）
+    env.filters['file'] = _file_filter
+    env.filters['filepath'] = _file_filter
+
     return env
 
 
+# 全局共享的 Jinja2 环境，避免每次渲染都重新创建
+# 结构化渲染的字符串叶子保留末尾换行，与原先 repr 后渲染的结果一致
+_jinja_env = _create_jinja_env()
+_leaf_env = _create_jinja_env(keep_trailing_newline=True)
+
+# 已编译的值渲染函数：接收渲染变量，返回渲染后的值
+ValueRenderer = Callable[[dict[str, Any]], Any]
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(source: str, leaf: bool = False) -> Template:
+    """
+    编译模板并按源码缓存
+
+    :param source: 模板源码
+    :param leaf: 是否为结构化渲染中的字符串叶子
+    :return: 编译后的模板对象
+    """
+    return (_leaf_env if leaf else _jinja_env).from_string(source)
+
+
+def _needs_render(source: str) -> bool:
+    """
+    判断字符串是否需要经过 Jinja2 渲染
+
+    不含模板标记、且不含 Jinja2 会规整的换行（\\r 与末尾换行）时，渲染结果与原文一致
+    """
+    if any(marker in source for marker in _TEMPLATE_MARKERS):
+        return True
+    return "\r" in source or source.endswith("\n")
+
+
 def refresh(target: Any | None, context: dict[str, Any]) -> str | None:
     """
     使用 Jinja2 模板引擎渲染字符串
-    
+
     :param target: 待渲染的目标字符串或对象
     :param context: 渲染上下文字典
     :return: 渲染后的字符串，如果 target 为 None 则返回 None
     """
+    global _fast_path_count
     if target is None: return None
-    
-    env = _create_jinja_env(context)
-    template = env.from_string(str(target))
-    return template.render(context)
+
+    source = str(target)
+    if not _needs_render(source):
+        _fast_path_count += 1
+        return source
+
+    return _render_shared(_compile_template(source), ChainMap(context, _jinja_env.globals))
+
+
+def _render_shared(template: Template, variables: ChainMap) -> str:
+    """
+    直接以传入的映射作为渲染变量（Template.render 会把上下文复制成 dict）
+
+    上下文可以是普通 dict，也可以是分层上下文 LayeredContext，渲染过程均不拷贝
+    """
+    ctx = template.new_context(variables, shared=True)
+    try:
+        return template.environment.concat(template.root_render_func(ctx))
+    except Exception:
+        template.environment.handle_exception()
+
+
+def _compile_node(value: Any) -> Callable[[ChainMap], Any]:
+    """递归编译节点：dict/list/tuple 逐项编译，仅含模板标记的字符串进入 Jinja2，其余原样保留"""
+    if isinstance(value, str):
+        if not any(marker in value for marker in _TEMPLATE_MARKERS):
+            return lambda variables: value
+        template = _compile_template(value, leaf=True)
+        return lambda variables: _render_shared(template, variables)
+
+    if isinstance(value, dict):
+        items = [(_compile_node(k), _compile_node(v)) for k, v in value.items()]
+        return lambda variables: {k(variables): v(variables) for k, v in items}
+
+    if isinstance(value, (list, tuple)):
+        nodes = [_compile_node(item) for item in value]
+        container = type(value)
+        return lambda variables: container(node(variables) for node in nodes)
+
+    return lambda variables: value
+
+
+def compile_value(value: Any) -> ValueRenderer:
+    """
+    将任意结构预编译为渲染函数
+
+    与 refresh 不同，不再把整个结构转成字符串再 eval 回来：
+    只渲染含模板标记的字符串叶子，数字、布尔、None 等类型保持不变
+
+    :param value: 待编译的值（dict/list/str/其它）
+    :return: 渲染函数 render(context) -> 渲染后的值（容器每次重新构建，模板本身不会被修改）
+    """
+    node = _compile_node(value)
+
+    def render(context: dict[str, Any]) -> Any:
+        return node(ChainMap(context, _leaf_env.globals))
+
+    return render
+
+
+def render_value(value: Any, context: dict[str, Any]) -> Any:
+    """
+    结构化渲染（一次性使用，不保留编译结果）
+
+    :param value: 待渲染的值
+    :param context: 渲染上下文字典
+    :return: 渲染后的值
+    """
+    return compile_value(value)(context)
+
+
+def compile_case(caseinfo: dict[str, Any]) -> dict[str, Any]:
+    """
+    预编译用例的前置脚本、步骤和后置脚本，结果缓存在 caseinfo["_compiled"]
+
+    :param caseinfo: 用例信息字典
+    :return: {"pre_script": 渲染函数, "steps": [(步骤名, 渲染函数), ...], "post_script": 渲染函数}
+    """
+    if compiled := caseinfo.get("_compiled"):
+        return compiled
+
+    steps = []
+    for step in caseinfo.get("steps") or []:
+        step_name, step_value = next(iter(step.items()))
+        steps.append((step_name, compile_value(step_value)))
+
+    compiled = {
+        "pre_script": compile_value(caseinfo.get("pre_script", None)),
+        "steps": steps,
+        "post_script": compile_value(caseinfo.get("post_script", None)),
+    }
+    caseinfo["_compiled"] = compiled
+    return compiled
+
+
+def template_cache_info() -> dict[str, int]:
+    """
+    获取模板缓存统计信息，用于评估缓存容量
+
+    :return: {"hits": 命中次数, "misses": 未命中(编译)次数, "fast_path": 跳过渲染次数,
+              "size": 当前缓存数量, "maxsize": 缓存容量}
+    """
+    info = _compile_template.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "fast_path": _fast_path_count,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def clear_template_cache() -> None:
+    """清空模板缓存及统计计数"""
+    global _fast_path_count
+    _compile_template.cache_clear()
+    _fast_path_count = 0
 
 
 def test_refresh() -> None:
@@ -68,3 +228,5 @@ def test_refresh() -> None:
     context = {"name": "张三"}
     result = refresh(target, context)
     print(result)
+    print(render_value({"user": "{{name}}", "age": 18, "tags": ["{{name}}'s", None]}, context))
+    print(template_cache_info())
@@ -35,8 +35,10 @@ setuptools.setup(
     install_requires=[
         "allure-pytest==2.13.5",
         "allure-combine>=1.0.11",
+        "httpx",
         "Jinja2",
         "jsonpath",
+        "openpyxl",
         "pluggy",
         "pycparser",
         "PyMySQL",
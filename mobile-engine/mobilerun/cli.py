@@ -1,6 +1,8 @@
+import multiprocessing
 import os
 import sys
 import shutil
+from pathlib import Path
 
 import pytest
 from allure_combine import combine_allure
@@ -22,6 +24,7 @@ def _parse_cli_args() -> dict:
         "app": "",
         "bundleId": "",
         "noReset": "true",
+        "workers": "",
     }
 
     args = defaults.copy()
@@ -43,6 +46,63 @@ def _parse_cli_args() -> dict:
     return args
 
 
+def _device_count(case_type: str, cases_dir: str) -> int:
+    """context 中设备矩阵（_devices）的设备数量"""
+    from mobilerun.core.globalContext import g_context
+
+    cases_path = Path(cases_dir).resolve()
+    if case_type == "excel":
+        from mobilerun.parse.ExcelCaseParser import load_context_from_excel
+        load_context_from_excel(str(cases_path))
+    else:
+        from mobilerun.parse.YamlCaseParser import load_context_from_yaml
+        load_context_from_yaml(cases_path)
+    return len(g_context().get_dict("_devices") or [])
+
+
+def _run_worker(pytest_args):
+    """并行模式下的 worker 进程：绑定一台设备，只执行自己的分片"""
+    sys.exit(pytest.main(pytest_args, plugins=[CasesPlugin()]))
+
+
+def _run_parallel(workers, pytest_args, allure_results_dir, logdata_dir):
+    """多进程并行执行用例，每个 worker 绑定一台设备，最后把各 worker 的 Allure 结果合并到同一目录"""
+    shutil.rmtree(allure_results_dir, ignore_errors=True)
+    os.makedirs(allure_results_dir, exist_ok=True)
+
+    # spawn 方式启动，保证每个 worker 拥有独立的 g_context 和 Appium session
+    mp_context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(workers):
+        worker_results_dir = os.path.join(allure_results_dir, f"worker-{index}")
+        worker_log_file = os.path.join(logdata_dir, f"log-worker-{index}.log")
+        worker_args = [
+            arg.replace(f"--alluredir={allure_results_dir}", f"--alluredir={worker_results_dir}")
+            if arg.startswith("--alluredir=") else
+            f"--log-file={worker_log_file}" if arg.startswith("--log-file=") else arg
+            for arg in pytest_args
+        ]
+        worker_args.extend([f"--shard-index={index}", f"--shard-count={workers}"])
+        process = mp_context.Process(target=_run_worker, args=(worker_args,), name=f"mobilerun-worker-{index}")
+        process.start()
+        processes.append(process)
+
+    exit_codes = []
+    for process in processes:
+        process.join()
+        exit_codes.append(process.exitcode)
+    print(f"并行执行完成，各 worker 退出码: {exit_codes}")
+
+    # 合并 Allure 结果（结果文件名为 uuid，不会冲突）
+    for index in range(workers):
+        worker_results_dir = os.path.join(allure_results_dir, f"worker-{index}")
+        if not os.path.isdir(worker_results_dir):
+            continue
+        for file_name in os.listdir(worker_results_dir):
+            shutil.move(os.path.join(worker_results_dir, file_name), os.path.join(allure_results_dir, file_name))
+        shutil.rmtree(worker_results_dir, ignore_errors=True)
+
+
 def run():
     if "--help" in sys.argv or "-h" in sys.argv:
         plugin_config.print_help()
@@ -98,9 +158,19 @@ def run():
         ]
     )
 
-    print("run pytest：", pytest_args)
-
-    pytest.main(pytest_args, plugins=[CasesPlugin()])
+    # 未指定 --workers 时按设备矩阵的设备数并行，每台设备一个 worker；worker 数不能超过设备数（多个 worker 不能共用一台设备）
+    device_count = _device_count(args["type"], args["cases"])
+    workers = int(args["workers"] or 0) or device_count or 1
+    if workers > max(device_count, 1):
+        print(f"警告: 设备矩阵（_devices）只有 {device_count} 台设备，并行数从 {workers} 调整为 {max(device_count, 1)}")
+        workers = max(device_count, 1)
+    if workers > 1:
+        print(f"并行执行: {workers} 个 worker")
+        _run_parallel(workers, pytest_args, allure_results_dir, logdata_dir)
+    else:
+        print("run pytest：", pytest_args)
+
+        pytest.main(pytest_args, plugins=[CasesPlugin()])
 
     print("\n=== 测试执行完成，正在生成Allure报告... ===")
     os.system(f'allure generate -c -o "{allure_report_dir}" "{allure_results_dir}"')
@@ -1,7 +1,31 @@
 import os
 
 from .globalContext import g_context
-from ..parse.CaseParser import case_parser
+from ..parse.CaseParser import case_group_key, case_parser
+from ..utils.DevicePool import DevicePool
+from ..utils.LocatorCache import LocatorCache
+
+
+def shard_cases(data: dict[str, list], shard_index: int, shard_count: int) -> dict[str, list]:
+    """按分组（见 case_group_key）把用例分配到各分片，同一分组的用例在同一分片并保持原有顺序"""
+    groups: dict[str, list[int]] = {}
+    for idx, caseinfo in enumerate(data["case_infos"]):
+        groups.setdefault(case_group_key(caseinfo), []).append(idx)
+
+    # 大分组优先，依次放入当前用例数最少的分片
+    loads = [0] * shard_count
+    selected: list[int] = []
+    for indexes in sorted(groups.values(), key=len, reverse=True):
+        target = loads.index(min(loads))
+        loads[target] += len(indexes)
+        if target == shard_index:
+            selected.extend(indexes)
+
+    selected.sort()
+    return {
+        "case_infos": [data["case_infos"][i] for i in selected],
+        "case_names": [data["case_names"][i] for i in selected],
+    }
 
 
 class CasesPlugin:
@@ -20,6 +44,10 @@ class CasesPlugin:
         parser.addoption("--bundleId", action="store", default="", help="iOS bundleId")
         parser.addoption("--noReset", action="store", default="true", help="noReset capability")
 
+        # 多设备并行：每个 worker 绑定设备矩阵中的一台设备，执行自己的分片（由 cli 的 --workers 模式传入）
+        parser.addoption("--shard-index", action="store", default="0", help="当前分片序号（从 0 开始）")
+        parser.addoption("--shard-count", action="store", default="1", help="分片总数")
+
     def pytest_generate_tests(self, metafunc):
         from pathlib import Path
 
@@ -55,6 +83,12 @@ class CasesPlugin:
 
         data = case_parser(case_type, cases_path)
 
+        shard_index = int(metafunc.config.getoption("shard_index"))
+        shard_count = int(metafunc.config.getoption("shard_count"))
+        DevicePool.bind(shard_index)
+        if shard_count > 1:
+            data = shard_cases(data, shard_index, shard_count)
+
         if "caseinfo" in metafunc.fixturenames:
             metafunc.parametrize("caseinfo", data["case_infos"], ids=data["case_names"])
 
@@ -62,3 +96,7 @@ class CasesPlugin:
         for item in items:
             item.name = item.name.encode("utf-8").decode("unicode_escape")
             item._nodeid = item.nodeid.encode("utf-8").decode("unicode_escape")
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        DevicePool.close()
+        LocatorCache.print_report()
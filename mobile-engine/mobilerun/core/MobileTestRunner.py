@@ -2,6 +2,7 @@ import copy
 import sys
 
 import allure
+from selenium.common.exceptions import StaleElementReferenceException
 
 from .globalContext import g_context
 from ..extend.keywords import Keywords
@@ -9,6 +10,7 @@ from ..extend.script.run_script import exec_script
 from ..utils.DynamicTitle import dynamicTitle
 from ..utils.VarRender import refresh
 from ..utils.AppiumManager import AppiumManager
+from ..utils.LocatorCache import LocatorCache
 
 
 def _safe_copy_context(context_dict):
@@ -26,6 +28,7 @@ def _safe_copy_context(context_dict):
 class MobileTestRunner:
     def execute(self, caseinfo):
         dynamicTitle(caseinfo)
+        LocatorCache.begin_case()
 
         try:
             keywords = Keywords()
@@ -57,7 +60,16 @@ class MobileTestRunner:
                         class_ = getattr(module, key)
                         key_func = class_().__getattribute__(key)
 
-                    key_func(**step_value)
+                    LocatorCache.begin_step()
+                    try:
+                        key_func(**step_value)
+                    except StaleElementReferenceException:
+                        if not LocatorCache.served_from_cache():
+                            raise
+                        # 缓存的元素已失效：清空定位缓存后重试一次
+                        LocatorCache.invalidate()
+                        key_func(**step_value)
+                    LocatorCache.after_keyword(key)
 
             context = _safe_copy_context(g_context().show_dict())
             context.update(local_context)
@@ -68,6 +80,7 @@ class MobileTestRunner:
 
         finally:
             AppiumManager.close()
+            LocatorCache.end_case()
 
 
 def test_mobile_case(caseinfo):
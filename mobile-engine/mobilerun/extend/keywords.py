@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import time
+import xml.etree.ElementTree as ET
 from typing import Any
 
 import allure
@@ -10,6 +11,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from ..core.globalContext import g_context
 from ..utils.AppiumManager import AppiumManager
+from ..utils.DevicePool import DevicePool
+from ..utils.LocatorCache import LocatorCache, describe_node, match_page_source
 
 
 class Keywords:
@@ -43,10 +46,16 @@ class Keywords:
     def _find_element(self, locator_type: str, element: str, timeout: int | None = None):
         driver = self._get_driver()
         by = self._get_by(locator_type)
+        # 界面没有变化时复用之前找到的元素
+        if (el := LocatorCache.get(driver, by, element)) is not None:
+            return el
         if timeout is not None:
             wait = WebDriverWait(driver, timeout)
-            return wait.until(lambda d: d.find_element(by, element))
-        return driver.find_element(by, element)
+            el = wait.until(lambda d: d.find_element(by, element))
+        else:
+            el = driver.find_element(by, element)
+        LocatorCache.put(driver, by, element, el)
+        return el
 
     def _attach_screenshot(self, name: str) -> None:
         try:
@@ -76,10 +85,12 @@ class Keywords:
         if AppiumManager.get_driver() is not None:
             return
 
-        platform = (kwargs.get("platform") or g_context().get_dict("PLATFORM") or g_context().get_dict("platform") or "android").lower()
-        server = kwargs.get("server") or g_context().get_dict("APPIUM_SERVER") or g_context().get_dict("server") or "http://127.0.0.1:4723"
-        device_name = kwargs.get("deviceName") or g_context().get_dict("deviceName") or g_context().get_dict("DEVICE_NAME")
-        udid = kwargs.get("udid") or g_context().get_dict("udid") or g_context().get_dict("UDID")
+        # 当前 worker 绑定的设备（_devices 设备矩阵）优先于全局配置
+        device = DevicePool.device()
+        platform = (kwargs.get("platform") or device.get("platform") or g_context().get_dict("PLATFORM") or g_context().get_dict("platform") or "android").lower()
+        server = kwargs.get("server") or device.get("server") or g_context().get_dict("APPIUM_SERVER") or g_context().get_dict("server") or "http://127.0.0.1:4723"
+        device_name = kwargs.get("deviceName") or device.get("deviceName") or device.get("name") or g_context().get_dict("deviceName") or g_context().get_dict("DEVICE_NAME")
+        udid = kwargs.get("udid") or device.get("udid") or g_context().get_dict("udid") or g_context().get_dict("UDID")
         app = kwargs.get("app") or g_context().get_dict("app") or g_context().get_dict("APP")
         bundle_id = kwargs.get("bundleId") or g_context().get_dict("bundleId") or g_context().get_dict("BUNDLE_ID")
         no_reset_raw = kwargs.get("noReset", g_context().get_dict("noReset"))
@@ -109,6 +120,7 @@ class Keywords:
         caps["appium:noReset"] = no_reset
         if (nct := kwargs.get("newCommandTimeout")) is not None:
             caps["appium:newCommandTimeout"] = int(nct)
+        caps.update(device.get("capabilities") or {})
 
         g_context().set_dict("APPIUM_SERVER", server)
         g_context().set_dict("PLATFORM", platform)
@@ -269,6 +281,43 @@ class Keywords:
 
         return text
 
+    @allure.step("批量查找元素")
+    def find_elements(self, **kwargs: Any):
+        """
+        批量查找元素：获取一次页面源码，在本地解析多个定位，得到 名称 -> {count, visible, text}
+        （uiautomator、predicate 等无法在页面源码中解析的定位方式逐个查询）
+        """
+        locators = kwargs.get("locators") or {}
+        variable_name = kwargs.get("variable_name")
+        if not isinstance(locators, dict):
+            raise ValueError("locators 应为 名称 -> {locator_type, element} 的字典")
+
+        driver = self._get_driver()
+        platform = str(g_context().get_dict("PLATFORM") or "android").lower()
+        root = ET.fromstring(driver.page_source.encode("utf-8"))
+
+        results = {}
+        for name, spec in locators.items():
+            locator_type, element = spec.get("locator_type"), spec.get("element")
+            nodes = match_page_source(root, locator_type, element, platform)
+            if nodes is not None:
+                visible, text = describe_node(nodes[0], platform) if nodes else (False, None)
+                results[name] = {"count": len(nodes), "visible": visible, "text": text}
+                continue
+            elements = driver.find_elements(self._get_by(locator_type), element)
+            results[name] = {
+                "count": len(elements),
+                "visible": elements[0].is_displayed() if elements else False,
+                "text": elements[0].text if elements else None,
+            }
+
+        if variable_name:
+            g_context().set_dict(variable_name, results)
+            print(f"已批量查找 {len(results)} 个元素并保存到变量 {variable_name}: {results}")
+        else:
+            print(f"已批量查找 {len(results)} 个元素: {results}")
+        return results
+
     @allure.step("获取属性")
     def get_attribute(self, **kwargs: Any):
         """获取元素属性并保存到变量"""
@@ -16,3 +16,14 @@ def case_parser(case_type: str, case_dir: Path) -> dict[str, list[Any]]:
             return excel_case_parser(config_path)
         case _:
             raise ParserError(f"不支持的用例类型: {case_type}")
+
+
+def case_group_key(caseinfo: dict[str, Any]) -> str:
+    """分片分组：优先使用用例中的 shard_group 字段，同一目录的数字前缀文件默认为同一分组（保持前缀顺序），其次为来源文件，最后为用例名"""
+    if group := caseinfo.get("shard_group"):
+        return str(group)
+    if case_file := caseinfo.get("_case_file"):
+        path = Path(case_file)
+        # 数字前缀文件按前缀顺序依次执行（后面的文件可能用到前面文件提取的变量），同一目录的放在一起
+        return f"{path.parent}/*" if path.name.split("_")[0].isdigit() else str(path)
+    return str(caseinfo.get("_case_name"))
@@ -64,6 +64,7 @@ def load_excel_files(config_path: Path):
                     current_test_case = {
                         "desc": row.get("测试用例标题"),
                         "steps": [],
+                        "_case_file": file_name,
                     }
 
                 if pd.notna(row.get("步骤描述")) and pd.notna(row.get("关键字")):
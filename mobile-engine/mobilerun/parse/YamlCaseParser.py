@@ -38,6 +38,7 @@ def load_yaml_files(config_path: Path) -> CaseList:
         with file_path.open("r", encoding="utf-8") as f:
             caseinfo = yaml.full_load(f)
             if caseinfo:
+                caseinfo["_case_file"] = file_path.name
                 case_list.append(caseinfo)
 
     return case_list
@@ -2,37 +2,22 @@ from __future__ import annotations
 
 from typing import Any
 
-from appium import webdriver
-from appium.options.common import AppiumOptions
-
 from ..core.globalContext import g_context
+from .DevicePool import DevicePool
 
 
 class AppiumManager:
-    _driver = None
+    """Appium session 由 DevicePool 管理：每个进程绑定一台设备，用例之间复用 session"""
 
     @classmethod
     def create_driver(cls, server_url: str, capabilities: dict[str, Any]):
-        options = AppiumOptions()
-        options.load_capabilities(capabilities)
-        cls._driver = webdriver.Remote(command_executor=server_url, options=options)
-        g_context().set_dict("current_driver", cls._driver)
-        return cls._driver
+        return DevicePool.acquire(server_url, capabilities)
 
     @classmethod
     def get_driver(cls):
-        driver = g_context().get_dict("current_driver")
-        if driver is not None:
-            cls._driver = driver
-        return cls._driver
+        return g_context().get_dict("current_driver")
 
     @classmethod
     def close(cls) -> None:
-        driver = cls.get_driver()
-        if driver is None:
-            return
-        try:
-            driver.quit()
-        finally:
-            cls._driver = None
-            g_context().set_dict("current_driver", None)
+        """结束当前用例对 session 的使用（重置 App 状态，session 保留给后续用例复用）"""
+        DevicePool.release()
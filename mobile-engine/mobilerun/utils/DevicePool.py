@@ -0,0 +1,315 @@
+"""
+设备 session 池
+每个进程（worker）绑定设备矩阵中的一台设备，并保持一个可复用的 Appium session：
+用例结束时只重置 App 状态（重启或清除数据），不退出 session、不重新安装 App，下一个用例直接复用
+
+- 复用前做健康检查，超过 health_timeout 无响应的 session 视为卡死，丢弃后重新创建
+- capabilities 变化（如切换 App）或达到 recycle_after 时重新创建 session
+- 多台设备时由 cli 的 --workers 启动多个进程，用例按文件分片到各设备并发执行
+
+设备矩阵和池配置在 context.yaml 中配置：
+
+    _devices:
+      - name: pixel-7
+        udid: emulator-5554
+        platform: android                   # 可选，默认使用 PLATFORM
+        server: http://127.0.0.1:4723       # 可选，默认使用 APPIUM_SERVER
+        capabilities:                       # 可选，额外的 capabilities
+          appium:platformVersion: "14"
+      - name: iphone-15
+        udid: 00008110-000A1234
+        platform: ios
+
+    _device_pool:
+      reset: restart         # restart 重启 App / clear 清除 App 数据后重启（Android）/ none 不重置 / quit 每个用例新建 session
+      health_timeout: 10     # 健康检查超时（秒）
+      recycle_after: 0       # 一个 session 最多执行的用例数（0 表示不限制）
+"""
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any
+
+from appium import webdriver
+from appium.options.common import AppiumOptions
+
+from ..core.globalContext import g_context
+from .LocatorCache import LocatorCache
+
+DEFAULT_DEVICE_POOL_CONFIG: dict[str, Any] = {
+    "reset": "restart",
+    "health_timeout": 10,
+    "recycle_after": 0,
+}
+
+RESET_MODES = ("restart", "clear", "none", "quit")
+
+# 多设备共用一个 Appium Server 时，每台设备需要不同的本地端口
+_PORT_CAPABILITIES = {"android": ("appium:systemPort", 8200), "ios": ("appium:wdaLocalPort", 8100)}
+
+
+def _quit_in_background(driver) -> None:
+    """后台退出 session（卡死的 session 退出时可能一直阻塞）"""
+    def _quit():
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    threading.Thread(target=_quit, name="mobilerun-session-quit", daemon=True).start()
+
+
+class _Session:
+    __slots__ = ("driver", "key", "uses", "platform", "app_id")
+
+    def __init__(self, driver, key: tuple, platform: str):
+        self.driver = driver
+        self.key = key
+        self.uses = 0
+        self.platform = platform
+        self.app_id: str | None = None
+
+
+class DevicePool:
+    _device: dict[str, Any] | None = None  # 当前进程绑定的设备
+    _session: _Session | None = None
+    _leased = False
+
+    @classmethod
+    def config(cls) -> dict[str, Any]:
+        config = {**DEFAULT_DEVICE_POOL_CONFIG, **(g_context().get_dict("_device_pool") or {})}
+        config["reset"] = str(config["reset"]).lower()
+        if config["reset"] not in RESET_MODES:
+            raise ValueError(f"不支持的重置方式: {config['reset']}，支持的方式: {', '.join(RESET_MODES)}")
+        config["health_timeout"] = float(config["health_timeout"])
+        config["recycle_after"] = max(0, int(config["recycle_after"]))
+        return config
+
+    @classmethod
+    def devices(cls) -> list[dict[str, Any]]:
+        return list(g_context().get_dict("_devices") or [])
+
+    @classmethod
+    def bind(cls, index: int) -> dict[str, Any] | None:
+        """绑定设备矩阵中的第 index 台设备（每个 worker 一台），未配置设备矩阵时返回 None"""
+        devices = cls.devices()
+        if not devices:
+            cls._device = None
+            return None
+        if index >= len(devices):
+            raise ValueError(f"设备矩阵只有 {len(devices)} 台设备，无法分配给第 {index + 1} 个 worker")
+
+        device = dict(devices[index])
+        capabilities = dict(device.get("capabilities") or {})
+        platform = str(device.get("platform") or g_context().get_dict("PLATFORM") or "android").lower()
+        if len(devices) > 1 and platform in _PORT_CAPABILITIES:
+            port_cap, base_port = _PORT_CAPABILITIES[platform]
+            capabilities.setdefault(port_cap, base_port + index)
+        device["capabilities"] = capabilities
+        cls._device = device
+        print(f"绑定设备: {device.get('name') or device.get('udid') or index}")
+        return device
+
+    @classmethod
+    def device(cls) -> dict[str, Any]:
+        return cls._device or {}
+
+    @classmethod
+    def _healthy(cls, session: _Session, timeout: float) -> bool:
+        """session 能在 timeout 秒内响应命令"""
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            executor.submit(session.driver.get_window_size).result(timeout=timeout)
+            return True
+        except FutureTimeoutError:
+            print(f"Appium session {session.driver.session_id} 无响应，重新创建")
+            return False
+        except Exception as e:
+            print(f"Appium session 不可用，重新创建: {e}")
+            return False
+        finally:
+            executor.shutdown(wait=False)
+
+    @classmethod
+    def _discard(cls) -> None:
+        session, cls._session = cls._session, None
+        if session is not None:
+            _quit_in_background(session.driver)
+
+    @classmethod
+    def acquire(cls, server_url: str, capabilities: dict[str, Any]):
+        """获取当前设备的 session：配置相同且健康时复用，否则新建"""
+        config = cls.config()
+        key = (server_url, json.dumps(capabilities, sort_keys=True, default=str))
+        session = cls._session
+        if session is not None:
+            if session.key != key:
+                print("capabilities 已变化，重新创建 Appium session")
+                cls._discard()
+            elif config["recycle_after"] and session.uses >= config["recycle_after"]:
+                cls._discard()
+            elif not cls._healthy(session, config["health_timeout"]):
+                cls._discard()
+
+        if cls._session is None:
+            options = AppiumOptions()
+            options.load_capabilities(capabilities)
+            driver = webdriver.Remote(command_executor=server_url, options=options)
+            LocatorCache.instrument(driver)
+            platform = str(capabilities.get("platformName", "")).lower()
+            cls._session = _Session(driver, key, platform)
+
+        cls._session.uses += 1
+        cls._leased = True
+        g_context().set_dict("current_driver", cls._session.driver)
+        return cls._session.driver
+
+    @classmethod
+    def _app_id(cls, session: _Session) -> str | None:
+        """被测 App 的包名/bundleId（优先取 capabilities，否则取当前前台 App）"""
+        if session.app_id:
+            return session.app_id
+        caps = session.driver.capabilities or {}
+        app_id = caps.get("appPackage") or caps.get("bundleId") or caps.get("appium:appPackage") or caps.get("appium:bundleId")
+        if not app_id:
+            if session.platform == "android":
+                app_id = session.driver.current_package
+            else:
+                app_id = (session.driver.execute_script("mobile: activeAppInfo") or {}).get("bundleId")
+        session.app_id = app_id
+        return app_id
+
+    @classmethod
+    def release(cls) -> None:
+        """用例结束：重置 App 状态，保留 session 给下一个用例（重置失败时丢弃 session）"""
+        g_context().set_dict("current_driver", None)
+        if not cls._leased or cls._session is None:
+            return
+        cls._leased = False
+        reset = cls.config()["reset"]
+        if reset == "none":
+            return
+        if reset == "quit":
+            session, cls._session = cls._session, None
+            cls._quit(session)
+            return
+
+        session = cls._session
+        try:
+            app_id = cls._app_id(session)
+            if not app_id:
+                raise RuntimeError("无法确定被测 App 的包名")
+            session.driver.terminate_app(app_id)
+            if reset == "clear" and session.platform == "android":
+                session.driver.execute_script("mobile: clearApp", {"appId": app_id})
+            session.driver.activate_app(app_id)
+        except Exception as e:
+            print(f"重置 App 失败，丢弃 Appium session: {e}")
+            cls._discard()
+
+    @classmethod
+    def _quit(cls, session: _Session) -> None:
+        """退出 session，最多等待 health_timeout 秒"""
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            executor.submit(session.driver.quit).result(timeout=cls.config()["health_timeout"])
+        except FutureTimeoutError:
+            print("退出 Appium session 超时，跳过")
+        except Exception as e:
+            print(f"退出 Appium session 失败: {e}")
+        finally:
+            executor.shutdown(wait=False)
+
+    @classmethod
+    def close(cls) -> None:
+        """退出 session（进程结束时调用）"""
+        g_context().set_dict("current_driver", None)
+        cls._leased = False
+        session, cls._session = cls._session, None
+        if session is not None:
+            cls._quit(session)
+
+
+def test_device_pool() -> None:
+    """
+    集成测试 - 在本地的 WebDriver HTTP 桩上检查 session 复用、用例之间重置 App、卡死 session 重新创建和进程结束时退出 session
+    """
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    calls: list[tuple[str, str, str | None]] = []
+    hung: set[str] = set()
+
+    class WebDriverStub(BaseHTTPRequestHandler):
+        """只实现 DevicePool 用到的命令：新建/退出 session、获取窗口大小、执行 mobile: 脚本"""
+
+        def _send(self, value) -> None:
+            body = json.dumps({"value": value}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            script = json.loads(self.rfile.read(length) or b"{}").get("script")
+            calls.append(("POST", self.path, script))
+            if self.path == "/session":
+                session_id = f"s{sum(1 for call in calls if call[1] == '/session')}"
+                self._send({"sessionId": session_id, "capabilities": {"platformName": "Android"}})
+            elif script == "mobile: getCurrentPackage":
+                self._send("com.demo.app")
+            else:
+                self._send(None)
+
+        def do_GET(self):
+            calls.append(("GET", self.path, None))
+            if self.path.split("/")[2] in hung:
+                time.sleep(2)  # 模拟卡死的 session
+            self._send({"x": 0, "y": 0, "width": 1080, "height": 2400})
+
+        def do_DELETE(self):
+            calls.append(("DELETE", self.path, None))
+            self._send(None)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WebDriverStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server_url = f"http://127.0.0.1:{server.server_port}"
+    capabilities = {"platformName": "Android", "appium:automationName": "UiAutomator2"}
+    try:
+        g_context().set_dict("_devices", [{"name": "emu-1", "udid": "emulator-5554"}, {"name": "emu-2", "udid": "emulator-5556"}])
+        g_context().set_dict("_device_pool", {"health_timeout": 1})
+        device = DevicePool.bind(1)
+        assert device["capabilities"]["appium:systemPort"] == 8201, "多台设备时应按设备分配 systemPort"
+
+        # 用例之间复用 session，用例结束时重启 App
+        first = DevicePool.acquire(server_url, capabilities)
+        DevicePool.release()
+        assert DevicePool.acquire(server_url, capabilities).session_id == first.session_id, "健康的 session 应被复用"
+        scripts = [call[2] for call in calls if call[2]]
+        assert scripts.count("mobile: terminateApp") == 1 and scripts.count("mobile: activateApp") == 1
+        assert sum(1 for call in calls if call[1] == "/session") == 1
+
+        # 健康检查超时的 session 丢弃后重新创建
+        hung.add(first.session_id)
+        DevicePool.release()
+        second = DevicePool.acquire(server_url, capabilities)
+        assert second.session_id != first.session_id, "卡死的 session 应重新创建"
+
+        # 进程结束时退出 session
+        DevicePool.release()
+        DevicePool.close()
+        assert ("DELETE", f"/session/{second.session_id}", None) in calls
+        assert g_context().get_dict("current_driver") is None
+    finally:
+        server.shutdown()
+        g_context().set_dict("_devices", None)
+        g_context().set_dict("_device_pool", None)
+        DevicePool._device = None
+    print("设备 session 池测试通过")
@@ -0,0 +1,142 @@
+"""
+元素定位缓存
+连续步骤操作同一元素时复用已找到的元素，省去重复的 find_element 请求
+
+- 缓存属于当前 Appium session，session 重建或用例结束时清空
+- 执行可能改变界面的关键字（点击、输入、滑动、返回等）后清空；只读关键字（get_/assert_/等待元素出现等）保留缓存
+- 使用缓存的元素时如果已失效（StaleElementReferenceException），由 runner 清空缓存后重试该步骤一次
+- 统计每个用例的 driver 请求次数（发送到 Appium Server 的命令数）和缓存命中次数，用例结束时输出
+"""
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from typing import Any
+
+# 不改变界面的关键字（前缀），执行后保留缓存
+_READ_ONLY_PREFIXES = ("get_", "assert_", "is_", "query_", "take_", "find_elements", "wait_for_element")
+_MUTATING = {"wait_for_element_gone"}
+
+
+def is_read_only(keyword: str) -> bool:
+    return keyword.startswith(_READ_ONLY_PREFIXES) and keyword not in _MUTATING
+
+
+def match_page_source(root: ET.Element, locator_type: str, element: str, platform: str) -> list[ET.Element] | None:
+    """
+    在页面源码中匹配元素
+
+    :return: 匹配到的节点；定位方式无法在页面源码中解析（uiautomator、predicate 等）时返回 None
+    """
+    t = (locator_type or "").lower()
+    ios = platform == "ios"
+    if t in ("id", "resource_id"):
+        if ios:
+            return [node for node in root.iter() if node.get("name") == element]
+        # 未带包名的 id 由 UiAutomator2 补全为 <包名>:id/<id>
+        return [node for node in root.iter()
+                if (rid := node.get("resource-id")) and (rid == element or rid.endswith(f":id/{element}"))]
+    if t in ("accessibility_id", "accessibility", "aid"):
+        attr = "name" if ios else "content-desc"
+        return [node for node in root.iter() if node.get(attr) == element]
+    if t in ("class", "class_name"):
+        return [node for node in root.iter() if node.tag == element]
+    if t == "xpath":
+        # ElementTree 只支持 XPath 的子集（不支持 contains() 等函数），不支持时返回 None
+        if element.startswith("//"):
+            path = "." + element
+        elif element == f"/{root.tag}":
+            return [root]
+        elif element.startswith(f"/{root.tag}/"):
+            path = "." + element[len(root.tag) + 1:]
+        else:
+            return None
+        try:
+            return root.findall(path)
+        except (SyntaxError, KeyError):
+            return None
+    return None
+
+
+def describe_node(node: ET.Element, platform: str) -> tuple[bool, str]:
+    """节点是否可见及其文本"""
+    if platform == "ios":
+        return node.get("visible") == "true", node.get("value") or node.get("label") or ""
+    return node.get("displayed", "true") == "true", node.get("text") or ""
+
+
+class LocatorCache:
+    _elements: dict[tuple[str, str], Any] = {}
+    _session_id: str | None = None
+    _served = False  # 当前步骤是否使用了缓存的元素
+    _commands = 0
+    _stats = {"hits": 0, "lookups": 0, "commands": 0}  # 当前用例
+    _totals = {"cases": 0, "hits": 0, "lookups": 0, "commands": 0}
+
+    @classmethod
+    def get(cls, driver, by: str, value: str):
+        cls._stats["lookups"] += 1
+        if driver.session_id != cls._session_id:
+            cls.invalidate()
+            cls._session_id = driver.session_id
+            return None
+        element = cls._elements.get((by, value))
+        if element is not None:
+            cls._stats["hits"] += 1
+            cls._served = True
+        return element
+
+    @classmethod
+    def put(cls, driver, by: str, value: str, element) -> None:
+        if driver.session_id == cls._session_id:
+            cls._elements[(by, value)] = element
+
+    @classmethod
+    def invalidate(cls) -> None:
+        cls._elements.clear()
+
+    @classmethod
+    def begin_step(cls) -> None:
+        cls._served = False
+
+    @classmethod
+    def served_from_cache(cls) -> bool:
+        return cls._served
+
+    @classmethod
+    def after_keyword(cls, keyword: str) -> None:
+        """关键字执行后：可能改变界面的关键字清空缓存"""
+        if not is_read_only(keyword):
+            cls.invalidate()
+
+    @classmethod
+    def instrument(cls, driver) -> None:
+        """统计 driver 发送到 Appium Server 的命令数（元素上的操作同样经过 driver.execute）"""
+        execute = driver.execute
+
+        def counting_execute(*args, **kwargs):
+            cls._commands += 1
+            return execute(*args, **kwargs)
+
+        driver.execute = counting_execute
+
+    @classmethod
+    def begin_case(cls) -> None:
+        cls._stats = {"hits": 0, "lookups": 0, "commands": cls._commands}
+
+    @classmethod
+    def end_case(cls) -> dict[str, Any]:
+        cls.invalidate()
+        stats = {**cls._stats, "commands": cls._commands - cls._stats["commands"]}
+        cls._totals["cases"] += 1
+        for key in ("hits", "lookups", "commands"):
+            cls._totals[key] += stats[key]
+        print(f"driver 请求 {stats['commands']} 次，元素定位 {stats['lookups']} 次，缓存命中 {stats['hits']} 次")
+        return stats
+
+    @classmethod
+    def print_report(cls) -> None:
+        totals = cls._totals
+        if not totals["cases"]:
+            return
+        print(f"用例 {totals['cases']} 个，平均每个用例 driver 请求 {totals['commands'] / totals['cases']:.1f} 次，"
+              f"元素定位 {totals['lookups']} 次，缓存命中 {totals['hits']} 次")
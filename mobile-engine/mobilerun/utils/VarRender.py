@@ -1,9 +1,48 @@
+from functools import lru_cache
 from typing import Any
 
-from jinja2 import Template
+from jinja2 import Environment, Template
+
+TEMPLATE_CACHE_SIZE = 2048
+_TEMPLATE_MARKERS = ("{{", "{%", "{#")
+_fast_path_count = 0
+_jinja_env = Environment()
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(source: str) -> Template:
+    return _jinja_env.from_string(source)
+
+
+def _needs_render(source: str) -> bool:
+    if any(marker in source for marker in _TEMPLATE_MARKERS):
+        return True
+    return "\r" in source or source.endswith("\n")
 
 
 def refresh(target: Any | None, context: dict[str, Any]) -> str | None:
+    global _fast_path_count
     if target is None:
         return None
-    return Template(str(target)).render(context)
+    source = str(target)
+    if not _needs_render(source):
+        _fast_path_count += 1
+        return source
+    return _compile_template(source).render(context)
+
+
+def template_cache_info() -> dict[str, int]:
+    info = _compile_template.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "fast_path": _fast_path_count,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def clear_template_cache() -> None:
+    global _fast_path_count
+    _compile_template.cache_clear()
+    _fast_path_count = 0
@@ -51,6 +51,7 @@ def run():
     headless = args.get("headless", True)
     html_report = args.get("html_report", True)
     case_type = args.get("type", "yaml")
+    workers = int(args.get("workers") or 0)
     
     # 验证参数
     if not cases_path:
@@ -79,6 +80,7 @@ def run():
     print(f"生成速率: {spawn_rate}/s")
     print(f"运行时长: {run_time}")
     print(f"无界面模式: {headless}")
+    print(f"Worker 进程: {workers or f'{os.cpu_count()}（每个 CPU 核心一个）'}")
     print("=" * 60)
     
     # 解析用例
@@ -123,7 +125,8 @@ def run():
         users=users,
         spawn_rate=spawn_rate,
         run_time=run_time,
-        headless=headless
+        headless=headless,
+        workers=workers
     )
     
     # 设置测试用例和上下文（使用 g_context 的数据）
@@ -9,6 +9,8 @@ Locust Runner - 基于关键字驱动的性能测试执行器
 - 数据驱动
 - 多用户类型
 - HTML 报告生成
+- 分布式运行：本机启动 1 个 master + N 个 worker 进程（默认每个 CPU 核心一个 worker），
+  由 master 汇总统计并输出 CSV，报告与单进程运行相同
 """
 import os
 import sys
@@ -17,484 +19,74 @@ import tempfile
 import json
 import csv
 import re
+import socket
+import time
 from pathlib import Path
 from datetime import datetime
 
+# 超过 运行时长 + 该时间（秒）仍未结束时强制停止（包括等待 worker 连接、停止用户、写 CSV 的时间）
+RUN_TIMEOUT_GRACE = 120
 
-# Locust 脚本模板 - 支持完整关键字驱动
-LOCUSTFILE_TEMPLATE = '''
-"""Auto-generated Locust script from YAML test cases"""
-import json
-import time
-import random
-import re
-from locust import HttpUser, task, between, constant, events, SequentialTaskSet
+# 停止进程时等待其退出的时间（秒），超时后强制结束
+TERMINATE_TIMEOUT = 10
 
-# 测试用例和上下文
-CASES = __CASES__
-CTX = __CTX__
-CONFIG = __CONFIG__
+# master 等待所有 worker 连接的最长时间（秒）
+EXPECT_WORKERS_MAX_WAIT = 60
 
+_TIMESPAN_PATTERN = re.compile(r"(?:(\d+)h)?\s*(?:(\d+)m)?\s*(?:(\d+)s)?")
 
-class Keywords:
-    """关键字驱动执行器"""
-    
-    def __init__(self, client):
-        self.client = client
-        self.ctx = {}
-        self.response = None
-        self._catch_ctx = None
-        self._tx_stack = []
-    
-    def _render(self, value):
-        """渲染变量 {{var}}"""
-        if isinstance(value, str):
-            return re.sub(r"\\{\\{(\\w+)\\}\\}", lambda m: str(self.ctx.get(m.group(1), m.group(0))), value)
-        if isinstance(value, dict):
-            return {k: self._render(v) for k, v in value.items()}
-        if isinstance(value, list):
-            return [self._render(i) for i in value]
-        return value
-    
-    def _pop_kw(self, kw):
-        kw.pop("关键字", None)
-        kw.pop("keyword", None)
-        return kw
-    
-    # ========== HTTP 请求 ==========
-    
-    def get(self, **kw):
-        return self._request("get", **self._pop_kw(kw))
-    
-    def post(self, **kw):
-        return self._request("post", **self._pop_kw(kw))
-    
-    def put(self, **kw):
-        return self._request("put", **self._pop_kw(kw))
-    
-    def delete(self, **kw):
-        return self._request("delete", **self._pop_kw(kw))
-    
-    def patch(self, **kw):
-        return self._request("patch", **self._pop_kw(kw))
-    
-    def _request(self, method, **kw):
-        url = self._render(kw.pop("url", "/"))
-        name = kw.pop("name", None)
-        catch = kw.pop("catch_response", False)
-        
-        req_kw = {}
-        if name:
-            req_kw["name"] = name
-        if catch:
-            req_kw["catch_response"] = True
-        
-        for key in ["headers", "params", "data", "json", "files"]:
-            if key in kw:
-                req_kw[key] = self._render(kw[key])
-        
-        func = getattr(self.client, method)
-        
-        if catch:
-            self._catch_ctx = func(url, **req_kw)
-            self.response = self._catch_ctx.__enter__()
-        else:
-            self.response = func(url, **req_kw)
-        
-        return self.response
-    
-    # ========== 等待时间 ==========
-    
-    def wait(self, **kw):
-        self._pop_kw(kw)
-        sec = kw.get("seconds")
-        if sec:
-            time.sleep(float(sec))
-        else:
-            time.sleep(random.uniform(float(kw.get("min", 1)), float(kw.get("max", 1))))
-    
-    think_time = wait
-    
-    def constant_pacing(self, **kw):
-        self._pop_kw(kw)
-        time.sleep(float(kw.get("seconds", 1)))
-    
-    # ========== 响应验证 ==========
-    
-    def assert_status(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return False
-        expected = int(kw.get("expected", 200))
-        actual = self.response.status_code
-        if actual == expected:
-            self._mark_success()
-            return True
-        if kw.get("fail_on_error", True):
-            self._mark_failure(f"Expected {expected}, got {actual}")
-        return False
-    
-    check_status = assert_status
-    
-    def assert_response_time(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return False
-        max_ms = float(kw.get("max_ms", 1000))
-        actual = self.response.elapsed.total_seconds() * 1000
-        if actual <= max_ms:
-            return True
-        if kw.get("fail_on_error", True):
-            self._mark_failure(f"Response time {actual:.0f}ms > {max_ms}ms")
-        return False
-    
-    check_response_time = assert_response_time
-    
-    def assert_contains(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return False
-        text = self._render(kw.get("text", ""))
-        if text in self.response.text:
-            return True
-        if kw.get("fail_on_error", True):
-            self._mark_failure(f"Response does not contain: {text}")
-        return False
-    
-    check_contains = assert_contains
-    
-    def assert_json(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return False
-        try:
-            import jsonpath
-            data = self.response.json()
-            path = kw.get("path", "$")
-            expected = self._render(kw.get("expected"))
-            op = kw.get("operator", "eq")
-            
-            result = jsonpath.jsonpath(data, path)
-            if not result:
-                if kw.get("fail_on_error", True):
-                    self._mark_failure(f"JSONPath {path} not found")
-                return False
-            
-            actual = result[0] if isinstance(result, list) else result
-            passed = self._compare(actual, expected, op)
-            
-            if not passed and kw.get("fail_on_error", True):
-                self._mark_failure(f"JSON: {actual} {op} {expected} failed")
-            return passed
-        except Exception as e:
-            if kw.get("fail_on_error", True):
-                self._mark_failure(f"JSON error: {e}")
-            return False
-    
-    validate_json = assert_json
-    
-    def assert_header(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return False
-        name = kw.get("name", "")
-        expected = self._render(kw.get("expected", ""))
-        actual = self.response.headers.get(name, "")
-        if str(actual) == str(expected):
-            return True
-        if kw.get("fail_on_error", True):
-            self._mark_failure(f"Header {name}: expected {expected}, got {actual}")
-        return False
-    
-    def _compare(self, actual, expected, op):
-        try:
-            if op == "eq": return str(actual) == str(expected)
-            if op == "ne": return str(actual) != str(expected)
-            if op == "gt": return float(actual) > float(expected)
-            if op == "lt": return float(actual) < float(expected)
-            if op == "gte": return float(actual) >= float(expected)
-            if op == "lte": return float(actual) <= float(expected)
-            if op == "contains": return str(expected) in str(actual)
-            return str(actual) == str(expected)
-        except:
-            return False
-    
-    def mark_success(self, **kw):
-        self._pop_kw(kw)
-        self._mark_success(kw.get("message", ""))
-    
-    def mark_failure(self, **kw):
-        self._pop_kw(kw)
-        self._mark_failure(kw.get("message", "Unknown error"))
-    
-    def _mark_success(self, msg=""):
-        if self._catch_ctx and self.response:
-            self.response.success()
-    
-    def _mark_failure(self, msg):
-        if self._catch_ctx and self.response:
-            self.response.failure(msg)
-        else:
-            print(f"[FAIL] {msg}")
-    
-    # ========== 事务控制 ==========
-    
-    def start_transaction(self, **kw):
-        self._pop_kw(kw)
-        name = kw.get("name", "tx")
-        self._tx_stack.append({"name": name, "start": time.time()})
-    
-    def end_transaction(self, **kw):
-        self._pop_kw(kw)
-        success = kw.get("success", True)
-        if self._tx_stack:
-            tx = self._tx_stack.pop()
-            ms = (time.time() - tx["start"]) * 1000
-            s = "✓" if success else "✗"
-            print(f"[TX] {s} {tx['name']}: {ms:.0f}ms")
-    
-    def transaction(self, **kw):
-        self._pop_kw(kw)
-        name = kw.get("name", "tx")
-        steps = kw.get("steps", [])
-        self.start_transaction(name=name)
-        try:
-            for step in steps:
-                self._exec_step(step)
-            self.end_transaction(success=True)
-        except:
-            self.end_transaction(success=False)
-            raise
-    
-    # ========== 顺序任务 ==========
-    
-    def sequential_tasks(self, **kw):
-        self._pop_kw(kw)
-        steps = kw.get("steps", [])
-        loop = int(kw.get("loop", 1))
-        for _ in range(loop):
-            for step in steps:
-                self._exec_step(step)
-    
-    def interrupt(self, **kw):
-        self._pop_kw(kw)
-        raise StopIteration(kw.get("message", "Interrupted"))
-    
-    # ========== 数据操作 ==========
-    
-    def set_var(self, **kw):
-        self._pop_kw(kw)
-        name = kw.get("name")
-        if name:
-            self.ctx[name] = self._render(kw.get("value"))
-    
-    def extract_json(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return None
-        try:
-            import jsonpath
-            data = self.response.json()
-            path = kw.get("path", "$")
-            var = kw.get("var", "extracted")
-            idx = int(kw.get("index", 0))
-            result = jsonpath.jsonpath(data, path)
-            if result:
-                val = result[idx] if isinstance(result, list) and len(result) > idx else result
-                self.ctx[var] = val
-                return val
-        except Exception as e:
-            print(f"[EXTRACT] {e}")
-        return None
-    
-    def extract_regex(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return None
-        try:
-            pattern = kw.get("pattern", "")
-            var = kw.get("var", "extracted")
-            group = int(kw.get("group", 1))
-            match = re.search(pattern, self.response.text)
-            if match:
-                val = match.group(group)
-                self.ctx[var] = val
-                return val
-        except Exception as e:
-            print(f"[EXTRACT] {e}")
-        return None
-    
-    def extract_header(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            return None
-        name = kw.get("name", "")
-        var = kw.get("var", "extracted")
-        val = self.response.headers.get(name, "")
-        self.ctx[var] = val
-        return val
-    
-    # ========== 数据驱动 ==========
-    
-    def random_data(self, **kw):
-        self._pop_kw(kw)
-        data = kw.get("data", [])
-        var = kw.get("var", "random_item")
-        if data:
-            self.ctx[var] = random.choice(data)
-            return self.ctx[var]
-        return None
-    
-    def cycle_data(self, **kw):
-        self._pop_kw(kw)
-        data = kw.get("data", [])
-        var = kw.get("var", "cycle_item")
-        key = f"_idx_{var}"
-        if data:
-            idx = self.ctx.get(key, 0)
-            self.ctx[var] = data[idx % len(data)]
-            self.ctx[key] = idx + 1
-            return self.ctx[var]
-        return None
-    
-    # ========== 条件与循环 ==========
-    
-    def if_condition(self, **kw):
-        self._pop_kw(kw)
-        cond = self._render(kw.get("condition", ""))
-        then_steps = kw.get("then", [])
-        else_steps = kw.get("else", [])
-        try:
-            result = eval(cond, {"__builtins__": {}}, self.ctx)
-        except:
-            result = False
-        for step in (then_steps if result else else_steps):
-            self._exec_step(step)
-    
-    def loop(self, **kw):
-        self._pop_kw(kw)
-        count = int(kw.get("count", 1))
-        steps = kw.get("steps", [])
-        delay = float(kw.get("delay", 0))
-        for i in range(count):
-            self.ctx["_loop_index"] = i
-            for step in steps:
-                self._exec_step(step)
-            if delay > 0:
-                time.sleep(delay)
-    
-    def foreach(self, **kw):
-        self._pop_kw(kw)
-        items = kw.get("items", [])
-        if isinstance(items, str):
-            items = self.ctx.get(items, [])
-        items = self._render(items)
-        var = kw.get("var", "item")
-        steps = kw.get("steps", [])
-        for i, item in enumerate(items):
-            self.ctx[var] = item
-            self.ctx["_foreach_index"] = i
-            for step in steps:
-                self._exec_step(step)
-    
-    # ========== 日志 ==========
-    
-    def log(self, **kw):
-        self._pop_kw(kw)
-        msg = self._render(kw.get("message", ""))
-        level = kw.get("level", "info").upper()
-        print(f"[{level}] {msg}")
-    
-    def print_response(self, **kw):
-        self._pop_kw(kw)
-        if not self.response:
-            print("[RESPONSE] No response")
-            return
-        fmt = kw.get("format", "json")
-        if fmt == "json":
-            try:
-                print(json.dumps(self.response.json(), indent=2, ensure_ascii=False))
-            except:
-                print(self.response.text)
-        elif fmt == "text":
-            print(self.response.text)
-        elif fmt == "headers":
-            print(dict(self.response.headers))
-    
-    # ========== 步骤执行 ==========
-    
-    def _exec_step(self, step):
-        if isinstance(step, dict):
-            for name, data in step.items():
-                if isinstance(data, dict):
-                    kw = data.get("关键字") or data.get("keyword", "")
-                    if kw and hasattr(self, kw):
-                        try:
-                            getattr(self, kw)(**data)
-                        except StopIteration:
-                            raise
-                        except Exception as e:
-                            print(f"[ERROR] {name}: {e}")
 
+# 静态 Locust 脚本，加载 LocustRunner 写出的场景文件
+LOCUSTFILE = str(Path(__file__).with_name("locustfile.py"))
 
-# 事件钩子
-@events.test_start.add_listener
-def on_test_start(environment, **kwargs):
-    print("=" * 60)
-    print("Performance Test Started")
-    print(f"Host: {environment.host}")
-    print("=" * 60)
+# 场景文件路径的环境变量（与 locustfile.SCENARIO_ENV 相同）
+SCENARIO_ENV = "PERFRUN_SCENARIO"
 
 
-@events.test_stop.add_listener
-def on_test_stop(environment, **kwargs):
-    print("=" * 60)
-    print("Performance Test Completed")
-    print("=" * 60)
+def parse_timespan(value):
+    """解析运行时长（如 90、30s、5m、1h30m）为秒数，无法解析时返回 None"""
+    value = str(value or "").strip().lower()
+    if value.isdigit():
+        return int(value)
+    match = _TIMESPAN_PATTERN.fullmatch(value)
+    if not value or not match:
+        return None
+    hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
 
 
-# 用户类
-class YamlUser(HttpUser):
-    wait_time = between(
-        CONFIG.get("wait_min", 1),
-        CONFIG.get("wait_max", 3)
-    )
-    
-    def on_start(self):
-        self.kw = Keywords(self.client)
-        self.kw.ctx.update(CTX)
-        
-        # 执行 on_start 步骤
-        for case in CASES:
-            on_start = case.get("on_start", [])
-            for step in on_start:
-                self.kw._exec_step(step)
-    
-    def on_stop(self):
-        # 执行 on_stop 步骤
-        for case in CASES:
-            on_stop = case.get("on_stop", [])
-            for step in on_stop:
-                self.kw._exec_step(step)
-    
-    @task
-    def run_cases(self):
-        for case in CASES:
-            steps = case.get("steps", [])
-            for step in steps:
-                self.kw._exec_step(step)
-'''
+def _free_port():
+    """获取本机一个空闲端口（master 监听端口）"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _stop_processes(procs):
+    """停止进程：先发送 SIGTERM（Locust 收到后会停止用户并写出 CSV），超时后强制结束"""
+    for proc in procs:
+        if proc.poll() is None:
+            proc.terminate()
+    deadline = time.monotonic() + TERMINATE_TIMEOUT
+    for proc in procs:
+        try:
+            proc.wait(timeout=max(0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
 
 
 class LocustRunner:
     """Locust 性能测试执行器"""
     
-    def __init__(self, host, users=10, spawn_rate=1, run_time="60s", headless=True):
+    def __init__(self, host, users=10, spawn_rate=1, run_time="60s", headless=True, workers=0):
         self.host = host
         self.users = users
         self.spawn_rate = spawn_rate
         self.run_time = run_time
         self.headless = headless
+        # worker 进程数：0 表示每个 CPU 核心一个，1 表示单进程运行（不启动 master/worker）
+        self.workers = int(workers) if workers else (os.cpu_count() or 1)
         self.test_cases = []
         self.context = {}
         self.config = {
@@ -516,11 +108,12 @@ class LocustRunner:
     
     def run(self, output_dir=None):
         """运行性能测试"""
-        locustfile = self._generate_locustfile()
+        scenario = self._write_scenario()
+        env = {**os.environ, SCENARIO_ENV: scenario}
         
         cmd = [
             sys.executable, "-m", "locust",
-            "-f", locustfile,
+            "-f", LOCUSTFILE,
             "-H", self.host,
             "-u", str(self.users),
             "-r", str(self.spawn_rate),
@@ -543,33 +136,110 @@ class LocustRunner:
         print(f"Users: {self.users}")
         print(f"Spawn Rate: {self.spawn_rate}/s")
         print(f"Duration: {self.run_time}")
+        print(f"Workers: {self.workers if self.workers > 1 else 'single process'}")
         print(f"{'='*60}\n")
         
         try:
-            result = subprocess.run(cmd)
+            if self.workers > 1:
+                exit_code = self._run_distributed(cmd, env, output_dir)
+            else:
+                exit_code = self._run_process(cmd, env)
             if output_dir and csv_prefix:
                 self._generate_html_from_csv(output_dir, csv_prefix)
-            return {"exit_code": result.returncode}
+            return {"exit_code": exit_code}
         finally:
             try:
-                os.unlink(locustfile)
+                os.unlink(scenario)
             except:
                 pass
     
-    def _generate_locustfile(self):
-        """生成 Locust 脚本文件"""
-        cases_json = repr(self.test_cases)
-        ctx_json = repr(self.context)
-        config_json = repr(self.config)
-        
-        code = LOCUSTFILE_TEMPLATE
-        code = code.replace('__CASES__', cases_json)
-        code = code.replace('__CTX__', ctx_json)
-        code = code.replace('__CONFIG__', config_json)
+    def _run_timeout(self):
+        """整个运行的超时时间（秒），非无界面模式或无法解析运行时长时不限制"""
+        seconds = parse_timespan(self.run_time)
+        if not self.headless or seconds is None:
+            return None
+        return seconds + RUN_TIMEOUT_GRACE
+    
+    def _run_process(self, cmd, env):
+        """单进程运行"""
+        proc = subprocess.Popen(cmd, env=env)
+        try:
+            return proc.wait(timeout=self._run_timeout())
+        except subprocess.TimeoutExpired:
+            print(f"\n❌ Locust 运行超时（{self.run_time} + {RUN_TIMEOUT_GRACE}s），已停止")
+            return 1
+        finally:
+            _stop_processes([proc])
+    
+    def _run_distributed(self, cmd, env, output_dir=None):
+        """
+        分布式运行：本机启动 master 和 self.workers 个 worker 进程
+        
+        - master 负责分配用户、汇总各 worker 的统计并写出 CSV（与单进程运行的 CSV 格式相同）
+        - worker 输出写入 output_dir/locust-worker-N.log，避免与 master 的输出混在一起
+        - 任一 worker 异常退出或运行超时，停止所有进程并返回失败
+        """
+        port = _free_port()
+        master_cmd = cmd + [
+            "--master",
+            "--master-bind-host", "127.0.0.1",
+            "--master-bind-port", str(port),
+            "--expect-workers", str(self.workers),
+            "--expect-workers-max-wait", str(EXPECT_WORKERS_MAX_WAIT),
+        ]
+        worker_cmd = [
+            sys.executable, "-m", "locust",
+            "-f", LOCUSTFILE,
+            "--worker",
+            "--master-host", "127.0.0.1",
+            "--master-port", str(port),
+        ]
         
-        fd, fp = tempfile.mkstemp(suffix=".py", prefix="locust_")
+        timeout = self._run_timeout()
+        deadline = time.monotonic() + timeout if timeout else None
+        master = subprocess.Popen(master_cmd, env=env)
+        workers, logs = [], []
+        try:
+            for i in range(self.workers):
+                log = None
+                if output_dir:
+                    log = open(Path(output_dir) / f"locust-worker-{i + 1}.log", "w", encoding="utf-8")
+                    logs.append(log)
+                workers.append(subprocess.Popen(
+                    worker_cmd,
+                    env=env,
+                    stdout=log if log else subprocess.DEVNULL,
+                    stderr=subprocess.STDOUT if log else subprocess.DEVNULL,
+                ))
+            
+            while master.poll() is None:
+                failed = [i + 1 for i, w in enumerate(workers) if w.poll() not in (None, 0)]
+                if failed:
+                    print(f"\n❌ Locust worker {', '.join(map(str, failed))} 异常退出，停止测试")
+                    _stop_processes([master])
+                    return 1
+                if deadline and time.monotonic() > deadline:
+                    print(f"\n❌ Locust 运行超时（{self.run_time} + {RUN_TIMEOUT_GRACE}s），已停止")
+                    _stop_processes([master])
+                    return 1
+                time.sleep(0.5)
+            return master.returncode
+        finally:
+            # master 结束时会通知 worker 退出，未退出的 worker 在这里停止
+            _stop_processes([master] + workers)
+            for log in logs:
+                log.close()
+    
+    def _write_scenario(self):
+        """写出场景文件（用例、上下文、运行配置），无法序列化为 JSON 的值按字符串写出"""
+        scenario = {
+            "cases": self.test_cases,
+            "context": self.context,
+            "config": self.config,
+        }
+        fd, fp = tempfile.mkstemp(suffix=".json", prefix="perfrun_scenario_")
         with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            f.write(code)
+            json.dump(scenario, f, ensure_ascii=False, default=str)
         return fp
     
     def _generate_html_from_csv(self, output_dir, csv_prefix):
@@ -0,0 +1,752 @@
+"""
+Locust 脚本 - 关键字驱动执行器
+
+LocustRunner 把用例、上下文和运行配置写入 JSON 场景文件，通过环境变量 PERFRUN_SCENARIO 传入，
+本脚本（master 和每个 worker 进程）导入时加载一次，并把步骤预编译为可调用对象：
+关键字查找、参数拆分、嵌套步骤的编译、不含变量的参数判断都在加载时完成，
+每次请求只做变量渲染和 HTTP 调用
+
+变量渲染：模板字符串只解析一次，拆分为字面量、变量 {{var}}、函数 {{$func}} / {{$func(a, b)}} 片段，
+渲染时按片段拼接；不含变量和函数的值直接复用原值，不含变量的 JSON 请求体在加载时预先编码
+
+本文件由 Locust 按路径导入，只依赖标准库和 locust，不要从 perfrun 包中导入
+"""
+import json
+import os
+import time
+import random
+import re
+import uuid
+from functools import lru_cache
+from locust import HttpUser, task, between, events
+
+# 场景文件路径的环境变量
+SCENARIO_ENV = "PERFRUN_SCENARIO"
+
+# 关键字字段（中文/英文）
+_KEYWORD_KEYS = ("关键字", "keyword")
+
+# 可以包含子步骤的参数
+_NESTED_STEP_KEYS = ("steps", "then", "else")
+
+# HTTP 请求关键字
+_HTTP_METHODS = ("get", "post", "put", "delete", "patch")
+
+# 需要渲染变量的请求参数
+_REQUEST_OPTIONS = ("headers", "params", "data", "json", "files")
+
+
+def load_scenario(path=None):
+    """加载场景文件，返回 (用例列表, 上下文, 运行配置)"""
+    path = path or os.environ.get(SCENARIO_ENV)
+    if not path:
+        print(f"[WARN] 未设置 {SCENARIO_ENV}，没有可执行的用例")
+        return [], {}, {}
+    with open(path, "r", encoding="utf-8") as f:
+        scenario = json.load(f)
+    return scenario.get("cases", []), scenario.get("context", {}), scenario.get("config", {})
+
+
+# ========== 模板编译 ==========
+
+# 模板片段：{{var}} 变量 / {{$func}}、{{$func(a, b)}} 函数（参数按字符串传入）
+_SEGMENT_PATTERN = re.compile(r"\{\{(?:(\w+)|\$(\w+)(?:\(([^(){}]*)\))?)\}\}")
+
+# 字符串模板编译缓存容量（按源码缓存，LRU 淘汰）
+TEMPLATE_CACHE_SIZE = 2048
+
+# 模板函数 {{$name}}，未注册的函数按原文保留
+TEMPLATE_FUNCTIONS = {
+    "timestamp": lambda: int(time.time()),
+    "timestamp_ms": lambda: int(time.time() * 1000),
+    "uuid": lambda: str(uuid.uuid4()),
+    "random_int": lambda low=0, high=1000000: random.randint(int(low), int(high)),
+    "datetime": lambda fmt="%Y-%m-%d %H:%M:%S": time.strftime(fmt),
+}
+
+_LITERAL, _VAR, _FUNC = 0, 1, 2
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_string(source):
+    """
+    把字符串模板解析为片段列表并生成渲染函数
+    
+    变量不存在时保留 {{var}} 原文，变量值按 str() 拼接（与逐次正则替换的结果相同）
+    
+    :return: 渲染函数 render(ctx) -> str；不包含变量和函数时返回 None
+    """
+    if "{{" not in source:
+        return None
+    segments = []
+    pos = 0
+    for m in _SEGMENT_PATTERN.finditer(source):
+        var, func_name, args = m.groups()
+        if var is None:
+            func = TEMPLATE_FUNCTIONS.get(func_name)
+            if func is None:
+                continue  # 原文留在下一个字面量片段中
+        if m.start() > pos:
+            segments.append((_LITERAL, source[pos:m.start()], None))
+        if var is not None:
+            segments.append((_VAR, var, m.group(0)))
+        else:
+            args = tuple(a.strip().strip("'\"") for a in args.split(",")) if args and args.strip() else ()
+            segments.append((_FUNC, func, args))
+        pos = m.end()
+    if not segments:
+        return None
+    if pos < len(source):
+        segments.append((_LITERAL, source[pos:], None))
+    
+    if len(segments) == 1 and segments[0][0] == _VAR:
+        _, name, placeholder = segments[0]
+        return lambda ctx: str(ctx.get(name, placeholder))
+    
+    def render(ctx):
+        parts = []
+        for kind, a, b in segments:
+            if kind == _LITERAL:
+                parts.append(a)
+            elif kind == _VAR:
+                parts.append(str(ctx.get(a, b)))
+            else:
+                parts.append(str(a(*b)))
+        return "".join(parts)
+    
+    return render
+
+
+def compile_value(value):
+    """
+    递归编译任意结构（dict/list/str）
+    
+    :return: 渲染函数 render(ctx)，容器每次重新构建；值中不包含变量和函数时返回 None，直接使用原值
+    """
+    if isinstance(value, str):
+        return _compile_string(value)
+    if isinstance(value, dict):
+        items = [(k, compile_value(v), v) for k, v in value.items()]
+        if all(node is None for _, node, _ in items):
+            return None
+        return lambda ctx: {k: v if node is None else node(ctx) for k, node, v in items}
+    if isinstance(value, list):
+        nodes = [(compile_value(i), i) for i in value]
+        if all(node is None for node, _ in nodes):
+            return None
+        return lambda ctx: [i if node is None else node(ctx) for node, i in nodes]
+    return None
+
+
+def _with_json_content_type(headers):
+    """预编码的 JSON 请求体需要自行设置 Content-Type（与 requests 处理 json 参数时相同）"""
+    if headers and any(str(k).lower() == "content-type" for k in headers):
+        return headers
+    return {**(headers or {}), "Content-Type": "application/json"}
+
+
+class Keywords:
+    """关键字驱动执行器"""
+    
+    def __init__(self, client):
+        self.client = client
+        self.ctx = {}
+        self.response = None
+        self._catch_ctx = None
+        self._tx_stack = []
+    
+    def _render(self, value):
+        """渲染变量 {{var}} 和函数 {{$func}}（字符串模板解析一次后缓存）"""
+        if isinstance(value, str):
+            node = _compile_string(value)
+            return value if node is None else node(self.ctx)
+        if isinstance(value, dict):
+            return {k: self._render(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._render(i) for i in value]
+        return value
+    
+    def _pop_kw(self, kw):
+        kw.pop("关键字", None)
+        kw.pop("keyword", None)
+        return kw
+    
+    # ========== HTTP 请求 ==========
+    
+    def get(self, **kw):
+        return self._request("get", **self._pop_kw(kw))
+    
+    def post(self, **kw):
+        return self._request("post", **self._pop_kw(kw))
+    
+    def put(self, **kw):
+        return self._request("put", **self._pop_kw(kw))
+    
+    def delete(self, **kw):
+        return self._request("delete", **self._pop_kw(kw))
+    
+    def patch(self, **kw):
+        return self._request("patch", **self._pop_kw(kw))
+    
+    def _request(self, method, **kw):
+        url = self._render(kw.pop("url", "/"))
+        name = kw.pop("name", None)
+        catch = kw.pop("catch_response", False)
+        
+        req_kw = {}
+        if name:
+            req_kw["name"] = name
+        if catch:
+            req_kw["catch_response"] = True
+        
+        for key in _REQUEST_OPTIONS:
+            if key in kw:
+                req_kw[key] = self._render(kw[key])
+        
+        return self._send(method, url, catch, req_kw)
+    
+    def _send(self, method, url, catch, req_kw):
+        func = getattr(self.client, method)
+        
+        if catch:
+            self._catch_ctx = func(url, **req_kw)
+            self.response = self._catch_ctx.__enter__()
+        else:
+            self.response = func(url, **req_kw)
+        
+        return self.response
+    
+    # ========== 等待时间 ==========
+    
+    def wait(self, **kw):
+        self._pop_kw(kw)
+        sec = kw.get("seconds")
+        if sec:
+            time.sleep(float(sec))
+        else:
+            time.sleep(random.uniform(float(kw.get("min", 1)), float(kw.get("max", 1))))
+    
+    think_time = wait
+    
+    def constant_pacing(self, **kw):
+        self._pop_kw(kw)
+        time.sleep(float(kw.get("seconds", 1)))
+    
+    # ========== 响应验证 ==========
+    
+    def assert_status(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return False
+        expected = int(kw.get("expected", 200))
+        actual = self.response.status_code
+        if actual == expected:
+            self._mark_success()
+            return True
+        if kw.get("fail_on_error", True):
+            self._mark_failure(f"Expected {expected}, got {actual}")
+        return False
+    
+    check_status = assert_status
+    
+    def assert_response_time(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return False
+        max_ms = float(kw.get("max_ms", 1000))
+        actual = self.response.elapsed.total_seconds() * 1000
+        if actual <= max_ms:
+            return True
+        if kw.get("fail_on_error", True):
+            self._mark_failure(f"Response time {actual:.0f}ms > {max_ms}ms")
+        return False
+    
+    check_response_time = assert_response_time
+    
+    def assert_contains(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return False
+        text = self._render(kw.get("text", ""))
+        if text in self.response.text:
+            return True
+        if kw.get("fail_on_error", True):
+            self._mark_failure(f"Response does not contain: {text}")
+        return False
+    
+    check_contains = assert_contains
+    
+    def assert_json(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return False
+        try:
+            import jsonpath
+            data = self.response.json()
+            path = kw.get("path", "$")
+            expected = self._render(kw.get("expected"))
+            op = kw.get("operator", "eq")
+            
+            result = jsonpath.jsonpath(data, path)
+            if not result:
+                if kw.get("fail_on_error", True):
+                    self._mark_failure(f"JSONPath {path} not found")
+                return False
+            
+            actual = result[0] if isinstance(result, list) else result
+            passed = self._compare(actual, expected, op)
+            
+            if not passed and kw.get("fail_on_error", True):
+                self._mark_failure(f"JSON: {actual} {op} {expected} failed")
+            return passed
+        except Exception as e:
+            if kw.get("fail_on_error", True):
+                self._mark_failure(f"JSON error: {e}")
+            return False
+    
+    validate_json = assert_json
+    
+    def assert_header(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return False
+        name = kw.get("name", "")
+        expected = self._render(kw.get("expected", ""))
+        actual = self.response.headers.get(name, "")
+        if str(actual) == str(expected):
+            return True
+        if kw.get("fail_on_error", True):
+            self._mark_failure(f"Header {name}: expected {expected}, got {actual}")
+        return False
+    
+    def _compare(self, actual, expected, op):
+        try:
+            if op == "eq": return str(actual) == str(expected)
+            if op == "ne": return str(actual) != str(expected)
+            if op == "gt": return float(actual) > float(expected)
+            if op == "lt": return float(actual) < float(expected)
+            if op == "gte": return float(actual) >= float(expected)
+            if op == "lte": return float(actual) <= float(expected)
+            if op == "contains": return str(expected) in str(actual)
+            return str(actual) == str(expected)
+        except:
+            return False
+    
+    def mark_success(self, **kw):
+        self._pop_kw(kw)
+        self._mark_success(kw.get("message", ""))
+    
+    def mark_failure(self, **kw):
+        self._pop_kw(kw)
+        self._mark_failure(kw.get("message", "Unknown error"))
+    
+    def _mark_success(self, msg=""):
+        if self._catch_ctx and self.response:
+            self.response.success()
+    
+    def _mark_failure(self, msg):
+        if self._catch_ctx and self.response:
+            self.response.failure(msg)
+        else:
+            print(f"[FAIL] {msg}")
+    
+    # ========== 事务控制 ==========
+    
+    def start_transaction(self, **kw):
+        self._pop_kw(kw)
+        name = kw.get("name", "tx")
+        self._tx_stack.append({"name": name, "start": time.time()})
+    
+    def end_transaction(self, **kw):
+        self._pop_kw(kw)
+        success = kw.get("success", True)
+        if self._tx_stack:
+            tx = self._tx_stack.pop()
+            ms = (time.time() - tx["start"]) * 1000
+            s = "✓" if success else "✗"
+            print(f"[TX] {s} {tx['name']}: {ms:.0f}ms")
+    
+    def transaction(self, **kw):
+        self._pop_kw(kw)
+        name = kw.get("name", "tx")
+        steps = kw.get("steps", [])
+        self.start_transaction(name=name)
+        try:
+            self._run_steps(steps)
+            self.end_transaction(success=True)
+        except:
+            self.end_transaction(success=False)
+            raise
+    
+    # ========== 顺序任务 ==========
+    
+    def sequential_tasks(self, **kw):
+        self._pop_kw(kw)
+        steps = kw.get("steps", [])
+        loop = int(kw.get("loop", 1))
+        for _ in range(loop):
+            self._run_steps(steps)
+    
+    def interrupt(self, **kw):
+        self._pop_kw(kw)
+        raise StopIteration(kw.get("message", "Interrupted"))
+    
+    # ========== 数据操作 ==========
+    
+    def set_var(self, **kw):
+        self._pop_kw(kw)
+        name = kw.get("name")
+        if name:
+            self.ctx[name] = self._render(kw.get("value"))
+    
+    def extract_json(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return None
+        try:
+            import jsonpath
+            data = self.response.json()
+            path = kw.get("path", "$")
+            var = kw.get("var", "extracted")
+            idx = int(kw.get("index", 0))
+            result = jsonpath.jsonpath(data, path)
+            if result:
+                val = result[idx] if isinstance(result, list) and len(result) > idx else result
+                self.ctx[var] = val
+                return val
+        except Exception as e:
+            print(f"[EXTRACT] {e}")
+        return None
+    
+    def extract_regex(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return None
+        try:
+            pattern = kw.get("pattern", "")
+            var = kw.get("var", "extracted")
+            group = int(kw.get("group", 1))
+            match = re.search(pattern, self.response.text)
+            if match:
+                val = match.group(group)
+                self.ctx[var] = val
+                return val
+        except Exception as e:
+            print(f"[EXTRACT] {e}")
+        return None
+    
+    def extract_header(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            return None
+        name = kw.get("name", "")
+        var = kw.get("var", "extracted")
+        val = self.response.headers.get(name, "")
+        self.ctx[var] = val
+        return val
+    
+    # ========== 数据驱动 ==========
+    
+    def random_data(self, **kw):
+        self._pop_kw(kw)
+        data = kw.get("data", [])
+        var = kw.get("var", "random_item")
+        if data:
+            self.ctx[var] = random.choice(data)
+            return self.ctx[var]
+        return None
+    
+    def cycle_data(self, **kw):
+        self._pop_kw(kw)
+        data = kw.get("data", [])
+        var = kw.get("var", "cycle_item")
+        key = f"_idx_{var}"
+        if data:
+            idx = self.ctx.get(key, 0)
+            self.ctx[var] = data[idx % len(data)]
+            self.ctx[key] = idx + 1
+            return self.ctx[var]
+        return None
+    
+    # ========== 条件与循环 ==========
+    
+    def if_condition(self, **kw):
+        self._pop_kw(kw)
+        cond = self._render(kw.get("condition", ""))
+        then_steps = kw.get("then", [])
+        else_steps = kw.get("else", [])
+        try:
+            result = eval(cond, {"__builtins__": {}}, self.ctx)
+        except:
+            result = False
+        self._run_steps(then_steps if result else else_steps)
+    
+    def loop(self, **kw):
+        self._pop_kw(kw)
+        count = int(kw.get("count", 1))
+        steps = kw.get("steps", [])
+        delay = float(kw.get("delay", 0))
+        for i in range(count):
+            self.ctx["_loop_index"] = i
+            self._run_steps(steps)
+            if delay > 0:
+                time.sleep(delay)
+    
+    def foreach(self, **kw):
+        self._pop_kw(kw)
+        items = kw.get("items", [])
+        if isinstance(items, str):
+            items = self.ctx.get(items, [])
+        items = self._render(items)
+        var = kw.get("var", "item")
+        steps = kw.get("steps", [])
+        for i, item in enumerate(items):
+            self.ctx[var] = item
+            self.ctx["_foreach_index"] = i
+            self._run_steps(steps)
+    
+    # ========== 日志 ==========
+    
+    def log(self, **kw):
+        self._pop_kw(kw)
+        msg = self._render(kw.get("message", ""))
+        level = kw.get("level", "info").upper()
+        print(f"[{level}] {msg}")
+    
+    def print_response(self, **kw):
+        self._pop_kw(kw)
+        if not self.response:
+            print("[RESPONSE] No response")
+            return
+        fmt = kw.get("format", "json")
+        if fmt == "json":
+            try:
+                print(json.dumps(self.response.json(), indent=2, ensure_ascii=False))
+            except:
+                print(self.response.text)
+        elif fmt == "text":
+            print(self.response.text)
+        elif fmt == "headers":
+            print(dict(self.response.headers))
+    
+    # ========== 步骤执行 ==========
+    
+    def _run_step(self, step):
+        try:
+            step.run(self)
+        except StopIteration:
+            raise
+        except Exception as e:
+            print(f"[ERROR] {step.name}: {e}")
+    
+    def _run_steps(self, steps):
+        """执行步骤列表（预编译的步骤，或运行时传入的原始步骤）"""
+        for step in steps:
+            if isinstance(step, CompiledStep):
+                self._run_step(step)
+            else:
+                for compiled in compile_steps([step]):
+                    self._run_step(compiled)
+    
+    def _exec_step(self, step):
+        """执行一个原始步骤"""
+        self._run_steps([step])
+
+
+class CompiledStep:
+    """预编译的步骤：run(keywords) 执行"""
+    
+    __slots__ = ("name", "run")
+    
+    def __init__(self, name, run):
+        self.name = name
+        self.run = run
+
+
+def _compile_request(method, args):
+    """
+    HTTP 请求关键字：请求参数在加载时拆分并编译模板
+    
+    不含变量的参数直接复用；不含变量的 json 请求体预先编码为 data（没有 data/files 时，与 requests 的编码结果相同）
+    """
+    url = args.get("url", "/")
+    url_node = compile_value(url)
+    catch = bool(args.get("catch_response", False))
+    base = {}
+    if args.get("name"):
+        base["name"] = args["name"]
+    if catch:
+        base["catch_response"] = True
+    dynamic = []
+    for key in _REQUEST_OPTIONS:
+        if key in args:
+            node = compile_value(args[key])
+            if node is None:
+                base[key] = args[key]
+            else:
+                dynamic.append((key, node))
+    
+    json_header = False
+    headers = args.get("headers")
+    if (base.get("json") is not None and not args.get("data") and not args.get("files")
+            and (headers is None or isinstance(headers, dict))):
+        try:
+            body = json.dumps(base["json"], allow_nan=False).encode("utf-8")
+        except (TypeError, ValueError):
+            pass
+        else:
+            del base["json"]
+            base["data"] = body
+            if "headers" in base or headers is None:
+                base["headers"] = _with_json_content_type(base.get("headers"))
+            else:
+                json_header = True  # 请求头含变量，渲染后再补充
+    
+    def run(kw):
+        ctx = kw.ctx
+        req_kw = dict(base)
+        for key, node in dynamic:
+            req_kw[key] = node(ctx)
+        if json_header:
+            req_kw["headers"] = _with_json_content_type(req_kw["headers"])
+        return kw._send(method, url if url_node is None else url_node(ctx), catch, req_kw)
+    
+    return run
+
+
+def _compile_keyword(func, args):
+    """其他关键字：子步骤在加载时编译，参数按原样传给关键字方法"""
+    args = {
+        key: compile_steps(value) if key in _NESTED_STEP_KEYS and isinstance(value, list) else value
+        for key, value in args.items()
+    }
+    
+    def run(kw):
+        return func(kw, **args)
+    
+    return run
+
+
+def compile_steps(steps):
+    """
+    把用例中的步骤列表编译为 CompiledStep 列表
+    
+    未知关键字与原来一样跳过，不是字典的步骤忽略
+    """
+    compiled = []
+    for step in steps or []:
+        if not isinstance(step, dict):
+            continue
+        for name, data in step.items():
+            if not isinstance(data, dict):
+                continue
+            keyword = data.get("关键字") or data.get("keyword", "")
+            func = getattr(Keywords, keyword, None) if keyword else None
+            if not callable(func):
+                continue
+            args = {k: v for k, v in data.items() if k not in _KEYWORD_KEYS}
+            if keyword in _HTTP_METHODS:
+                compiled.append(CompiledStep(name, _compile_request(keyword, args)))
+            else:
+                compiled.append(CompiledStep(name, _compile_keyword(func, args)))
+    return compiled
+
+
+# 加载场景并预编译（每个进程一次）
+CASES, CTX, CONFIG = load_scenario()
+ON_START = [compile_steps(case.get("on_start", [])) for case in CASES]
+STEPS = [compile_steps(case.get("steps", [])) for case in CASES]
+ON_STOP = [compile_steps(case.get("on_stop", [])) for case in CASES]
+
+
+# 事件钩子
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    print("=" * 60)
+    print("Performance Test Started")
+    print(f"Host: {environment.host}")
+    print("=" * 60)
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    print("=" * 60)
+    print("Performance Test Completed")
+    print("=" * 60)
+
+
+# 用户类
+class YamlUser(HttpUser):
+    wait_time = between(
+        CONFIG.get("wait_min", 1),
+        CONFIG.get("wait_max", 3)
+    )
+    
+    def on_start(self):
+        self.kw = Keywords(self.client)
+        self.kw.ctx.update(CTX)
+        
+        # 执行 on_start 步骤
+        for steps in ON_START:
+            self.kw._run_steps(steps)
+    
+    def on_stop(self):
+        # 执行 on_stop 步骤
+        for steps in ON_STOP:
+            self.kw._run_steps(steps)
+    
+    @task
+    def run_cases(self):
+        for steps in STEPS:
+            self.kw._run_steps(steps)
+
+
+
+def test_render_benchmark(requests: int = 20000) -> None:
+    """
+    基准测试 - 对比每次请求逐个正则替换渲染参数与预编译模板的耗时
+
+    请求参数含变量的 URL、请求头和不含变量的查询参数、JSON 请求体；
+    原实现每次请求都要渲染所有参数并由 requests 编码 JSON 请求体，预编译后只拼接含变量的片段
+    """
+    pattern = re.compile(r"\{\{(\w+)\}\}")
+
+    def regex_render(value, ctx):
+        if isinstance(value, str):
+            return pattern.sub(lambda m: str(ctx.get(m.group(1), m.group(0))), value)
+        if isinstance(value, dict):
+            return {k: regex_render(v, ctx) for k, v in value.items()}
+        if isinstance(value, list):
+            return [regex_render(i, ctx) for i in value]
+        return value
+
+    ctx = {"api_version": "v1", "user_id": 10086, "token": "eyJhbGciOiJIUzI1NiJ9.payload.signature"}
+    args = {
+        "url": "/api/{{api_version}}/users/{{user_id}}/orders",
+        "headers": {"Authorization": "Bearer {{token}}", "Accept": "application/json"},
+        "params": {"page": 1, "size": 20, "status": "paid"},
+        "json": {
+            "items": [{"sku": f"SKU-{i}", "quantity": i % 3 + 1, "price": 99.5} for i in range(10)],
+            "address": {"city": "Shanghai", "street": "Century Avenue 100", "zip": "200120"},
+            "remark": "performance test order",
+        },
+    }
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        rendered = {key: regex_render(value, ctx) for key, value in args.items()}
+        json.dumps(rendered["json"], allow_nan=False).encode("utf-8")
+    regex_cost = (time.perf_counter() - start) / requests * 1e6
+
+    start = time.perf_counter()
+    compiled = [(key, compile_value(value), value) for key, value in args.items()]
+    body = json.dumps(args["json"], allow_nan=False).encode("utf-8")
+    compile_cost = (time.perf_counter() - start) * 1e6
+    for _ in range(requests):
+        rendered = {key: value if node is None else node(ctx) for key, node, value in compiled}
+        rendered["json"] = body
+    compiled_cost = (time.perf_counter() - start - compile_cost / 1e6) / requests * 1e6
+
+    print(f"预编译（每个步骤一次）: {compile_cost:.1f} us")
+    print(f"正则渲染 + 编码请求体: {regex_cost:.2f} us/请求")
+    print(f"预编译模板 + 预编码请求体: {compiled_cost:.2f} us/请求（{regex_cost / compiled_cost:.1f}x）")
@@ -2,64 +2,131 @@
 # 使用 jinjia2 模板引擎 (类似 flask的模板)
 # https://docs.jinkan.org/docs/jinja2/templates.html
 import os
+from functools import lru_cache
 from typing import Any
 
-from jinja2 import Environment
+from jinja2 import Environment, Template, pass_context
+
+# 编译模板缓存容量（按模板源码缓存，LRU 淘汰）
+TEMPLATE_CACHE_SIZE = 2048
+
+# Jinja2 语法标记：不包含这些标记的字符串无需进入模板引擎
+_TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+# 快速路径计数（未进入 Jinja2 的次数）
+_fast_path_count = 0
 
 
 def _resolve_file_path(file_path: str, cases_dir: str = None) -> str:
     """
     解析文件路径，支持相对路径转绝对路径
-    
+
     :param file_path: 文件路径（可以是相对路径或绝对路径）
     :param cases_dir: 用例目录路径
     :return: 解析后的绝对路径
     """
     if not file_path:
         return file_path
-    
+
     # 如果已经是绝对路径或 URL，直接返回
     if os.path.isabs(file_path) or file_path.startswith(('http://', 'https://')):
         return file_path
-    
+
     # 尝试相对于用例目录解析
     if cases_dir:
         candidate = os.path.join(cases_dir, file_path)
         if os.path.exists(candidate):
             return candidate
-    
+
     return file_path
 
 
-def _create_jinja_env(context: dict[str, Any]) -> Environment:
+@pass_context
+def _file_filter(ctx, path: str) -> str:
+    """文件路径解析过滤器 - 从渲染上下文中读取用例目录"""
+    return _resolve_file_path(path, ctx.get('_cases_dir', ''))
+
+
+def _create_jinja_env() -> Environment:
     """
     创建带有自定义过滤器的 Jinja2 环境
     """
     env = Environment()
-    
-    # 获取用例目录
-    cases_dir = context.get('_cases_dir', '')
-    
-    # 添加文件路径解析过滤器
-    env.filters['file'] = lambda path: _resolve_file_path(path, cases_dir)
-    env.filters['filepath'] = lambda path: _resolve_file_path(path, cases_dir)
-    
+
+    # 添加文件路径解析过滤器（用例目录在渲染时从上下文读取）
+    env.filters['file'] = _file_filter
+    env.filters['filepath'] = _file_filter
+
     return env
 
 
+# 全局共享的 Jinja2 环境，避免每次渲染都重新创建
+_jinja_env = _create_jinja_env()
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(source: str) -> Template:
+    """
+    编译模板并按源码缓存
+
+    :param source: 模板源码
+    :return: 编译后的模板对象
+    """
+    return _jinja_env.from_string(source)
+
+
+def _needs_render(source: str) -> bool:
+    """
+    判断字符串是否需要经过 Jinja2 渲染
+
+    不含模板标记、且不含 Jinja2 会规整的换行（\\r 与末尾换行）时，渲染结果与原文一致
+    """
+    if any(marker in source for marker in _TEMPLATE_MARKERS):
+        return True
+    return "\r" in source or source.endswith("\n")
+
+
 def refresh(target: Any | None, context: dict[str, Any]) -> str | None:
     """
     使用 Jinja2 模板引擎渲染字符串
-    
+
     :param target: 待渲染的目标字符串或对象
     :param context: 渲染上下文字典
     :return: 渲染后的字符串，如果 target 为 None 则返回 None
     """
+    global _fast_path_count
     if target is None: return None
-    
-    env = _create_jinja_env(context)
-    template = env.from_string(str(target))
-    return template.render(context)
+
+    source = str(target)
+    if not _needs_render(source):
+        _fast_path_count += 1
+        return source
+
+    return _compile_template(source).render(context)
+
+
+def template_cache_info() -> dict[str, int]:
+    """
+    获取模板缓存统计信息，用于评估缓存容量
+
+    :return: {"hits": 命中次数, "misses": 未命中(编译)次数, "fast_path": 跳过渲染次数,
+              "size": 当前缓存数量, "maxsize": 缓存容量}
+    """
+    info = _compile_template.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "fast_path": _fast_path_count,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def clear_template_cache() -> None:
+    """清空模板缓存及统计计数"""
+    global _fast_path_count
+    _compile_template.cache_clear()
+    _fast_path_count = 0
 
 
 def test_refresh() -> None:
@@ -68,3 +135,4 @@ def test_refresh() -> None:
     context = {"name": "张三"}
     result = refresh(target, context)
     print(result)
+    print(template_cache_info())
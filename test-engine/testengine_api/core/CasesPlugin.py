@@ -1,6 +1,7 @@
 from typing import List
 
 import pytest
+from testengine_common.profiler import profiler
 
 from .globalContext import g_context  # 相对导入: 同级模块
 from ..parse.CaseParser import case_parser  # 相对导入: apirun内部模块
@@ -51,10 +52,20 @@ class CasesPlugin:
         # 读取测试用例，同时需要进行参数化
         data = case_parser(case_type, cases_dir)
 
+        # 步骤耗时分析（环境变量 TESTENGINE_PROFILE 开启）
+        if not profiler.enabled:
+            profiler.enable_from_env()
+
         # 把测试用例作为参数化，交给 runner 执行
         if "caseinfo" in metafunc.fixturenames:
             metafunc.parametrize("caseinfo", data['case_infos'], ids=data['case_names'])
 
+    def pytest_sessionfinish(self, session: pytest.Session, exitstatus: int) -> None:
+        """
+        测试结束后输出步骤耗时分布并导出 trace 文件
+        """
+        profiler.finish()
+
     def pytest_collection_modifyitems(self, items: List[pytest.Item]) -> None:
         """
         用例收集完毕之后被调用
@@ -4,13 +4,22 @@ Test Engine 公共模块
 """
 
 from .context import g_context
-from .var_render import refresh
+from .var_render import refresh, template_cache_info, clear_template_cache
 from .yaml_parser import yaml_case_parser, load_yaml_files, load_context_from_yaml
+from .report_builder import ReportBuilder, build_report
+from .profiler import StepProfiler, keyword_category, profiler
 
 __all__ = [
     "g_context",
     "refresh",
+    "template_cache_info",
+    "clear_template_cache",
     "yaml_case_parser",
     "load_yaml_files",
     "load_context_from_yaml",
+    "ReportBuilder",
+    "build_report",
+    "StepProfiler",
+    "keyword_category",
+    "profiler",
 ]
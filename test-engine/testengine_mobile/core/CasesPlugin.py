@@ -1,5 +1,7 @@
 import os
 
+from testengine_common.profiler import profiler
+
 from .globalContext import g_context
 from ..parse.CaseParser import case_parser
 
@@ -55,9 +57,16 @@ class CasesPlugin:
 
         data = case_parser(case_type, cases_path)
 
+        # 步骤耗时分析（环境变量 TESTENGINE_PROFILE 开启）
+        if not profiler.enabled:
+            profiler.enable_from_env()
+
         if "caseinfo" in metafunc.fixturenames:
             metafunc.parametrize("caseinfo", data["case_infos"], ids=data["case_names"])
 
+    def pytest_sessionfinish(self, session, exitstatus):
+        profiler.finish()
+
     def pytest_collection_modifyitems(self, items):
         for item in items:
             item.name = item.name.encode("utf-8").decode("unicode_escape")
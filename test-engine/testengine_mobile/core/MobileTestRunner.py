@@ -2,6 +2,7 @@ import copy
 import sys
 
 import allure
+from testengine_common.profiler import keyword_category, profiler
 
 from .globalContext import g_context
 from ..extend.keywords import Keywords
@@ -25,46 +26,58 @@ def _safe_copy_context(context_dict):
 
 class MobileTestRunner:
     def execute(self, caseinfo):
+        with profiler.span(caseinfo.get("_case_name") or "case", "case"):
+            self._execute(caseinfo)
+
+    def _execute(self, caseinfo):
         dynamicTitle(caseinfo)
 
         try:
             keywords = Keywords()
             local_context = caseinfo.get("context", {})
-            context = _safe_copy_context(g_context().show_dict())
-            context.update(local_context)
+            with profiler.span("copy_context", "context"):
+                context = _safe_copy_context(g_context().show_dict())
+                context.update(local_context)
 
             pre_script = refresh(caseinfo.get("pre_script", None), context)
             if pre_script:
                 for script in eval(pre_script):
-                    exec_script(script, g_context().show_dict(), caseinfo)
+                    with profiler.span("pre_script", "script"):
+                        exec_script(script, g_context().show_dict(), caseinfo)
 
             steps = caseinfo.get("steps", None)
             for step in steps:
                 step_name = list(step.keys())[0]
                 step_value = list(step.values())[0]
 
-                context = _safe_copy_context(g_context().show_dict())
-                context.update(local_context)
-                step_value = eval(refresh(step_value, context))
+                with profiler.span("copy_context", "context"):
+                    context = _safe_copy_context(g_context().show_dict())
+                    context.update(local_context)
+                with profiler.span(step_name, "render"):
+                    step_value = eval(refresh(step_value, context))
 
                 with allure.step(step_name):
                     key = step_value["关键字"]
-                    try:
-                        key_func = keywords.__getattribute__(key)
-                    except AttributeError as e:
-                        sys.path.append(g_context().get_dict("key_dir"))
-                        module = __import__(key)
-                        class_ = getattr(module, key)
-                        key_func = class_().__getattribute__(key)
-
-                    key_func(**step_value)
-
-            context = _safe_copy_context(g_context().show_dict())
-            context.update(local_context)
+                    with profiler.span(key, "dispatch"):
+                        try:
+                            key_func = keywords.__getattribute__(key)
+                        except AttributeError as e:
+                            sys.path.append(g_context().get_dict("key_dir"))
+                            module = __import__(key)
+                            class_ = getattr(module, key)
+                            key_func = class_().__getattribute__(key)
+
+                    with profiler.span(key, keyword_category(key), {"step": step_name}):
+                        key_func(**step_value)
+
+            with profiler.span("copy_context", "context"):
+                context = _safe_copy_context(g_context().show_dict())
+                context.update(local_context)
             post_script = refresh(caseinfo.get("post_script", None), context)
             if post_script:
                 for script in eval(post_script):
-                    exec_script(script, g_context().show_dict(), caseinfo)
+                    with profiler.span("post_script", "script"):
+                        exec_script(script, g_context().show_dict(), caseinfo)
 
         finally:
             AppiumManager.close()
@@ -1,9 +1,9 @@
 """
 变量渲染 - 复用公共模块
 """
-from testengine_common.var_render import refresh, refresh_simple
+from testengine_common.var_render import refresh, refresh_simple, template_cache_info, clear_template_cache
 
-__all__ = ["refresh", "refresh_simple"]
+__all__ = ["refresh", "refresh_simple", "template_cache_info", "clear_template_cache"]
 
 
 def test_refresh():
@@ -11,7 +11,9 @@ from typing import Optional
 
 import pytest
 import yaml
-from allure_combine import combine_allure
+
+from testengine_common import build_report
+from testengine_common.profiler import PROFILE_ENV
 
 from .plugin_config import plugin_config
 
@@ -21,7 +23,47 @@ import shutil
 
 def generate_report(allure_results_dir: Path, allure_report_dir: Path) -> Optional[Path]:
     """
-    生成 Allure 报告并只保留 complete.html
+    生成报告并只保留 complete.html
+
+    默认在进程内增量生成单文件报告（不需要 Java 版 allure），--report=allure 时使用 allure 命令行
+    
+    :param allure_results_dir: allure-results 目录
+    :param allure_report_dir: allure-report 目录
+    :return: complete.html 文件路径，失败返回 None
+    """
+    reports_dir = allure_report_dir.parent
+    if plugin_config.get_arg("report", "summary") == "allure":
+        final_report = generate_allure_report(allure_results_dir, allure_report_dir)
+    else:
+        # SQLite 索引保留在 reports 目录，下次运行只读取新增的结果、重新渲染有变化的用例集
+        print("\n=== 测试执行完成，正在生成报告... ===")
+        final_report = build_report(allure_results_dir, reports_dir / "complete.html",
+                                    reports_dir / "report-index.db", plugin_config.name)
+    if final_report is None:
+        return None
+    
+    # 清理临时目录（只保留 complete.html）
+    try:
+        shutil.rmtree(allure_results_dir, ignore_errors=True)
+        shutil.rmtree(allure_report_dir, ignore_errors=True)
+        # 清理 logdata 目录
+        logdata_dir = reports_dir / "logdata"
+        if logdata_dir.exists():
+            shutil.rmtree(logdata_dir, ignore_errors=True)
+        # 清理空的 screenshots 目录
+        screenshots_dir = reports_dir / "screenshots"
+        if screenshots_dir.exists() and not any(screenshots_dir.iterdir()):
+            shutil.rmtree(screenshots_dir, ignore_errors=True)
+    except Exception as e:
+        print(f"警告: 清理临时文件失败: {e}")
+    
+    print(f"报告已生成: {final_report}")
+    return final_report
+
+
+def generate_allure_report(allure_results_dir: Path, allure_report_dir: Path) -> Optional[Path]:
+    """
+    使用 allure 命令行 + allure-combine 生成单文件报告
     
     :param allure_results_dir: allure-results 目录
     :param allure_report_dir: allure-report 目录
@@ -45,6 +87,7 @@ def generate_report(allure_results_dir: Path, allure_report_dir: Path) -> Option
     
     # 2. 使用 allure-combine 生成单文件报告
     try:
+        from allure_combine import combine_allure
         combine_allure(str(allure_report_dir))
     except Exception as e:
         print(f"警告: allure-combine 失败: {e}")
@@ -59,23 +102,6 @@ def generate_report(allure_results_dir: Path, allure_report_dir: Path) -> Option
     reports_dir = allure_report_dir.parent
     final_report = reports_dir / "complete.html"
     shutil.copy2(complete_html, final_report)
-    
-    # 4. 清理临时目录（只保留 complete.html）
-    try:
-        shutil.rmtree(allure_results_dir, ignore_errors=True)
-        shutil.rmtree(allure_report_dir, ignore_errors=True)
-        # 清理 logdata 目录
-        logdata_dir = reports_dir / "logdata"
-        if logdata_dir.exists():
-            shutil.rmtree(logdata_dir, ignore_errors=True)
-        # 清理空的 screenshots 目录
-        screenshots_dir = reports_dir / "screenshots"
-        if screenshots_dir.exists() and not any(screenshots_dir.iterdir()):
-            shutil.rmtree(screenshots_dir, ignore_errors=True)
-    except Exception as e:
-        print(f"警告: 清理临时文件失败: {e}")
-    
-    print(f"报告已生成: {final_report}")
     return final_report
 
 
@@ -193,6 +219,12 @@ def run_with_plugin(
         screenshots_dir = reports_dir / "screenshots"
         screenshots_dir.mkdir(exist_ok=True)
     
+    # 步骤耗时分析（CasesPlugin 通过环境变量开启），相对路径写到 reports 目录
+    if profile := plugin_config.get_arg("profile"):
+        if profile.lower() not in ("1", "true", "yes", "0", "false", "no") and not os.path.isabs(profile):
+            profile = str(reports_dir / profile)
+        os.environ[PROFILE_ENV] = profile
+
     # 获取 python 运行参数（使用列表推导式）
     pytest_cmd_config = [arg for arg in sys.argv if arg.startswith("-")]
     
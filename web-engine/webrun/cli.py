@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 import shutil
@@ -45,6 +46,49 @@ def _parse_cli_args() -> dict:
     return args
 
 
+def _run_worker(pytest_args):
+    """并行模式下的 worker 进程：独立启动浏览器，只执行自己的分片"""
+    sys.exit(pytest.main(pytest_args, plugins=[CasesPlugin()]))
+
+
+def _run_parallel(workers, pytest_args, allure_results_dir, logdata_dir):
+    """多进程并行执行用例，每个 worker 启动一个浏览器并复用浏览器上下文，最后把各 worker 的 Allure 结果合并到同一目录"""
+    shutil.rmtree(allure_results_dir, ignore_errors=True)
+    os.makedirs(allure_results_dir, exist_ok=True)
+
+    # spawn 方式启动，保证每个 worker 拥有独立的 g_context 和 Playwright 实例
+    mp_context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(workers):
+        worker_results_dir = os.path.join(allure_results_dir, f"worker-{index}")
+        worker_log_file = os.path.join(logdata_dir, f"log-worker-{index}.log")
+        worker_args = [
+            arg.replace(f"--alluredir={allure_results_dir}", f"--alluredir={worker_results_dir}")
+            if arg.startswith("--alluredir=") else
+            f"--log-file={worker_log_file}" if arg.startswith("--log-file=") else arg
+            for arg in pytest_args
+        ]
+        worker_args.extend([f"--shard-index={index}", f"--shard-count={workers}"])
+        process = mp_context.Process(target=_run_worker, args=(worker_args,), name=f"webrun-worker-{index}")
+        process.start()
+        processes.append(process)
+
+    exit_codes = []
+    for process in processes:
+        process.join()
+        exit_codes.append(process.exitcode)
+    print(f"并行执行完成，各 worker 退出码: {exit_codes}")
+
+    # 合并 Allure 结果（结果文件名为 uuid，不会冲突）
+    for index in range(workers):
+        worker_results_dir = os.path.join(allure_results_dir, f"worker-{index}")
+        if not os.path.isdir(worker_results_dir):
+            continue
+        for file_name in os.listdir(worker_results_dir):
+            shutil.move(os.path.join(worker_results_dir, file_name), os.path.join(allure_results_dir, file_name))
+        shutil.rmtree(worker_results_dir, ignore_errors=True)
+
+
 def run():
     """命令行入口函数"""
     # 检查是否请求帮助
@@ -64,6 +108,7 @@ def run():
     print(f"用例目录: {args['cases']}")
     print(f"浏览器: {args['browser']}")
     print(f"无头模式: {args['headless']}")
+    print(f"并行进程: {args.get('workers') or 1}")
     print("=" * 60)
     
     # 获取项目根目录
@@ -98,11 +143,26 @@ def run():
         f"--browser={args['browser']}",
         f"--headless={args['headless']}"
     ])
+    # 步骤耗时分析，相对路径写到 reports 目录
+    if profile := args.get("profile"):
+        if profile.lower() not in ("1", "true", "yes", "0", "false", "no") and not os.path.isabs(profile):
+            profile = os.path.join(reports_dir, profile)
+        pytest_args.append(f"--profile={profile}")
+    # 浏览器上下文池和截图策略（未指定时使用 context.yaml 中的 _browser_pool / _capture）
+    for option in ("pool-size", "recycle-after", "storage-state", "capture"):
+        if args.get(option):
+            pytest_args.append(f"--{option}={args[option]}")
 
-    print("run pytest：", pytest_args)
+    workers = int(args.get("workers") or 1)
+    if workers > 1:
+        # 并行模式：按用例文件分片到多个进程，每个进程一个浏览器
+        print(f"并行执行: {workers} 个 worker")
+        _run_parallel(workers, pytest_args, allure_results_dir, logdata_dir)
+    else:
+        print("run pytest：", pytest_args)
 
-    # 执行测试
-    pytest.main(pytest_args, plugins=[CasesPlugin()])
+        # 执行测试
+        pytest.main(pytest_args, plugins=[CasesPlugin()])
 
     # 生成报告（只保留 complete.html）
     print("\n=== 测试执行完成，正在生成Allure报告... ===")
@@ -1,7 +1,56 @@
 import os
 
+from .KeywordRegistry import KeywordRegistry
 from .globalContext import g_context
-from ..parse.CaseParser import case_parser
+from ..extend.keywords import Keywords
+from ..parse.CaseParser import case_group_key, case_parser
+from ..utils.AutoWait import AutoWait
+from ..utils.BrowserPool import BrowserPool
+from ..utils.CaseLint import lint_cases
+from ..utils.LocatorCache import LocatorCache
+from ..utils.ScreenshotCapture import ScreenshotCapture
+from ..utils.StepProfiler import PROFILE_ENV, profiler
+from ..utils.VarRender import compile_case
+
+# 浏览器上下文池命令行参数 -> context.yaml 中 _browser_pool 节点的配置项
+POOL_OPTIONS = {
+    "pool_size": "pool_size",
+    "recycle_after": "recycle_after",
+    "storage_state": "storage_state",
+}
+
+
+def shard_cases(data: dict[str, list], shard_index: int, shard_count: int) -> dict[str, list]:
+    """
+    按分组把用例分配到各分片
+
+    同一分组的用例落在同一分片并保持原有顺序（即文件名数字前缀顺序）。
+    分组规则见 case_group_key：数字前缀的用例文件默认在同一分组，可通过用例中的 shard_group 字段拆分为独立的分组。
+    每个 worker 用相同规则计算，结果一致。
+
+    :param data: case_parser 的返回值 {"case_infos": [...], "case_names": [...]}
+    :param shard_index: 当前分片序号
+    :param shard_count: 分片总数
+    :return: 当前分片的 {"case_infos": [...], "case_names": [...]}
+    """
+    groups: dict[str, list[int]] = {}
+    for idx, caseinfo in enumerate(data["case_infos"]):
+        groups.setdefault(case_group_key(caseinfo), []).append(idx)
+
+    # 大分组优先，依次放入当前用例数最少的分片
+    loads = [0] * shard_count
+    selected: list[int] = []
+    for indexes in sorted(groups.values(), key=len, reverse=True):
+        target = loads.index(min(loads))
+        loads[target] += len(indexes)
+        if target == shard_index:
+            selected.extend(indexes)
+
+    selected.sort()
+    return {
+        "case_infos": [data["case_infos"][i] for i in selected],
+        "case_names": [data["case_names"][i] for i in selected],
+    }
 
 
 class CasesPlugin:
@@ -33,6 +82,31 @@ class CasesPlugin:
         parser.addoption(
             "--headless", action="store", default="true", help="是否无头模式: true/false（默认 true）"
         )
+        # 浏览器上下文池配置（未指定时使用 context.yaml 中 _browser_pool 节点或默认值）
+        parser.addoption(
+            "--pool-size", action="store", default=None, help="每个 worker 保留的空闲浏览器上下文数量"
+        )
+        parser.addoption(
+            "--recycle-after", action="store", default=None, help="一个浏览器上下文最多执行的用例数，超过后关闭重建"
+        )
+        parser.addoption(
+            "--storage-state", action="store", default=None, help="预登录状态文件，新建浏览器上下文时加载"
+        )
+        # 截图策略（未指定时使用 context.yaml 中 _capture 节点或默认值）
+        parser.addoption(
+            "--capture", action="store", default=None, help="截图策略: all/failure/last_n/off（默认 failure）"
+        )
+        # 并行执行分片（由 cli 的 --workers 模式传入）
+        parser.addoption(
+            "--shard-index", action="store", default="0", help="当前分片序号（从 0 开始）"
+        )
+        parser.addoption(
+            "--shard-count", action="store", default="1", help="分片总数"
+        )
+        # 步骤耗时分析：输出各阶段耗时分布，并导出 Chrome Trace 到指定文件
+        parser.addoption(
+            "--profile", action="store", default=None, help="开启步骤耗时分析并导出 trace 文件路径（true 表示只输出耗时分布）"
+        )
     
     def pytest_generate_tests(self, metafunc):
         """
@@ -63,14 +137,55 @@ class CasesPlugin:
         # 读取测试用例 - 传递 Path 对象
         data = case_parser(case_type, cases_path)
 
+        # 检查用例中的固定等待（_wait.lint：warn/error/off）
+        lint_cases(data['case_infos'], AutoWait.config()["lint"])
+
+        # 收集阶段预编译用例模板，执行时不再重复解析
+        for caseinfo in data['case_infos']:
+            compile_case(caseinfo)
+        # 启动时构建关键字分发表（拓展关键字目录只扫描一次）
+        KeywordRegistry.get(Keywords)
+        # 统计每个用例与浏览器的往返次数
+        LocatorCache.install_round_trip_counter()
+
         # 命令行参数覆盖 context.yaml 中的配置（优先级：命令行 > context.yaml）
         g_context().set_dict("BROWSER", browser)
         g_context().set_dict("HEADLESS", headless)
 
+        # 命令行参数覆盖 context.yaml 中的浏览器上下文池配置
+        pool_config = dict(g_context().get_dict("_browser_pool") or {})
+        for option, key in POOL_OPTIONS.items():
+            if (value := metafunc.config.getoption(option)) is not None:
+                pool_config[key] = value
+        g_context().set_dict("_browser_pool", pool_config)
+        if capture := metafunc.config.getoption("capture"):
+            g_context().set_dict("_capture", {**(g_context().get_dict("_capture") or {}), "mode": capture})
+
+        # 并行模式：只执行分配给当前分片的用例（每个 worker 进程独立启动一个浏览器）
+        shard_count = int(metafunc.config.getoption("shard_count"))
+        if shard_count > 1:
+            data = shard_cases(data, int(metafunc.config.getoption("shard_index")), shard_count)
+
+        # 步骤耗时分析（命令行参数优先，其次环境变量 WEBRUN_PROFILE），并行模式下每个分片写入单独的 trace 文件
+        if profile := metafunc.config.getoption("profile"):
+            os.environ[PROFILE_ENV] = profile
+        if not profiler.enabled and profiler.enable_from_env() and profiler.output and shard_count > 1:
+            output = Path(profiler.output)
+            profiler.output = str(output.with_name(f"{output.stem}-worker-{metafunc.config.getoption('shard_index')}{output.suffix}"))
+
         # 把测试用例作为参数化，交给 runner 执行
         if "caseinfo" in metafunc.fixturenames:
             metafunc.parametrize("caseinfo", data['case_infos'], ids=data['case_names'])
 
+    def pytest_sessionfinish(self, session, exitstatus):
+        """
+        测试结束后关闭浏览器上下文池和截图线程池，输出浏览器往返次数汇总、步骤耗时分布并导出 trace 文件
+        """
+        BrowserPool.close()
+        ScreenshotCapture.close()
+        LocatorCache.print_report()
+        profiler.finish()
+
     def pytest_collection_modifyitems(self, items):
         """
         用例收集完毕之后被调用，可以用来调整测试用例执行顺序；同时可以解决测试用例标题的显示问题
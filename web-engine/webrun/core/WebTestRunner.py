@@ -1,97 +1,111 @@
-import copy
-import sys
-
 import allure
 
+from .KeywordRegistry import KeywordRegistry
 from .globalContext import g_context
 from ..extend.keywords import Keywords
 from ..extend.script import run_script
+from ..utils.BrowserPool import BrowserPool
 from ..utils.DynamicTitle import dynamicTitle
-from ..utils.VarRender import refresh
+from ..utils.LocatorCache import LocatorCache
+from ..utils.ScreenshotCapture import ScreenshotCapture
+from ..utils.StepProfiler import keyword_category, profiler
+from ..utils.VarRender import compile_case
 
 
-def _safe_copy_context(context_dict):
-    """安全拷贝上下文，过滤不可序列化对象（如 Playwright Page 实例）"""
-    # 不可序列化对象的键名列表
-    exclude_keys = ['current_page', 'current_driver', 'current_frame']  # Playwright 对象无法被 deepcopy
-    
-    # 浅拷贝字典，排除不可序列化对象
-    safe_dict = {}
-    for key, value in context_dict.items():
-        if key not in exclude_keys:
-            try:
-                safe_dict[key] = copy.deepcopy(value)  # 尝试深拷贝
-            except (TypeError, AttributeError):
-                safe_dict[key] = value  # 无法深拷贝则使用浅拷贝
-    
-    return safe_dict
+def _safe_copy_context(local_context):
+    """
+    获取渲染用的上下文快照（用例变量 + 全局上下文）
+
+    不再逐键 deepcopy：所有值按引用共享，快照只用于渲染步骤模板，不能原地修改读到的 dict/list
+    """
+    return g_context().snapshot(local_context)
+
+
+def _as_script_list(scripts):
+    """前置/后置脚本支持单个字符串或字符串列表"""
+    return [scripts] if isinstance(scripts, str) else scripts
 
 
 class WebTestRunner:
     """Web 测试用例执行器（内部实现类）"""
     
     def execute(self, caseinfo):
+        with profiler.span(caseinfo.get("_case_name") or "case", "case"):
+            self._execute(caseinfo)
+
+    def _execute(self, caseinfo):
         # allure 用例标题title
         dynamicTitle(caseinfo)
+        LocatorCache.begin_case()
         
         try:
             keywords = Keywords()
+            # 关键字分发表（进程内只构建一次）
+            with profiler.span("bind_keywords", "dispatch"):
+                dispatch = KeywordRegistry.get(Keywords).bind(keywords)
+            # 预编译的用例模板（收集阶段已编译则直接复用）
+            with profiler.span("compile_case", "render"):
+                compiled = compile_case(caseinfo)
             # 单用例范围内的变量数据
             local_context = caseinfo.get("context", {})
-            context = _safe_copy_context(g_context().show_dict())  # 安全拷贝上下文
-            context.update(local_context)
+            with profiler.span("copy_context", "context"):
+                context = _safe_copy_context(local_context)  # 上下文快照
             
             # 执行前置脚本
-            pre_script = refresh(caseinfo.get("pre_script", None), context)
+            pre_script = compiled["pre_script"](context)
             if pre_script:
-                for script in eval(pre_script):
-                    run_script.exec_script(script, g_context().show_dict(), caseinfo)
+                for script in _as_script_list(pre_script):
+                    with profiler.span("pre_script", "script"):
+                        run_script.exec_script(script, g_context().show_dict(), caseinfo)
             
             # 准备执行用例 - 刷新用例内变量
-            steps = caseinfo.get("steps", None)
-            for step in steps:
-                step_name = list(step.keys())[0]
-                step_value = list(step.values())[0]
+            for step_name, render_step in compiled["steps"]:
                 # 刷新步骤内容的变量值
-                context = _safe_copy_context(g_context().show_dict())  # 安全拷贝上下文
-                context.update(local_context)
-                step_value = eval(refresh(step_value, context))  # 全局变量+用例变量渲染
+                with profiler.span("copy_context", "context"):
+                    context = _safe_copy_context(local_context)  # 上下文快照
+                with profiler.span(step_name, "render"):
+                    step_value = render_step(context)  # 全局变量+用例变量渲染
                 print(f"开始执行步骤：{step_name} - {step_value}")
                 with allure.step(step_name):
                     key = step_value["关键字"]
+                    with profiler.span(key, "dispatch"):
+                        key_func = dispatch[key]
                     try:
-                        key_func = keywords.__getattribute__(key)
-                    except AttributeError as e:
-                        print("没有这个关键字，动态加载：", e)
-                        sys.path.append(g_context().get_dict("key_dir"))
-                        module = __import__(key)  # 动态引入模块
-                        class_ = getattr(module, key)
-                        key_func = class_().__getattribute__(key)
-                        print("动态加载的函数", key_func)
-                    
-                    key_func(**step_value)  # 调用关键字方法
+                        with profiler.span(key, keyword_category(key), {"step": step_name}):
+                            key_func(**step_value)  # 调用关键字方法
+                    except Exception:
+                        # 失败截图（last_n 策略同时输出最近几个步骤的截图）
+                        ScreenshotCapture.on_failure(g_context().get_dict("current_page"), f"步骤失败_{step_name}")
+                        raise
+                    # 按截图策略截图（编码在后台线程完成）
+                    ScreenshotCapture.after_step(g_context().get_dict("current_page"), step_name)
             
             # 后置脚本执行
-            context = _safe_copy_context(g_context().show_dict())  # 安全拷贝上下文
-            context.update(local_context)
-            post_script = refresh(caseinfo.get("post_script", None), context)
+            with profiler.span("copy_context", "context"):
+                context = _safe_copy_context(local_context)  # 上下文快照
+            post_script = compiled["post_script"](context)
 
             if post_script:
-                for script in eval(post_script):
-                    run_script.exec_script(script, g_context().show_dict(), caseinfo)
+                for script in _as_script_list(post_script):
+                    with profiler.span("post_script", "script"):
+                        run_script.exec_script(script, g_context().show_dict(), caseinfo)
         
         finally:
             print("========执行完毕========")
-            # 确保测试结束时关闭浏览器 (Playwright)
-            page = g_context().get_dict("current_page")
-            if page:
+            # 等待本用例的截图编码完成并附加到 Allure 报告（需在浏览器上下文归还前完成截取）
+            ScreenshotCapture.end_case()
+            # 输出本用例与浏览器的往返次数和元素定位缓存命中次数
+            LocatorCache.end_case()
+            # 用例结束时归还浏览器上下文（浏览器进程保留给后续用例复用）
+            if g_context().get_dict("current_page"):
                 try:
-                    from ..utils.PlaywrightManager import PlaywrightManager
-                    PlaywrightManager.close()
-                    g_context().set_dict("current_page", None)
-                    print("浏览器已自动关闭")
+                    BrowserPool.release()
+                    print("浏览器上下文已归还")
                 except Exception as e:
-                    print(f"关闭浏览器失败: {e}")
+                    print(f"归还浏览器上下文失败: {e}")
+                finally:
+                    g_context().set_dict("current_page", None)
+                    g_context().set_dict("current_frame", None)
 
 
 # pytest 测试函数 - 接收 caseinfo 参数化 fixture
@@ -14,6 +14,11 @@ class ParserError(EngineError):
     pass
 
 
+class CaseLintError(ParserError):
+    """用例检查未通过（如 _wait.lint 为 error 时用例中包含固定等待）"""
+    pass
+
+
 class CaseNotFoundError(EngineError):
     """用例未找到异常"""
     pass
@@ -24,6 +29,11 @@ class KeywordError(EngineError):
     pass
 
 
+class KeywordNotFoundError(KeywordError):
+    """关键字不存在"""
+    pass
+
+
 class ContextError(EngineError):
     """上下文管理异常"""
     pass
@@ -37,8 +47,10 @@ class DriverError(EngineError):
 __all__ = [
     "EngineError",
     "ParserError",
+    "CaseLintError",
     "CaseNotFoundError",
     "KeywordError",
+    "KeywordNotFoundError",
     "ContextError",
     "DriverError",
 ]
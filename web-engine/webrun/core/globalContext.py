@@ -2,6 +2,8 @@
 全局上下文管理器
 用于在测试用例执行过程中共享数据
 """
+import copy
+from collections import ChainMap
 from typing import Any
 
 
@@ -12,7 +14,7 @@ class g_context:
     def set_dict(self, key: str, value: Any) -> None:
         """
         设置上下文中的值
-        
+
         :param key: 键名
         :param value: 值
         """
@@ -21,7 +23,7 @@ class g_context:
     def get_dict(self, key: str) -> Any | None:
         """
         获取上下文中的值
-        
+
         :param key: 键名
         :return: 对应的值，如果不存在则返回 None
         """
@@ -30,7 +32,7 @@ class g_context:
     def set_by_dict(self, dic: dict[str, Any]) -> None:
         """
         批量设置上下文值
-        
+
         :param dic: 要更新的字典
         """
         self._dic.update(dic)
@@ -38,8 +40,77 @@ class g_context:
     def show_dict(self) -> dict[str, Any]:
         """
         获取所有上下文数据
-        
+
         :return: 上下文数据字典
         """
         return self._dic
 
+    def snapshot(self, local_context: dict[str, Any] | None = None) -> ChainMap:
+        """
+        获取渲染用的上下文快照（用例变量优先于全局变量）
+
+        全局上下文只做浅拷贝（后续对全局上下文的赋值不影响快照），值按引用共享、不做拷贝；
+        快照只用于渲染步骤模板（渲染结果为新建的容器和字符串），不能原地修改读到的 dict/list
+
+        :param local_context: 用例变量
+        :return: 上下文快照
+        """
+        return ChainMap(local_context or {}, dict(self._dic))
+
+
+def test_context_snapshot_benchmark(size: int = 500, steps: int = 2000) -> None:
+    """
+    基准测试 - 对比每个步骤逐键 deepcopy 上下文（原 _safe_copy_context）与上下文快照的耗时
+
+    上下文包含 size 个变量：字符串/数字、dict/list 以及无法深拷贝的对象（模拟 Playwright Page）
+    """
+    import threading
+    import time
+
+    from ..utils.VarRender import compile_value
+
+    def legacy_copy(context_dict):
+        safe_dict = {}
+        for key, value in context_dict.items():
+            if key not in ['current_page', 'current_driver', 'current_frame']:
+                try:
+                    safe_dict[key] = copy.deepcopy(value)
+                except (TypeError, AttributeError):
+                    safe_dict[key] = value
+        return safe_dict
+
+    step = compile_value({"关键字": "input_text", "定位方式": "id", "元素": "kw", "文本": "{{var_1}}-{{user.name}}"})
+    local_context = {"user": {"name": "tester"}}
+    original = g_context._dic
+    try:
+        g_context._dic = {}
+        for i in range(size):
+            match i % 5:
+                case 0 | 1:
+                    g_context._dic[f"var_{i}"] = f"value-{i}"
+                case 2:
+                    g_context._dic[f"var_{i}"] = i
+                case 3:
+                    g_context._dic[f"var_{i}"] = {"id": i, "items": list(range(10))}
+                case _:
+                    g_context._dic[f"var_{i}"] = [{"id": i}, {"name": f"item-{i}"}]
+        g_context._dic["current_page"] = threading.Lock()  # 无法深拷贝
+        g_context._dic["page_handle"] = threading.Lock()
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            context = legacy_copy(g_context().show_dict())
+            context.update(local_context)
+            step(context)
+        legacy_cost = (time.perf_counter() - start) / steps * 1e6
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            step(g_context().snapshot(local_context))
+        snapshot_cost = (time.perf_counter() - start) / steps * 1e6
+
+        print(f"上下文变量数: {size}")
+        print(f"逐键 deepcopy: {legacy_cost:.1f} us/步")
+        print(f"上下文快照: {snapshot_cost:.1f} us/步")
+    finally:
+        g_context._dic = original
@@ -2,7 +2,6 @@
 Web 自动化测试关键字
 基于 Playwright 实现
 """
-import os
 import time
 from typing import Optional
 
@@ -10,7 +9,33 @@ import allure
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError, expect
 
 from ..core.globalContext import g_context
+from ..utils.AutoWait import AutoWait
+from ..utils.BrowserPool import BrowserPool
+from ..utils.LocatorCache import LocatorCache
 from ..utils.PlaywrightManager import PlaywrightManager
+from ..utils.ScreenshotCapture import ScreenshotCapture
+
+# 批量查找：在页面中一次解析多个 CSS/XPath 定位，返回 名称 -> {count, visible, text}
+# 可见性判断与 Playwright 一致：有非空的包围盒且 visibility 不为 hidden
+_BATCH_FIND_SCRIPT = """
+(specs) => Object.fromEntries(Object.entries(specs).map(([name, [kind, expr]]) => {
+  try {
+    let nodes;
+    if (kind === "xpath") {
+      const result = document.evaluate(expr, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      nodes = Array.from({length: result.snapshotLength}, (_, i) => result.snapshotItem(i));
+    } else {
+      nodes = Array.from(document.querySelectorAll(expr));
+    }
+    const first = nodes[0];
+    const rect = first && first.getBoundingClientRect ? first.getBoundingClientRect() : null;
+    const visible = !!rect && rect.width > 0 && rect.height > 0 && getComputedStyle(first).visibility !== "hidden";
+    return [name, {count: nodes.length, visible, text: first ? (first.textContent || "").trim() : null}];
+  } catch (e) {
+    return [name, {error: String(e)}];
+  }
+}))
+"""
 
 
 class Keywords:
@@ -59,13 +84,12 @@ class Keywords:
             # 默认当作 CSS 选择器
             return element
 
-    def _find_element(self, locator_type: str, element: str, wait_time: int = None, **kwargs):
+    def _find_locator(self, locator_type: str, element: str, **kwargs):
         """
-        查找元素
+        构造元素定位器（不与浏览器交互）
         
         :param locator_type: 定位方式
         :param element: 元素标识
-        :param wait_time: 等待时间（秒）
         :param kwargs: 额外参数（如 role 定位的 name）
         :return: Locator
         """
@@ -76,39 +100,42 @@ class Keywords:
         if locator_type_lower == "role":
             name = kwargs.get("name")
             if name:
-                locator = page.get_by_role(element, name=name)
-            else:
-                locator = page.get_by_role(element)
-        else:
-            selector = self._get_selector(locator_type, element)
-            locator = page.locator(selector)
+                return page.get_by_role(element, name=name)
+            return page.get_by_role(element)
+        return page.locator(self._get_selector(locator_type, element))
+
+    @staticmethod
+    def _locator_key(locator_type: str, element: str, name: Optional[str] = None) -> str:
+        """元素定位缓存使用的键"""
+        return f"{locator_type}={element}" + (f"[name={name}]" if name else "")
+
+    def _find_element(self, locator_type: str, element: str, wait_time: int = None, state: str = "visible", **kwargs):
+        """
+        查找元素
+
+        开启自动等待（_wait.enabled）时，必要时先等待页面稳定，再等待元素达到 state 状态（页面没有变化时命中元素定位缓存）
+        
+        :param locator_type: 定位方式
+        :param element: 元素标识
+        :param wait_time: 等待时间（秒），为空时最多等待 _wait.max_timeout
+        :param state: 操作前需要达到的元素状态 visible/attached
+        :param kwargs: 额外参数（如 role 定位的 name）
+        :return: Locator
+        """
+        page = self._get_page()
+        locator = self._find_locator(locator_type, element, **kwargs)
         
-        if wait_time:
-            locator.wait_for(timeout=wait_time * 1000)
+        if AutoWait.config()["enabled"]:
+            timeout = float(wait_time) * 1000 if wait_time else None
+            AutoWait.wait_actionable(page, locator, self._locator_key(locator_type, element, kwargs.get("name")), state, timeout)
+        elif wait_time:
+            locator.wait_for(timeout=float(wait_time) * 1000)
         
         return locator
 
     def _take_screenshot_on_error(self, name: str):
-        """错误时截图"""
-        try:
-            page = self._get_page()
-            # 获取项目根目录下的 reports/screenshots 目录
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            screenshot_dir = os.path.join(project_root, "reports", "screenshots")
-            if not os.path.exists(screenshot_dir):
-                os.makedirs(screenshot_dir)
-            
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            # 清理文件名中的非法字符
-            safe_name = "".join(c if c.isalnum() or c in "_-" else "_" for c in name)
-            filename = os.path.join(screenshot_dir, f"{safe_name}_{timestamp}.png")
-            page.screenshot(path=filename)
-            
-            # 附加到 Allure 报告
-            with open(filename, "rb") as f:
-                allure.attach(f.read(), name=name, attachment_type=allure.attachment_type.PNG)
-        except Exception as e:
-            print(f"截图失败: {e}")
+        """记录失败截图名称（步骤失败后由 runner 截图一次，用例结束时附加到 Allure 报告）"""
+        ScreenshotCapture.note_failure(name)
 
     # ==================== 浏览器操作 ====================
 
@@ -122,6 +149,7 @@ class Keywords:
             headless: true/false (默认 true，无头模式)
             timeout: 默认超时时间（秒，默认 30）
             window_size: 1920x1080/等 (默认 1920x1080)
+            storage_state: 预登录状态文件 (可选，默认使用 _browser_pool 配置)
         """
         browser = kwargs.get("browser", "chromium")
         # 默认无头模式，用户无感知
@@ -146,19 +174,39 @@ class Keywords:
             browser_type=browser,
             headless=headless,
             timeout=timeout,
-            viewport=viewport
+            viewport=viewport,
+            storage_state=kwargs.get("storage_state")
         )
         
         g_context().set_dict("current_page", page)
+        if AutoWait.config()["enabled"]:
+            # 从打开页面开始跟踪网络请求和 DOM 变化
+            AutoWait.attach(page)
         print(f"浏览器启动成功: {browser}")
 
     @allure.step("关闭浏览器")
     def close_browser(self, **kwargs):
-        """关闭浏览器"""
+        """关闭浏览器（归还当前用例的浏览器上下文，浏览器进程由后续用例复用）"""
         PlaywrightManager.close()
         g_context().set_dict("current_page", None)
         print("浏览器已关闭")
 
+    @allure.step("保存登录状态")
+    def save_storage_state(self, **kwargs):
+        """
+        保存当前浏览器上下文的登录状态（Cookie 和 localStorage）
+
+        后续用例的 open_browser 指定 storage_state（或配置 _browser_pool.storage_state）即可直接复用登录状态
+
+        参数:
+            path: 保存路径
+        """
+        path = kwargs.get("path")
+        if not path:
+            raise ValueError("save_storage_state 需要指定 path")
+        BrowserPool.save_storage_state(path)
+        print(f"登录状态已保存: {path}")
+
     @allure.step("导航到: {url}")
     def navigate_to(self, **kwargs):
         """
@@ -284,7 +332,7 @@ class Keywords:
         variable_name = kwargs.get("variable_name")
         wait_time = kwargs.get("wait_time")
         
-        locator = self._find_element(locator_type, element, wait_time)
+        locator = self._find_element(locator_type, element, wait_time, state="attached")
         text = locator.text_content() or ""
         
         if variable_name:
@@ -313,7 +361,7 @@ class Keywords:
         variable_name = kwargs.get("variable_name")
         wait_time = kwargs.get("wait_time")
         
-        locator = self._find_element(locator_type, element, wait_time)
+        locator = self._find_element(locator_type, element, wait_time, state="attached")
         attr_value = locator.get_attribute(attribute_name)
         
         if variable_name:
@@ -324,6 +372,57 @@ class Keywords:
         
         return attr_value
 
+    @allure.step("批量查找元素")
+    def find_elements(self, **kwargs):
+        """
+        批量查找元素：一次与浏览器的往返得到多个元素的数量、是否可见和文本，并预热元素定位缓存
+        （text/role 等 Playwright 专有定位方式无法在页面脚本中解析，逐个查询）
+        
+        参数:
+            locators: 名称 -> {locator_type, element}，如 {"username": {"locator_type": "id", "element": "username"}}
+            variable_name: 保存结果的变量名（可选），结果为 名称 -> {count, visible, text}
+        """
+        locators = kwargs.get("locators") or {}
+        variable_name = kwargs.get("variable_name")
+        if not isinstance(locators, dict):
+            raise ValueError("locators 应为 名称 -> {locator_type, element} 的字典")
+        
+        page = self._get_page()
+        signature = AutoWait.prepare(page) if AutoWait.config()["enabled"] else None
+        
+        # CSS / XPath 定位在页面脚本中一次解析，其余逐个查询
+        specs = {}
+        for name, spec in locators.items():
+            selector = self._get_selector(spec.get("locator_type", ""), spec.get("element", ""))
+            if selector.startswith("xpath="):
+                specs[name] = ["xpath", selector[len("xpath="):]]
+            elif not selector.startswith(("text=", "role=")):
+                specs[name] = ["css", selector]
+        results = page.evaluate(_BATCH_FIND_SCRIPT, specs) if specs else {}
+        
+        for name, spec in locators.items():
+            # Playwright 扩展的 CSS 语法（如 :has-text）在页面脚本中解析失败，改为逐个查询
+            if name not in results or results[name].get("error"):
+                locator = self._find_locator(spec.get("locator_type", ""), spec.get("element", ""), name=spec.get("name"))
+                count = locator.count()
+                visible = count > 0 and locator.first.is_visible()
+                results[name] = {"count": count, "visible": visible,
+                                 "text": (locator.first.text_content() or "").strip() if count else None}
+            result = results[name]
+            key = self._locator_key(spec.get("locator_type"), spec.get("element"), spec.get("name"))
+            if result["visible"]:
+                LocatorCache.store(page, key, "visible", signature)
+            elif result["count"]:
+                LocatorCache.store(page, key, "attached", signature)
+        
+        if variable_name:
+            g_context().set_dict(variable_name, results)
+            print(f"已批量查找 {len(results)} 个元素并保存到变量 {variable_name}: {results}")
+        else:
+            print(f"已批量查找 {len(results)} 个元素: {results}")
+        
+        return results
+
     @allure.step("选择下拉框")
     def select_dropdown(self, **kwargs):
         """
@@ -436,6 +535,8 @@ class Keywords:
     def sleep(self, **kwargs):
         """
         强制等待
+
+        配置 _wait.replace_sleep 为 true 时改为等待页面稳定，最多等待指定时间
         
         参数:
             time: 等待时间（秒）
@@ -444,11 +545,15 @@ class Keywords:
         sleep_time = float(kwargs.get("time", 1))
         # 兼容 Playwright 和 Browser-Use 模式
         page = g_context().get_dict("current_page")
-        if page:
+        if page and AutoWait.config()["replace_sleep"]:
+            settled = AutoWait.settle(page, sleep_time * 1000)
+            print("页面已稳定" if settled else f"已等待 {sleep_time} 秒")
+        elif page:
             page.wait_for_timeout(sleep_time * 1000)
+            print(f"已等待 {sleep_time} 秒")
         else:
             time_module.sleep(sleep_time)
-        print(f"已等待 {sleep_time} 秒")
+            print(f"已等待 {sleep_time} 秒")
 
     # ==================== 断言操作 ====================
 
@@ -516,7 +621,7 @@ class Keywords:
         expected_text = kwargs.get("expected_text", "")
         wait_time = kwargs.get("wait_time")
         
-        locator = self._find_element(locator_type, element, wait_time)
+        locator = self._find_element(locator_type, element, wait_time, state="attached")
         
         try:
             expect(locator).to_have_text(expected_text)
@@ -542,7 +647,7 @@ class Keywords:
         expected_text = kwargs.get("expected_text", "")
         wait_time = kwargs.get("wait_time")
         
-        locator = self._find_element(locator_type, element, wait_time)
+        locator = self._find_element(locator_type, element, wait_time, state="attached")
         
         try:
             expect(locator).to_contain_text(expected_text)
@@ -677,27 +782,15 @@ class Keywords:
         
         page = self._get_page()
         
-        # 获取项目根目录下的 reports/screenshots 目录
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        screenshot_dir = os.path.join(project_root, "reports", "screenshots")
-        if not os.path.exists(screenshot_dir):
-            os.makedirs(screenshot_dir)
-        
         if not filename:
             timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
+            filename = f"screenshot_{timestamp}"
         
-        if not filename.endswith(".png"):
-            filename += ".png"
-        
-        filepath = os.path.join(screenshot_dir, filename)
-        page.screenshot(path=filepath, full_page=full_page)
-        
-        # 附加到 Allure 报告
-        with open(filepath, "rb") as f:
-            allure.attach(f.read(), name=filename, attachment_type=allure.attachment_type.PNG)
-        
-        print(f"已截图: {filepath}")
+        # 截图保存到 reports/screenshots 目录（扩展名按 _capture.format），编码和写文件在后台线程完成
+        if ScreenshotCapture.capture(page, filename, filename=filename, full_page=full_page, dedupe=False) is None:
+            print(f"截图总大小超出 _capture.max_total_mb，已跳过截图: {filename}")
+        else:
+            print(f"已截图: {filename}")
 
     @allure.step("滚动到元素")
     def scroll_to_element(self, **kwargs):
@@ -854,7 +947,7 @@ class Keywords:
         element = kwargs.get("element")
         file_path = kwargs.get("file_path")
         
-        locator = self._find_element(locator_type, element)
+        locator = self._find_element(locator_type, element, state="attached")
         locator.set_input_files(file_path)
         print(f"已上传文件: {file_path}")
 
@@ -862,6 +955,8 @@ class Keywords:
     def wait_for_network_idle(self, **kwargs):
         """
         等待网络空闲
+
+        开启自动等待时等待进行中的请求结束且 DOM 不再变化（见 _wait.quiet_ms），否则使用 Playwright 的 networkidle
         
         参数:
             timeout: 超时时间（秒，默认 30）
@@ -869,7 +964,11 @@ class Keywords:
         timeout = int(kwargs.get("timeout", 30)) * 1000
         
         page = self._get_page()
-        page.wait_for_load_state("networkidle", timeout=timeout)
+        if AutoWait.config()["enabled"]:
+            if not AutoWait.settle(page, timeout):
+                raise PlaywrightTimeoutError(f"等待网络空闲超时: {timeout / 1000:g} 秒")
+        else:
+            page.wait_for_load_state("networkidle", timeout=timeout)
         print("网络已空闲")
 
     @allure.step("断言URL包含")
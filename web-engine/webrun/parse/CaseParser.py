@@ -10,6 +10,25 @@ from .YamlCaseParser import yaml_case_parser
 from ..core.exceptions import ParserError
 
 
+def case_group_key(caseinfo: dict[str, Any]) -> str:
+    """
+    用例分组键：同一分组的用例需按顺序在同一 worker 中运行（共享提取的变量）
+
+    优先使用用例中的 shard_group 字段；同一目录中文件名以数字开头的用例文件默认为同一分组（保持数字前缀顺序，
+    后面的文件可能依赖前面文件提取的变量），其它用例按来源文件分组，最后为用例名
+
+    :param caseinfo: 用例信息字典
+    :return: 分组键
+    """
+    if group := caseinfo.get("shard_group"):
+        return str(group)
+    if case_file := caseinfo.get("_case_file"):
+        path = Path(case_file)
+        # 数字前缀文件按前缀顺序依次执行（后面的文件可能用到前面文件提取的变量），同一目录的放在一起
+        return f"{path.parent}/*" if path.name.split("_")[0].isdigit() else str(path)
+    return str(caseinfo.get("_case_name"))
+
+
 def case_parser(case_type: str, case_dir: Path) -> dict[str, list[Any]]:
     """
     用例解析器 - 使用模式匹配选择解析器
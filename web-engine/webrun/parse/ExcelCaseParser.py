@@ -130,7 +130,8 @@ def load_excel_files(config_path):
                     current_test_case = {
                         "desc": row['测试用例标题'],
                         "用例等级": "" if pd.isna(row.get('用例等级')) else str(row['用例等级']),
-                        "steps": []
+                        "steps": [],
+                        "_case_file": file_name,
                     }
 
                 # 构建步骤
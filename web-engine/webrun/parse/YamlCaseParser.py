@@ -63,6 +63,8 @@ def load_yaml_files(config_path: Path) -> CaseList:
         with file_path.open("r", encoding='utf-8') as f:
             caseinfo = yaml.full_load(f)
             if caseinfo:
+                # 记录来源文件，并行执行时同一文件的用例分配到同一 worker
+                caseinfo["_case_file"] = file_path.name
                 case_list.append(caseinfo)
     
     return case_list
@@ -0,0 +1,311 @@
+"""
+自动等待
+元素操作前等待页面稳定（无进行中的请求、DOM 不再变化），再按元素可操作状态等待，替代固定的 sleep
+
+- 网络：通过页面的 request / requestfinished / requestfailed 事件统计进行中的请求，
+  WebSocket、EventSource 以及超过 long_request_ms 的长轮询请求不计入
+- DOM：注入 MutationObserver，DOM 变化时通过 expose_binding 主动通知（不需要轮询页面），超过 quiet_ms 没有变化视为稳定
+- 页面稳定最多等待 settle_timeout，超时不报错，继续执行元素等待；
+  上次页面稳定后没有导航和网络请求时跳过稳定检查（节省与浏览器的往返，也避免在时钟、动画等持续变化的页面上空等）
+- 元素等待未指定超时时最多等待 max_timeout
+- 页面签名 (导航次数, DOM 变化次数) 在本地维护，元素定位缓存（LocatorCache）判断页面是否变化不需要与浏览器往返
+
+配置通过 context.yaml 的 _wait 节点覆盖：
+
+    _wait:
+      enabled: true          # 是否开启自动等待
+      quiet_ms: 100          # 网络和 DOM 无变化多久视为稳定（毫秒）
+      settle_timeout: 2000   # 每次等待页面稳定的最长时间（毫秒）
+      long_request_ms: 5000  # 超过该时长的请求视为长连接，不再等待（毫秒）
+      max_timeout: 30000     # 元素等待超时（毫秒）
+      replace_sleep: false   # sleep 关键字改为等待页面稳定（最多等待指定时间）
+      lint: warn             # 用例中出现固定等待时：warn 提示 / error 报错 / off 不检查
+"""
+import time
+from typing import Any, Optional
+
+from playwright.sync_api import Locator, Page
+
+from ..core.globalContext import g_context
+from .LocatorCache import LocatorCache
+
+# 默认配置
+DEFAULT_WAIT_CONFIG: dict[str, Any] = {
+    "enabled": True,
+    "quiet_ms": 100,
+    "settle_timeout": 2000,
+    "long_request_ms": 5000,
+    "max_timeout": 30000,
+    "replace_sleep": False,
+    "lint": "warn",
+}
+
+# 轮询间隔（毫秒）：等待期间让 Playwright 分发网络事件
+_POLL_MS = 50
+
+# 不计入进行中请求的资源类型
+_IGNORED_RESOURCE_TYPES = {"websocket", "eventsource"}
+
+# DOM 变化时调用的绑定函数名
+_DOM_BINDING = "__webrunDomChanged"
+
+# DOM 变化时通知 Python 的 MutationObserver（每个文档只安装一次；同一任务中的多次变化合并为一次通知）
+_OBSERVER_SCRIPT = """
+(() => {
+  if (window.__webrunMutationObserver) return;
+  let scheduled = false;
+  const notify = () => {
+    scheduled = false;
+    if (window.__webrunDomChanged) window.__webrunDomChanged();
+  };
+  window.__webrunMutationObserver = new MutationObserver(() => {
+    if (!scheduled) {
+      scheduled = true;
+      setTimeout(notify, 0);
+    }
+  });
+  window.__webrunMutationObserver.observe(document, {
+    subtree: true, childList: true, attributes: true, characterData: true
+  });
+})()
+"""
+
+
+def _to_bool(value: Any) -> bool:
+    """兼容字符串布尔值"""
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+class _PageTracker:
+    """单个页面的进行中请求和 DOM 变化"""
+
+    __slots__ = ("inflight", "last_activity", "navigations", "dom_changes", "last_dom_change", "activity",
+                 "settled_activity", "stable")
+
+    def __init__(self, page: Page):
+        self.inflight: dict[Any, float] = {}
+        self.last_activity = time.perf_counter()
+        self.navigations = 0                  # 主文档导航次数
+        self.dom_changes = 0                  # DOM 变化通知次数
+        self.last_dom_change = time.perf_counter()
+        self.activity = 0                     # 导航和请求次数
+        self.settled_activity = -1            # 最近一次页面稳定时的 activity
+        self.stable = False                   # 最近一次等待页面稳定是否成功
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_finished)
+        page.on("framenavigated", self._on_navigated)
+
+    def _on_navigated(self, frame) -> None:
+        if frame.parent_frame is None:
+            self.navigations += 1
+            self.activity += 1
+            self.last_dom_change = time.perf_counter()
+
+    def on_dom_changed(self, _source: Any = None) -> None:
+        self.dom_changes += 1
+        self.last_dom_change = time.perf_counter()
+
+    def _on_request(self, request) -> None:
+        if request.resource_type not in _IGNORED_RESOURCE_TYPES:
+            self.inflight[request] = time.perf_counter()
+            self.last_activity = time.perf_counter()
+            self.activity += 1
+
+    def _on_finished(self, request) -> None:
+        if self.inflight.pop(request, None) is not None:
+            self.last_activity = time.perf_counter()
+
+    def network_idle_ms(self, long_request_ms: float) -> float:
+        """距最后一次网络活动的毫秒数，有进行中的请求时返回 -1（长连接请求不计入）"""
+        now = time.perf_counter()
+        if any((now - start) * 1000 < long_request_ms for start in self.inflight.values()):
+            return -1
+        return (now - self.last_activity) * 1000
+
+    def dom_idle_ms(self) -> float:
+        """距最后一次 DOM 变化（或导航）的毫秒数"""
+        return (time.perf_counter() - self.last_dom_change) * 1000
+
+
+class AutoWait:
+    """自动等待 - 按页面记录网络请求和 DOM 变化"""
+
+    _trackers: dict[int, _PageTracker] = {}
+
+    @classmethod
+    def config(cls) -> dict[str, Any]:
+        """获取自动等待配置（默认值 + context.yaml 中的 _wait 配置）"""
+        config = {**DEFAULT_WAIT_CONFIG, **(g_context().get_dict("_wait") or {})}
+        for key in ("quiet_ms", "settle_timeout", "long_request_ms", "max_timeout"):
+            config[key] = float(config[key])
+        config["enabled"] = _to_bool(config["enabled"])
+        config["replace_sleep"] = _to_bool(config["replace_sleep"])
+        config["lint"] = str(config["lint"]).lower()
+        return config
+
+    @classmethod
+    def attach(cls, page: Page) -> _PageTracker:
+        """开始跟踪页面的网络请求，并在当前及后续加载的文档中安装 MutationObserver"""
+        tracker = cls._trackers.get(id(page))
+        if tracker is None:
+            tracker = cls._trackers[id(page)] = _PageTracker(page)
+            page.on("close", lambda _: (cls._trackers.pop(id(page), None), LocatorCache.invalidate(page)))
+            page.expose_binding(_DOM_BINDING, tracker.on_dom_changed)
+            page.add_init_script(_OBSERVER_SCRIPT)
+            try:
+                page.evaluate(_OBSERVER_SCRIPT)
+            except Exception:
+                pass  # 页面正在导航，新文档由 init script 安装
+        return tracker
+
+    @classmethod
+    def settle(cls, page: Page, timeout: Optional[float] = None) -> bool:
+        """
+        等待页面稳定：网络和 DOM 均在 quiet_ms 内没有变化（只读取本地记录的事件，等待期间让 Playwright 分发事件）
+
+        :param page: 页面
+        :param timeout: 最长等待时间（毫秒），默认 settle_timeout
+        :return: 是否在超时前稳定
+        """
+        config = cls.config()
+        timeout = config["settle_timeout"] if timeout is None else timeout
+        tracker = cls.attach(page)
+        deadline = time.perf_counter() + timeout / 1000
+        while True:
+            network_idle = tracker.network_idle_ms(config["long_request_ms"])
+            if network_idle >= config["quiet_ms"] and tracker.dom_idle_ms() >= config["quiet_ms"]:
+                tracker.settled_activity = tracker.activity
+                tracker.stable = True
+                return True
+            remaining = (deadline - time.perf_counter()) * 1000
+            if remaining <= 0:
+                tracker.stable = False  # 页面未稳定，不使用元素定位缓存
+                return False
+            page.wait_for_timeout(min(_POLL_MS, remaining))
+
+    @classmethod
+    def prepare(cls, page: Page) -> Optional[tuple]:
+        """
+        元素操作前的页面准备：上次页面稳定后有导航或网络请求时等待页面稳定，否则跳过
+
+        :param page: 页面
+        :return: 当前页面签名（见 signature），页面未稳定时为 None
+        """
+        config = cls.config()
+        tracker = cls.attach(page)
+        if tracker.settled_activity != tracker.activity or tracker.network_idle_ms(config["long_request_ms"]) < 0:
+            cls.settle(page)
+        return cls.signature(page)
+
+    @classmethod
+    def signature(cls, page: Page) -> Optional[tuple]:
+        """
+        页面签名 (导航次数, DOM 变化次数)：签名不变说明上次检查后页面没有导航、DOM 没有变化（用于元素定位缓存）
+
+        签名由页面事件在本地维护，读取不需要与浏览器往返；最近一次等待页面稳定超时时为 None
+        """
+        tracker = cls._trackers.get(id(page))
+        if tracker is None or not tracker.stable:
+            return None
+        return tracker.navigations, tracker.dom_changes
+
+    @classmethod
+    def wait_actionable(cls, page: Page, locator: Locator, key: str, state: str = "visible",
+                        timeout: Optional[float] = None) -> None:
+        """
+        元素操作前的等待：必要时先等待页面稳定（见 prepare），再等待元素达到指定状态
+
+        :param page: 页面
+        :param locator: 元素定位器
+        :param key: 选择器（元素定位缓存的键）
+        :param state: 元素状态 visible/attached
+        :param timeout: 显式指定的超时（毫秒），为空时最多等待 max_timeout
+        :raises PlaywrightTimeoutError: 元素在超时前未就绪
+        """
+        # 签名与上次确认元素就绪时相同，说明页面没有变化，不再等待元素
+        signature = cls.prepare(page)
+        if LocatorCache.hit(page, key, state, signature):
+            return
+        locator.first.wait_for(state=state, timeout=cls.config()["max_timeout"] if timeout is None else timeout)
+        LocatorCache.store(page, key, state, signature)
+
+
+# 夹具页面：按钮点击后插入元素；#ready 在 /data 请求完成 300ms 后才出现
+_FIXTURE_HTML = """<!DOCTYPE html>
+<html><body>
+<button id="add" onclick="document.body.insertAdjacentHTML('beforeend', '<p id=added>added</p>')">add</button>
+<div id="late"></div>
+<script>
+  fetch("/data").then(r => r.text()).then(text => setTimeout(() => {
+    document.getElementById("late").innerHTML = '<span id="ready">' + text + "</span>";
+  }, 300));
+</script>
+</body></html>
+"""
+
+
+def test_auto_wait_fixture(headless: bool = True) -> None:
+    """
+    集成测试 - 在本地静态 HTML 夹具服务器上检查页面稳定、元素等待和元素定位缓存（需要安装 Playwright 的 chromium）
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from playwright.sync_api import sync_playwright
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/data":
+                time.sleep(0.2)  # 模拟慢接口
+                body, content_type = b"ok", "text/plain"
+            else:
+                body, content_type = _FIXTURE_HTML.encode("utf-8"), "text/html; charset=utf-8"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch(headless=headless)
+            page = browser.new_page()
+            AutoWait.attach(page)
+            page.goto(f"http://127.0.0.1:{server.server_port}/")
+
+            # 导航和请求之后先等待页面稳定，再等待延迟出现的元素
+            AutoWait.wait_actionable(page, page.locator("#ready"), "#ready")
+            assert page.text_content("#ready") == "ok"
+
+            # 页面没有变化：再次操作同一元素命中缓存，不再与浏览器往返
+            LocatorCache.begin_case()
+            AutoWait.wait_actionable(page, page.locator("#ready"), "#ready")
+            assert LocatorCache._stats["hits"] == 1, "页面没有变化时应命中元素定位缓存"
+
+            # DOM 变化后页面签名改变，缓存失效
+            signature = AutoWait.signature(page)
+            page.click("#add")
+            page.wait_for_timeout(100)  # 等待 DOM 变化通知送达
+            assert AutoWait.signature(page) != signature, "DOM 变化后页面签名应改变"
+            AutoWait.wait_actionable(page, page.locator("#ready"), "#ready")
+            assert LocatorCache._stats["hits"] == 1, "DOM 变化后不应命中元素定位缓存"
+
+            # 显式超时内未出现的元素报错
+            try:
+                AutoWait.wait_actionable(page, page.locator("#missing"), "#missing", timeout=300)
+            except Exception as e:
+                assert "Timeout" in type(e).__name__
+            else:
+                raise AssertionError("不存在的元素应等待超时")
+            browser.close()
+    finally:
+        server.shutdown()
+    print("自动等待夹具测试通过")
@@ -0,0 +1,264 @@
+"""
+浏览器上下文池
+每个进程（worker）只启动一次浏览器，用例之间复用浏览器进程，每个用例使用独立的 BrowserContext（Cookie、存储互相隔离）
+
+- 上下文执行 recycle_after 个用例后关闭重建；未达到上限时归还到池中，关闭页面、清空 Cookie、权限以及用例访问过的
+  源的 localStorage、sessionStorage 和 IndexedDB（再恢复预登录状态）后供下一个用例使用
+- 池中最多保留 pool_size 个空闲上下文（不同浏览器类型、视口、登录状态的上下文分别复用）；recycle_after 为 1 时
+  每个用例都使用全新上下文，空闲池不会被使用
+- storage_state 指定预登录状态文件（由 save_storage_state 关键字生成），新建上下文时直接加载，用例无需重复登录
+
+配置通过 context.yaml 的 _browser_pool 节点或命令行参数覆盖：
+
+    _browser_pool:
+      pool_size: 2                          # 每个 worker 保留的空闲上下文数量
+      recycle_after: 10                     # 一个上下文最多执行的用例数（1 表示每个用例使用全新上下文）
+      storage_state: auth/state.json        # 预登录状态文件（可选）
+"""
+import json
+import os
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright, sync_playwright
+
+from ..core.globalContext import g_context
+
+# 默认配置，可通过 context.yaml 的 _browser_pool 节点或命令行参数覆盖
+DEFAULT_POOL_CONFIG: dict[str, Any] = {
+    "pool_size": 2,
+    "recycle_after": 10,
+    "storage_state": None,
+}
+
+# 清空当前源的存储，再写入预登录状态中该源的 localStorage
+_RESET_STORAGE_JS = """
+async (items) => {
+    localStorage.clear();
+    sessionStorage.clear();
+    for (const db of await indexedDB.databases()) {
+        await new Promise(resolve => {
+            const request = indexedDB.deleteDatabase(db.name);
+            request.onsuccess = request.onerror = request.onblocked = resolve;
+        });
+    }
+    for (const {name, value} of items) localStorage.setItem(name, value);
+}
+"""
+
+
+def _origin(url: str) -> Optional[str]:
+    """页面地址对应的源（只处理 http/https）"""
+    parts = urlsplit(url)
+    if parts.scheme in ("http", "https") and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+
+class _PooledContext:
+    """池中的浏览器上下文及其已执行的用例数"""
+
+    __slots__ = ("context", "key", "uses", "storage_state")
+
+    def __init__(self, context: BrowserContext, key: tuple, storage_state: Optional[dict]):
+        self.context = context
+        self.key = key
+        self.uses = 0
+        self.storage_state = storage_state
+
+
+class BrowserPool:
+    """浏览器上下文池 - 进程内共享，每种浏览器只启动一次"""
+
+    _playwright: Optional[Playwright] = None
+    _browsers: dict[tuple[str, bool], Browser] = {}
+    _idle: list[_PooledContext] = []
+    _lease: Optional[_PooledContext] = None  # 当前用例占用的上下文
+    _page: Optional[Page] = None             # 当前用例操作的页面
+    _storage_states: dict[str, tuple[float, dict]] = {}  # 登录状态文件 -> (修改时间, 内容)
+
+    @classmethod
+    def config(cls) -> dict[str, Any]:
+        """获取上下文池配置（默认值 + context.yaml/命令行中的 _browser_pool 配置）"""
+        config = {**DEFAULT_POOL_CONFIG, **(g_context().get_dict("_browser_pool") or {})}
+        config["pool_size"] = max(0, int(config["pool_size"]))
+        config["recycle_after"] = max(1, int(config["recycle_after"]))
+        config["storage_state"] = config["storage_state"] or None
+        return config
+
+    @classmethod
+    def _get_browser(cls, browser_type: str, headless: bool) -> Browser:
+        """获取浏览器（每种浏览器类型 + 无头模式只启动一次）"""
+        key = (browser_type, headless)
+        browser = cls._browsers.get(key)
+        if browser is not None and browser.is_connected():
+            return browser
+
+        if cls._playwright is None:
+            cls._playwright = sync_playwright().start()
+        if browser_type in ["chromium", "chrome"]:
+            browser = cls._playwright.chromium.launch(headless=headless)
+        elif browser_type == "firefox":
+            browser = cls._playwright.firefox.launch(headless=headless)
+        elif browser_type in ["webkit", "safari"]:
+            browser = cls._playwright.webkit.launch(headless=headless)
+        elif browser_type == "edge":
+            # Edge 使用 Chromium 内核，通过 channel 指定
+            browser = cls._playwright.chromium.launch(headless=headless, channel="msedge")
+        else:
+            raise ValueError(f"不支持的浏览器类型: {browser_type}，支持的类型: chromium, firefox, webkit, edge")
+        cls._browsers[key] = browser
+        return browser
+
+    @classmethod
+    def _load_storage_state(cls, path: Optional[str]) -> Optional[dict]:
+        """读取登录状态文件（按修改时间缓存，文件更新后重新读取）"""
+        if not path:
+            return None
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"登录状态文件不存在: {path}，请先使用 save_storage_state 关键字生成")
+        mtime = os.path.getmtime(path)
+        cached = cls._storage_states.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = cls._storage_states[path] = (mtime, json.load(f))
+        return cached[1]
+
+    @classmethod
+    def acquire(cls, browser_type: str = "chromium", headless: bool = True, timeout: int = 30000,
+                viewport: dict = None, storage_state: str = None) -> Page:
+        """
+        为当前用例分配一个浏览器上下文并打开新页面
+
+        :param browser_type: 浏览器类型 (chromium/firefox/webkit/edge)
+        :param headless: 是否无头模式
+        :param timeout: 默认超时时间（毫秒）
+        :param viewport: 视口大小 {"width": 1920, "height": 1080}
+        :param storage_state: 预登录状态文件，为空时使用 _browser_pool 配置
+        :return: Page 实例
+        """
+        # 同一用例重复打开浏览器时先归还之前的上下文
+        cls.release()
+
+        browser_type = browser_type.lower()
+        viewport = viewport or {"width": 1920, "height": 1080}
+        storage_state = storage_state or cls.config()["storage_state"]
+        state = cls._load_storage_state(storage_state)
+        key = (browser_type, headless, viewport["width"], viewport["height"], storage_state)
+
+        pooled = next((item for item in cls._idle if item.key == key), None)
+        if pooled is not None:
+            cls._idle.remove(pooled)
+        else:
+            browser = cls._get_browser(browser_type, headless)
+            pooled = _PooledContext(browser.new_context(viewport=viewport, storage_state=state), key, state)
+
+        pooled.uses += 1
+        pooled.context.set_default_timeout(timeout)
+        cls._lease = pooled
+        cls._page = pooled.context.new_page()
+        return cls._page
+
+    @classmethod
+    def release(cls) -> None:
+        """用例结束：归还当前上下文（达到复用上限或池已满时关闭）"""
+        pooled, cls._lease, cls._page = cls._lease, None, None
+        if pooled is None:
+            return
+        config = cls.config()
+        if pooled.uses < config["recycle_after"] and len(cls._idle) < config["pool_size"]:
+            try:
+                cls._reset(pooled)
+                cls._idle.append(pooled)
+                return
+            except Exception as e:
+                print(f"重置浏览器上下文失败，重新创建: {e}")
+        try:
+            pooled.context.close()
+        except Exception as e:
+            print(f"关闭浏览器上下文失败: {e}")
+
+    @classmethod
+    def _reset(cls, pooled: _PooledContext) -> None:
+        """重置上下文：关闭页面，清空 Cookie、权限和用例访问过的源的存储，然后恢复预登录状态"""
+        context = pooled.context
+        # 用例访问过的源（页面和 iframe）+ 仍有 localStorage 的源 + 预登录状态中的源
+        origins = {_origin(frame.url) for page in context.pages for frame in page.frames}
+        origins.update(item["origin"] for item in context.storage_state().get("origins", []))
+        preset = {item["origin"]: item.get("localStorage", []) for item in (pooled.storage_state or {}).get("origins", [])}
+        origins.update(preset)
+        origins.discard(None)
+
+        # 关闭页面后 sessionStorage 随之丢弃，页面持有的 IndexedDB 连接也会关闭
+        for page in list(context.pages):
+            page.close()
+        context.clear_cookies()
+        context.clear_permissions()
+        if origins:
+            # 在每个源下执行清理脚本；请求在本地返回空白页，不访问被测站点
+            page = context.new_page()
+            try:
+                page.route("**/*", lambda route: route.fulfill(status=200, content_type="text/html", body=""))
+                for origin in sorted(origins):
+                    page.goto(f"{origin}/", wait_until="commit")
+                    page.evaluate(_RESET_STORAGE_JS, preset.get(origin, []))
+                page.goto("about:blank")
+            finally:
+                page.close()
+        if pooled.storage_state and pooled.storage_state.get("cookies"):
+            context.add_cookies(pooled.storage_state["cookies"])
+
+    @classmethod
+    def save_storage_state(cls, path: str) -> str:
+        """
+        保存当前上下文的登录状态（Cookie 和 localStorage），供后续用例通过 storage_state 复用
+
+        :param path: 保存路径
+        :return: 保存路径
+        """
+        if cls._lease is None:
+            raise RuntimeError("浏览器未启动，请先使用 open_browser 关键字打开浏览器")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        cls._lease.context.storage_state(path=path)
+        cls._storage_states.pop(path, None)
+        return path
+
+    @classmethod
+    def get_page(cls) -> Optional[Page]:
+        """获取当前页面"""
+        return cls._page
+
+    @classmethod
+    def set_page(cls, page: Page) -> None:
+        """切换当前页面"""
+        cls._page = page
+
+    @classmethod
+    def get_context(cls) -> Optional[BrowserContext]:
+        """获取当前用例的浏览器上下文"""
+        return cls._lease.context if cls._lease else None
+
+    @classmethod
+    def get_browser(cls) -> Optional[Browser]:
+        """获取当前用例使用的浏览器"""
+        return cls._lease.context.browser if cls._lease else None
+
+    @classmethod
+    def close(cls) -> None:
+        """关闭所有上下文、浏览器和 Playwright（进程结束时调用）"""
+        cls.release()
+        for pooled in cls._idle:
+            try:
+                pooled.context.close()
+            except Exception:
+                pass
+        cls._idle.clear()
+        for browser in cls._browsers.values():
+            try:
+                browser.close()
+            except Exception:
+                pass
+        cls._browsers.clear()
+        if cls._playwright:
+            cls._playwright.stop()
+            cls._playwright = None
@@ -0,0 +1,71 @@
+"""
+用例检查
+收集阶段检查用例中的固定等待（sleep 关键字、脚本中的 time.sleep / wait_for_timeout / setTimeout），
+固定等待既浪费时间又容易因环境快慢不同而失败，建议改用 wait_for_element_visible 等条件等待或依赖自动等待（见 AutoWait）
+
+检查级别通过 context.yaml 的 _wait.lint 配置：warn 输出提示（默认）/ error 收集失败 / off 不检查
+"""
+import re
+from typing import Any
+
+from ..core.exceptions import CaseLintError
+
+# 脚本中的固定等待
+_SLEEP_PATTERN = re.compile(r"\btime\.sleep\s*\(|\bwait_for_timeout\s*\(|\bsetTimeout\s*\(")
+
+# 可能包含脚本代码的步骤参数
+_SCRIPT_FIELDS = ("code", "script")
+
+
+def _script_sleeps(source: Any) -> bool:
+    """脚本代码中是否包含固定等待"""
+    if isinstance(source, (list, tuple)):
+        return any(_script_sleeps(item) for item in source)
+    return isinstance(source, str) and _SLEEP_PATTERN.search(source) is not None
+
+
+def lint_case(caseinfo: dict[str, Any]) -> list[str]:
+    """
+    检查单个用例中的固定等待
+
+    :param caseinfo: 用例信息
+    :return: 问题描述列表
+    """
+    case_name = caseinfo.get("_case_name") or caseinfo.get("desc")
+    issues = []
+    for field in ("pre_script", "post_script"):
+        if _script_sleeps(caseinfo.get(field)):
+            issues.append(f"{case_name}: {field} 中包含固定等待")
+
+    for step in caseinfo.get("steps") or []:
+        step_name, step_value = next(iter(step.items()))
+        if not isinstance(step_value, dict):
+            continue
+        if step_value.get("关键字") == "sleep":
+            issues.append(f"{case_name}: 步骤「{step_name}」使用 sleep 固定等待 {step_value.get('time', 1)} 秒，"
+                          f"建议改用 wait_for_element_visible 等条件等待")
+        elif any(_script_sleeps(step_value.get(field)) for field in _SCRIPT_FIELDS):
+            issues.append(f"{case_name}: 步骤「{step_name}」的脚本中包含固定等待")
+    return issues
+
+
+def lint_cases(case_infos: list[dict[str, Any]], level: str = "warn") -> list[str]:
+    """
+    检查用例中的固定等待
+
+    :param case_infos: 用例信息列表
+    :param level: warn 输出提示 / error 存在问题时抛出 CaseLintError / off 不检查
+    :return: 问题描述列表
+    :raises CaseLintError: level 为 error 且存在固定等待
+    """
+    if level == "off":
+        return []
+    issues = [issue for caseinfo in case_infos for issue in lint_case(caseinfo)]
+    if not issues:
+        return issues
+
+    message = f"发现 {len(issues)} 处固定等待:\n" + "\n".join(f"  - {issue}" for issue in issues)
+    if level == "error":
+        raise CaseLintError(message)
+    print(f"[lint] {message}")
+    return issues
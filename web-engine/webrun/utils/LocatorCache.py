@@ -0,0 +1,106 @@
+"""
+元素定位缓存
+连续步骤操作同一元素时，跳过重复的元素等待（locator.wait_for 需要一次与浏览器的往返）
+
+- 缓存按页面保存：选择器 + 元素状态 -> 确认就绪时页面的 (导航次数, DOM 变化次数)
+- 页面发生导航或 DOM 变化后签名不同，缓存自动失效；签名由自动等待（AutoWait）根据页面事件和 MutationObserver 的通知在本地维护，
+  查询缓存不需要与浏览器往返；关闭自动等待时不使用缓存
+- 统计每个用例与浏览器的往返次数（Playwright 发送到浏览器的消息数）和缓存命中次数，用例结束时输出
+"""
+import functools
+from typing import Any, Optional
+
+# 元素状态 -> 可以满足该状态的已缓存状态（可见的元素一定已挂载）
+_SATISFIES = {"attached": ("attached", "visible"), "visible": ("visible",)}
+
+
+class LocatorCache:
+    """元素定位缓存 - 按页面保存，进程内共享"""
+
+    _entries: dict[int, dict[tuple[str, str], tuple]] = {}  # id(page) -> {(选择器, 状态): 签名}
+    _round_trips = 0
+    _stats = {"hits": 0, "lookups": 0, "round_trips": 0}  # 当前用例
+    _totals = {"cases": 0, "hits": 0, "lookups": 0, "round_trips": 0}
+    _counting = False
+
+    @classmethod
+    def hit(cls, page, key: str, state: str, signature: Optional[tuple]) -> bool:
+        """
+        元素是否已在当前页面状态下确认就绪
+
+        :param page: 页面
+        :param key: 选择器
+        :param state: 需要的元素状态 visible/attached
+        :param signature: 当前页面签名 (导航次数, DOM 变化次数)，为空时不使用缓存
+        """
+        cls._stats["lookups"] += 1
+        if signature is None:
+            return False
+        entries = cls._entries.get(id(page), {})
+        if any(entries.get((key, cached)) == signature for cached in _SATISFIES.get(state, (state,))):
+            cls._stats["hits"] += 1
+            return True
+        return False
+
+    @classmethod
+    def store(cls, page, key: str, state: str, signature: Optional[tuple]) -> None:
+        """记录元素在页面签名为 signature 时已就绪"""
+        if signature is None:
+            return
+        entries = cls._entries.setdefault(id(page), {})
+        # 签名变化后旧记录不会再命中，直接清理
+        if any(value != signature for value in entries.values()):
+            entries.clear()
+        entries[(key, state)] = signature
+
+    @classmethod
+    def invalidate(cls, page=None) -> None:
+        """清空页面（为空时为所有页面）的缓存"""
+        if page is None:
+            cls._entries.clear()
+        else:
+            cls._entries.pop(id(page), None)
+
+    @classmethod
+    def install_round_trip_counter(cls) -> None:
+        """统计 Playwright 发送到浏览器的消息数（进程内只安装一次，Playwright 内部接口变化时不统计）"""
+        if cls._counting:
+            return
+        try:
+            from playwright._impl._connection import Connection
+            send = Connection._send_message_to_server
+        except (ImportError, AttributeError):
+            print("当前 Playwright 版本不支持统计浏览器往返次数")
+            return
+
+        @functools.wraps(send)
+        def counting_send(self, *args, **kwargs):
+            cls._round_trips += 1
+            return send(self, *args, **kwargs)
+
+        Connection._send_message_to_server = counting_send
+        cls._counting = True
+
+    @classmethod
+    def begin_case(cls) -> None:
+        cls._stats = {"hits": 0, "lookups": 0, "round_trips": cls._round_trips}
+
+    @classmethod
+    def end_case(cls) -> dict[str, Any]:
+        """用例结束：输出并累计本用例的往返次数和缓存命中次数"""
+        stats = {**cls._stats, "round_trips": cls._round_trips - cls._stats["round_trips"]}
+        cls._totals["cases"] += 1
+        for key in ("hits", "lookups", "round_trips"):
+            cls._totals[key] += stats[key]
+        trips = f"浏览器往返 {stats['round_trips']} 次，" if cls._counting else ""
+        print(f"{trips}元素定位 {stats['lookups']} 次，缓存命中 {stats['hits']} 次")
+        return stats
+
+    @classmethod
+    def print_report(cls) -> None:
+        """输出所有用例的汇总"""
+        totals = cls._totals
+        if not totals["cases"]:
+            return
+        trips = f"平均每个用例浏览器往返 {totals['round_trips'] / totals['cases']:.1f} 次，" if cls._counting else ""
+        print(f"用例 {totals['cases']} 个，{trips}元素定位 {totals['lookups']} 次，缓存命中 {totals['hits']} 次")
@@ -0,0 +1,313 @@
+"""
+截图采集
+页面线程只负责截取原始图片，缩放、格式转换、写文件在后台线程池中完成，Allure 附件在用例结束时统一添加
+
+- 采集策略 mode：
+  all      每个步骤结束后截图
+  failure  只在步骤失败时截图（默认）
+  last_n   每个步骤截取原始图片放入环形缓冲区（不编码），失败时把最近 last_n 张连同失败截图一起输出，成功则丢弃
+  off      不自动截图（take_screenshot 关键字仍然生效）
+- 按内容哈希去重：页面没有变化时相同的截图只保存一个文件，每个用例仍然附加到自己的 Allure 结果中
+- 失败截图由 runner 在步骤失败时截取一次；关键字只通过 note_failure 提供更具体的截图名称
+- 按 max_width 等比缩小，可转换为 jpeg/webp（需要 Pillow）
+- 每次运行（每个 worker 进程）的截图总大小不超过 max_total_mb，超出后不再截图
+
+配置通过 context.yaml 的 _capture 节点覆盖：
+
+    _capture:
+      mode: failure          # all / failure / last_n / off
+      last_n: 5              # last_n 模式下保留的步骤截图数量
+      format: png            # png / jpeg / webp
+      quality: 80            # jpeg/webp 质量
+      max_width: 0           # 宽度超过该值时等比缩小（0 表示不缩放）
+      full_page: false       # 自动截图是否截取整个页面
+      max_total_mb: 200      # 截图总大小上限（MB）
+      workers: 2             # 后台编码线程数
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+import allure
+from playwright.sync_api import Page
+
+from ..core.globalContext import g_context
+from .StepProfiler import profiler
+
+# 默认配置
+DEFAULT_CAPTURE_CONFIG: dict[str, Any] = {
+    "mode": "failure",
+    "last_n": 5,
+    "format": "png",
+    "quality": 80,
+    "max_width": 0,
+    "full_page": False,
+    "max_total_mb": 200,
+    "workers": 2,
+}
+
+CAPTURE_MODES = ("all", "failure", "last_n", "off")
+
+# 输出格式 -> (Allure 附件类型, 扩展名)，Allure 没有内置 webp 类型，按 MIME 类型指定
+_ATTACHMENT_TYPES = {
+    "png": (allure.attachment_type.PNG, "png"),
+    "jpeg": (allure.attachment_type.JPG, "jpg"),
+    "webp": ("image/webp", "webp"),
+}
+
+# 截图目录：项目根目录下的 reports/screenshots
+SCREENSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "reports", "screenshots"
+)
+
+
+def _to_bool(value: Any) -> bool:
+    """兼容字符串布尔值"""
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _safe_name(name: str) -> str:
+    """清理文件名中的非法字符"""
+    return "".join(c if c.isalnum() or c in "_-" else "_" for c in name)
+
+
+class _Frame:
+    """一次截图：原始图片及编码结果"""
+
+    __slots__ = ("name", "raw", "filename", "dedupe", "path", "data", "duplicate_of", "ready")
+
+    def __init__(self, name: str, raw: bytes, filename: Optional[str], dedupe: bool):
+        self.name = name
+        self.raw = raw
+        self.filename = filename
+        self.dedupe = dedupe
+        self.path: Optional[str] = None                 # 写入的文件，未写入（重复或超出预算）时为空
+        self.data: Optional[bytes] = None               # 编码后的图片，附加到 Allure 后释放
+        self.duplicate_of: Optional["_Frame"] = None    # 与之前某张截图相同（复用其文件）
+        self.ready = threading.Event()                  # 编码完成（或确定为重复、被丢弃）
+
+
+class ScreenshotCapture:
+    """截图采集 - 进程内共享，后台线程池编码"""
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _pending: list[Future] = []             # 已提交编码、尚未添加到 Allure 的截图
+    _ring: deque = deque()                  # last_n 模式下最近步骤的原始截图
+    _digests: dict[str, _Frame] = {}        # 内容哈希 -> 首次保存该内容的截图
+    _failure_name: Optional[str] = None     # 关键字提供的失败截图名称
+    _lock = threading.Lock()
+    _stats = {"frames": 0, "duplicates": 0, "dropped": 0, "bytes": 0}
+
+    @classmethod
+    def config(cls) -> dict[str, Any]:
+        """获取截图配置（默认值 + context.yaml/命令行中的 _capture 配置）"""
+        config = {**DEFAULT_CAPTURE_CONFIG, **(g_context().get_dict("_capture") or {})}
+        config["mode"] = str(config["mode"]).lower()
+        if config["mode"] not in CAPTURE_MODES:
+            raise ValueError(f"不支持的截图策略: {config['mode']}，支持的策略: {', '.join(CAPTURE_MODES)}")
+        config["format"] = str(config["format"]).lower().replace("jpg", "jpeg")
+        if config["format"] not in _ATTACHMENT_TYPES:
+            raise ValueError(f"不支持的截图格式: {config['format']}，支持的格式: png, jpeg, webp")
+        for key in ("last_n", "quality", "max_width", "workers"):
+            config[key] = max(0, int(config[key]))
+        config["max_total_mb"] = float(config["max_total_mb"])
+        config["full_page"] = _to_bool(config["full_page"])
+        return config
+
+    @classmethod
+    def _over_budget(cls, config: dict[str, Any]) -> bool:
+        return cls._stats["bytes"] >= config["max_total_mb"] * 1024 * 1024
+
+    @classmethod
+    def _grab(cls, page: Page, name: str, config: dict[str, Any], full_page: Optional[bool] = None) -> bytes:
+        """在页面线程截取原始图片（jpeg 直接由浏览器编码，其余格式先截取 png）"""
+        full_page = config["full_page"] if full_page is None else full_page
+        with profiler.span(name, "capture"):
+            if config["format"] == "jpeg":
+                return page.screenshot(full_page=full_page, type="jpeg", quality=config["quality"] or None, scale="css")
+            return page.screenshot(full_page=full_page, scale="css")
+
+    @classmethod
+    def _submit(cls, frame: _Frame, config: dict[str, Any]) -> Future:
+        """提交到后台线程编码"""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=max(1, config["workers"]), thread_name_prefix="webrun-capture")
+        future = cls._executor.submit(cls._encode, frame, config)
+        cls._pending.append(future)
+        return future
+
+    @classmethod
+    def _encode(cls, frame: _Frame, config: dict[str, Any]) -> _Frame:
+        """后台线程：去重、缩放/转换格式、写文件"""
+        try:
+            return cls._encode_frame(frame, config)
+        finally:
+            frame.ready.set()
+
+    @classmethod
+    def _encode_frame(cls, frame: _Frame, config: dict[str, Any]) -> _Frame:
+        with profiler.span(frame.name, "capture"):
+            digest = hashlib.sha1(frame.raw).hexdigest()
+            if frame.dedupe:
+                with cls._lock:
+                    # 先占位，并发编码的相同截图也只保存一次
+                    original = cls._digests.setdefault(digest, frame)
+                    if original is not frame:
+                        cls._stats["duplicates"] += 1
+                        frame.duplicate_of = original
+                        frame.raw = b""
+                        return frame
+
+            data = frame.raw
+            if config["max_width"] or config["format"] == "webp":
+                from PIL import Image  # 只有缩放或转换格式时才需要 Pillow
+
+                image = Image.open(io.BytesIO(frame.raw))
+                if config["max_width"] and image.width > config["max_width"]:
+                    height = round(image.height * config["max_width"] / image.width)
+                    image = image.resize((config["max_width"], height), Image.LANCZOS)
+                buffer = io.BytesIO()
+                if config["format"] == "png":
+                    image.save(buffer, format="PNG", optimize=True)
+                elif config["format"] == "jpeg":
+                    image.convert("RGB").save(buffer, format="JPEG", quality=config["quality"] or 80)
+                else:
+                    image.save(buffer, format="WEBP", quality=config["quality"] or 80)
+                data = buffer.getvalue()
+            frame.raw = b""
+
+            with cls._lock:
+                if cls._over_budget(config):
+                    cls._stats["dropped"] += 1
+                    if cls._digests.get(digest) is frame:
+                        del cls._digests[digest]
+                    return frame
+                cls._stats["bytes"] += len(data)
+                cls._stats["frames"] += 1
+
+            extension = _ATTACHMENT_TYPES[config["format"]][1]
+            filename = frame.filename or f"{_safe_name(frame.name)}_{time.strftime('%Y%m%d_%H%M%S')}_{digest[:8]}"
+            os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+            path = os.path.join(SCREENSHOT_DIR, f"{os.path.splitext(filename)[0]}.{extension}")
+            with open(path, "wb") as f:
+                f.write(data)
+            frame.path, frame.data = path, data
+            return frame
+
+    @classmethod
+    def capture(cls, page: Page, name: str, filename: Optional[str] = None, full_page: Optional[bool] = None,
+                dedupe: bool = True) -> Optional[Future]:
+        """
+        截图并提交后台编码（不等待编码完成）
+
+        :param page: 页面
+        :param name: 截图名称（Allure 附件名）
+        :param filename: 保存的文件名（扩展名按配置的格式），为空时按名称和时间生成
+        :param full_page: 是否截取整个页面，为空时使用配置
+        :param dedupe: 是否按内容去重（自动截图去重，take_screenshot 关键字始终保存）
+        :return: 编码任务，结果为 _Frame；超出预算时返回 None
+        """
+        config = cls.config()
+        if cls._over_budget(config):
+            with cls._lock:
+                cls._stats["dropped"] += 1
+            return None
+        raw = cls._grab(page, name, config, full_page)
+        return cls._submit(_Frame(name, raw, filename, dedupe), config)
+
+    @classmethod
+    def after_step(cls, page: Optional[Page], step_name: str) -> None:
+        """步骤执行成功后按策略截图，并把已编码完成的截图添加到 Allure"""
+        config = cls.config()
+        if page is not None:
+            if config["mode"] == "all":
+                cls.capture(page, step_name)
+            elif config["mode"] == "last_n" and config["last_n"] and not cls._over_budget(config):
+                if cls._ring.maxlen != config["last_n"]:
+                    cls._ring = deque(cls._ring, maxlen=config["last_n"])
+                cls._ring.append(_Frame(step_name, cls._grab(page, step_name, config), None, True))
+        cls.attach_ready()
+
+    @classmethod
+    def note_failure(cls, name: str) -> None:
+        """关键字记录失败截图名称（截图由 runner 在步骤失败时统一截取，每次失败只截一次）"""
+        cls._failure_name = name
+
+    @classmethod
+    def on_failure(cls, page: Optional[Page], name: str) -> None:
+        """
+        步骤失败时截图；last_n 模式下同时输出环形缓冲区中最近的步骤截图
+
+        :param page: 页面
+        :param name: 截图名称（关键字通过 note_failure 记录了名称时使用关键字的名称）
+        """
+        name, cls._failure_name = cls._failure_name or name, None
+        config = cls.config()
+        if config["mode"] == "off" or page is None:
+            return
+        while cls._ring:
+            cls._submit(cls._ring.popleft(), config)
+        try:
+            cls.capture(page, name)
+        except Exception as e:
+            print(f"截图失败: {e}")
+
+    @classmethod
+    def attach_ready(cls, wait: bool = False) -> None:
+        """
+        把编码完成的截图添加到 Allure（在用例线程中调用，后台线程无法确定所属的用例）
+
+        :param wait: 是否等待所有截图编码完成
+        """
+        pending, cls._pending = cls._pending, []
+        for future in pending:
+            if not wait and not future.done():
+                cls._pending.append(future)
+                continue
+            try:
+                frame = future.result()
+            except Exception as e:
+                print(f"截图编码失败: {e}")
+                continue
+            original = frame.duplicate_of
+            if original is not None and not original.ready.is_set():
+                if not wait:
+                    cls._pending.append(future)  # 相同内容的截图仍在编码，等其写入文件后再附加
+                    continue
+                original.ready.wait()
+            attachment_type, extension = _ATTACHMENT_TYPES[cls.config()["format"]]
+            with profiler.span(frame.name, "allure"):
+                if original is not None:
+                    # 文件只保存一次，每个用例仍附加自己的截图
+                    if original.path:
+                        allure.attach.file(original.path, name=frame.name, attachment_type=attachment_type,
+                                           extension=extension)
+                elif frame.data is not None:
+                    allure.attach(frame.data, name=frame.name, attachment_type=attachment_type, extension=extension)
+                    frame.data = None
+
+    @classmethod
+    def end_case(cls) -> None:
+        """用例结束：丢弃环形缓冲区（用例成功时不输出），等待本用例的截图编码完成并添加到 Allure"""
+        cls._ring.clear()
+        cls._failure_name = None
+        cls.attach_ready(wait=True)
+
+    @classmethod
+    def close(cls) -> None:
+        """关闭后台线程池并输出截图统计（进程结束时调用）"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+        cls._pending.clear()
+        stats = cls._stats
+        if stats["frames"] or stats["duplicates"] or stats["dropped"]:
+            print(f"截图 {stats['frames']} 张（{stats['bytes'] / 1024 / 1024:.1f} MB），"
+                  f"重复跳过 {stats['duplicates']} 张，超出预算丢弃 {stats['dropped']} 张")
@@ -0,0 +1,190 @@
+"""
+步骤耗时分析
+记录用例执行各阶段（渲染、上下文拷贝、关键字分发、关键字执行、断言、截图附件等）的耗时，
+运行结束时按阶段输出耗时分布，并导出 Chrome Trace 格式的 JSON（可用 chrome://tracing、Perfetto 或 speedscope 打开）
+
+未开启时 span() 返回空的上下文管理器，几乎没有额外开销。
+
+    from webrun.utils.StepProfiler import profiler
+
+    profiler.enable("reports/trace.json")
+    with profiler.span("click_element", "keyword"):
+        ...
+    profiler.finish()  # 输出耗时分布并写入 trace 文件
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any
+
+# 命令行运行时通过环境变量开启（值为 trace 文件路径）
+PROFILE_ENV = "WEBRUN_PROFILE"
+
+# 用例执行的各阶段（category）
+PHASES = ("case", "script", "render", "context", "dispatch", "keyword", "assert", "capture", "allure")
+
+# 耗时分布的分桶上限（毫秒）
+BUCKETS_MS = (1, 10, 100, 1000)
+
+_NULL_SPAN = nullcontext()
+
+
+def keyword_category(name: str) -> str:
+    """关键字所属阶段：断言关键字单独统计"""
+    return "assert" if name.startswith("assert") else "keyword"
+
+
+class _Span:
+    """一次计时：退出时把 (名称, 阶段, 开始, 耗时, 线程) 记录到分析器"""
+
+    __slots__ = ("profiler", "name", "category", "args", "start")
+
+    def __init__(self, profiler: "StepProfiler", name: str, category: str, args: dict[str, Any] | None):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler._record(self.name, self.category, self.start, time.perf_counter_ns() - self.start, self.args)
+
+
+def _percentile(sorted_values: list[int], percent: float) -> int:
+    return sorted_values[min(int(len(sorted_values) * percent), len(sorted_values) - 1)]
+
+
+class StepProfiler:
+    """步骤耗时分析器 - 进程内共享"""
+
+    def __init__(self):
+        self.enabled = False
+        self.output: str | None = None
+        self._events: list[tuple[str, str, int, int, int, dict[str, Any] | None]] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def enable(self, output: str | os.PathLike | None = None) -> None:
+        """
+        开启耗时分析
+
+        :param output: Chrome Trace JSON 的输出路径（为空时只输出耗时分布）
+        """
+        self.enabled = True
+        self.output = str(output) if output else None
+        self._events = []
+        self._origin = time.perf_counter_ns()
+
+    def enable_from_env(self) -> bool:
+        """环境变量 WEBRUN_PROFILE 存在时开启（值为 trace 文件路径，1/true 表示只输出耗时分布）"""
+        value = os.environ.get(PROFILE_ENV)
+        if not value or value.lower() in ("0", "false", "no"):
+            return False
+        self.enable(None if value.lower() in ("1", "true", "yes") else value)
+        return True
+
+    def span(self, name: str, category: str, args: dict[str, Any] | None = None):
+        """
+        记录一段代码的耗时
+
+        :param name: 名称（如关键字名、用例名）
+        :param category: 阶段，见 PHASES
+        :param args: 附加到 trace 事件上的信息
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def _record(self, name: str, category: str, start: int, duration: int, args: dict[str, Any] | None) -> None:
+        event = (name, category, start, duration, threading.get_ident(), args)
+        with self._lock:
+            self._events.append(event)
+
+    def histograms(self) -> dict[str, dict[str, float]]:
+        """
+        各阶段及各关键字的耗时统计（毫秒）
+
+        :return: {"阶段" 或 "阶段:名称": {"count", "total", "p50", "p90", "p99", "max", "buckets"}}
+        """
+        groups: dict[str, list[int]] = {}
+        with self._lock:
+            events = list(self._events)
+        for name, category, _, duration, _, _ in events:
+            groups.setdefault(category, []).append(duration)
+            if category in ("keyword", "assert"):
+                groups.setdefault(f"{category}:{name}", []).append(duration)
+
+        stats = {}
+        for key, durations in groups.items():
+            durations.sort()
+            stats[key] = {
+                "count": len(durations),
+                "total": sum(durations) / 1e6,
+                "p50": _percentile(durations, 0.5) / 1e6,
+                "p90": _percentile(durations, 0.9) / 1e6,
+                "p99": _percentile(durations, 0.99) / 1e6,
+                "max": durations[-1] / 1e6,
+                # 各分桶的次数：<1ms, <10ms, <100ms, <1s, >=1s
+                "buckets": [sum(1 for d in durations if low * 1e6 <= d < high * 1e6)
+                            for low, high in zip((0, *BUCKETS_MS), (*BUCKETS_MS, float("inf")))],
+            }
+        return stats
+
+    def print_report(self) -> None:
+        """输出各阶段耗时分布（按总耗时排序）"""
+        stats = self.histograms()
+        if not stats:
+            return
+        grand_total = max(stats.get("case", {}).get("total", 0), 1e-9)
+        print("\n=== 步骤耗时分布（ms） ===")
+        print(f"{'阶段':<36} {'次数':>7} {'总耗时':>10} {'占比':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"
+              f"  分布(<1ms/<10ms/<100ms/<1s/>=1s)")
+        for key, item in sorted(stats.items(), key=lambda kv: (":" in kv[0], -kv[1]["total"])):
+            print(f"{key[:36]:<36} {item['count']:>7} {item['total']:>10.1f} {item['total'] / grand_total:>6.1%} "
+                  f"{item['p50']:>8.2f} {item['p90']:>8.2f} {item['p99']:>8.2f} {item['max']:>8.2f}"
+                  f"  {'/'.join(map(str, item['buckets']))}")
+
+    def export_chrome_trace(self, output: str | os.PathLike) -> Path:
+        """
+        导出 Chrome Trace 格式（完整事件 ph=X，时间单位微秒）
+
+        :param output: 输出文件路径
+        :return: 输出文件路径
+        """
+        with self._lock:
+            events = list(self._events)
+        lanes: dict[int, int] = {}
+        trace_events = []
+        for name, category, start, duration, lane, args in events:
+            event = {
+                "name": name, "cat": category, "ph": "X", "pid": os.getpid(),
+                "tid": lanes.setdefault(lane, len(lanes) + 1),
+                "ts": (start - self._origin) / 1000, "dur": duration / 1000,
+            }
+            if args:
+                event["args"] = args
+            trace_events.append(event)
+
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+        return output
+
+    def finish(self) -> None:
+        """运行结束：输出耗时分布并写入 trace 文件，然后关闭分析"""
+        if not self.enabled:
+            return
+        self.print_report()
+        if self.output:
+            print(f"耗时 trace 已导出: {self.export_chrome_trace(self.output)}")
+        self.enabled = False
+
+
+profiler = StepProfiler()